@@ -0,0 +1,194 @@
+"""
+Admission Control Module
+Bounds how many scans run at once and in what order waiting scans start.
+
+Scans are admitted through priority lanes: interactive first, then batch,
+then monitoring. At most max_in_flight scans run at once, on a pool of that
+many threads so scans never block the event loop. Batch and monitoring
+scans together may only hold background_in_flight of those slots, so the
+rest stay free for interactive scans under any background load. Each lane's
+wait queue is bounded; when it is full the scan is rejected with a
+Retry-After estimate instead of queueing.
+
+All bookkeeping happens on the event loop thread and needs no locks.
+"""
+
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, Deque, Optional
+
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+MONITORING = "monitoring"
+
+# Priority order: a waiting scan only starts once no higher lane is waiting
+LANES = (INTERACTIVE, BATCH, MONITORING)
+
+DEFAULT_MAX_IN_FLIGHT = 8
+DEFAULT_BACKGROUND_IN_FLIGHT = 4
+DEFAULT_QUEUE_LIMITS = {INTERACTIVE: 50, BATCH: 500, MONITORING: 500}
+
+# Starting guess for the Retry-After estimate, refined by observed durations
+DEFAULT_SCAN_SECONDS = 10.0
+SCAN_SECONDS_SMOOTHING = 0.2
+
+
+class AdmissionRejected(Exception):
+    """A lane's queue is full; retry after retry_after seconds."""
+
+    def __init__(self, lane: str, retry_after: int):
+        super().__init__(f"Scan queue is full ({lane}), retry after {retry_after}s")
+        self.lane = lane
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Priority admission queue and bounded worker pool for scans.
+
+    Args:
+        max_in_flight: Scans running at once across all lanes
+        background_in_flight: Scans running at once across batch and
+            monitoring lanes (at most max_in_flight)
+        queue_limits: Scans allowed to wait per lane
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        background_in_flight: int = DEFAULT_BACKGROUND_IN_FLIGHT,
+        queue_limits: Optional[Dict[str, int]] = None
+    ):
+        self.max_in_flight = max_in_flight
+        self.background_in_flight = min(background_in_flight, max_in_flight)
+        self.queue_limits = {**DEFAULT_QUEUE_LIMITS, **(queue_limits or {})}
+        self.scan_seconds = DEFAULT_SCAN_SECONDS
+        self.admitted = {lane: 0 for lane in LANES}
+        self.rejected = {lane: 0 for lane in LANES}
+        self._in_flight = {lane: 0 for lane in LANES}
+        self._waiting: Dict[str, Deque[asyncio.Future]] = {lane: deque() for lane in LANES}
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight)
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        """
+        Build a controller from SCAN_MAX_IN_FLIGHT, BATCH_SCAN_WORKERS and
+        SCAN_QUEUE_INTERACTIVE / SCAN_QUEUE_BATCH / SCAN_QUEUE_MONITORING.
+        """
+        return cls(
+            max_in_flight=int(os.getenv("SCAN_MAX_IN_FLIGHT", DEFAULT_MAX_IN_FLIGHT)),
+            background_in_flight=int(os.getenv("BATCH_SCAN_WORKERS", DEFAULT_BACKGROUND_IN_FLIGHT)),
+            queue_limits={
+                lane: int(os.getenv(f"SCAN_QUEUE_{lane.upper()}", limit))
+                for lane, limit in DEFAULT_QUEUE_LIMITS.items()
+            }
+        )
+
+    def _can_start(self, lane: str) -> bool:
+        """Whether a free slot may go to this lane."""
+        if sum(self._in_flight.values()) >= self.max_in_flight:
+            return False
+        if lane != INTERACTIVE:
+            return self._in_flight[BATCH] + self._in_flight[MONITORING] < self.background_in_flight
+        return True
+
+    def _waiting_ahead(self, lane: str) -> int:
+        """Scans waiting in this lane and every higher-priority lane."""
+        return sum(len(self._waiting[other]) for other in LANES[:LANES.index(lane) + 1])
+
+    def _dispatch(self) -> None:
+        """Hand free slots to waiting scans, highest-priority lane first."""
+        for lane in LANES:
+            waiting = self._waiting[lane]
+            while waiting and self._can_start(lane):
+                future = waiting.popleft()
+                if future.cancelled():
+                    continue
+                self._in_flight[lane] += 1
+                future.set_result(None)
+            if waiting:
+                # Lower lanes wait until this one drains
+                return
+
+    def _release(self, lane: str, started: float) -> None:
+        self._in_flight[lane] -= 1
+        self.scan_seconds += SCAN_SECONDS_SMOOTHING * (time.monotonic() - started - self.scan_seconds)
+        self._dispatch()
+
+    def retry_after(self, lane: str) -> int:
+        """Estimated seconds until a scan in this lane would start."""
+        slots = self.max_in_flight if lane == INTERACTIVE else self.background_in_flight
+        return max(1, math.ceil((self._waiting_ahead(lane) + 1) * self.scan_seconds / max(1, slots)))
+
+    def check_capacity(self, lane: str, count: int = 1) -> None:
+        """
+        Reject up front if count more scans can't wait in the lane.
+
+        Raises:
+            AdmissionRejected: If the lane's queue can't hold them
+        """
+        if len(self._waiting[lane]) + count > self.queue_limits[lane]:
+            self.rejected[lane] += count
+            raise AdmissionRejected(lane, self.retry_after(lane))
+
+    async def _acquire(self, lane: str) -> None:
+        """Take a slot in the lane, waiting behind higher-priority scans."""
+        if self._waiting_ahead(lane) == 0 and self._can_start(lane):
+            self._in_flight[lane] += 1
+            return
+        self.check_capacity(lane)
+        future = asyncio.get_running_loop().create_future()
+        self._waiting[lane].append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted a slot just as the caller went away; pass it on
+                self._in_flight[lane] -= 1
+                self._dispatch()
+            elif future in self._waiting[lane]:
+                self._waiting[lane].remove(future)
+            raise
+
+    async def run(self, lane: str, scan: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run a blocking scan once admitted to its lane.
+
+        The slot is held until the scan's thread finishes, even if the
+        caller is cancelled meanwhile.
+
+        Args:
+            lane: INTERACTIVE, BATCH or MONITORING
+            scan: Blocking function to run on the scan pool
+            *args: Arguments for scan
+
+        Returns:
+            The scan's return value
+
+        Raises:
+            AdmissionRejected: If the lane's queue is full
+        """
+        await self._acquire(lane)
+        self.admitted[lane] += 1
+        started = time.monotonic()
+        loop = asyncio.get_running_loop()
+        future = self._executor.submit(scan, *args)
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self._release, lane, started))
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> Dict[str, Any]:
+        """Running and waiting scans per lane, totals, and the current scan time estimate."""
+        return {
+            "max_in_flight": self.max_in_flight,
+            "background_in_flight": self.background_in_flight,
+            "in_flight": dict(self._in_flight),
+            "waiting": {lane: len(waiting) for lane, waiting in self._waiting.items()},
+            "admitted": dict(self.admitted),
+            "rejected": dict(self.rejected),
+            "scan_seconds": round(self.scan_seconds, 2)
+        }
@@ -0,0 +1,100 @@
+"""
+Encoding Benchmark
+Compares FastAPI's default response encoding against the negotiated encoders
+in encoding.py on synthetic /scan results.
+
+Usage (from backend/):
+    python benchmarks/encoding_benchmark.py [--results 2000] [--rounds 5]
+"""
+
+import argparse
+import gzip
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fastapi.encoders import jsonable_encoder
+
+import encoding
+from scanners.headers_check import REQUIRED_HEADERS
+from scanners.ports_check import COMMON_PORTS
+
+
+def synthetic_scan(i: int) -> dict:
+    """A /scan-shaped result with realistic header and port payloads."""
+    missing = random.sample(list(REQUIRED_HEADERS), random.randint(0, len(REQUIRED_HEADERS)))
+    ports = sorted(random.sample(list(COMMON_PORTS), random.randint(0, 6)))
+    return {
+        "url": f"site{i}.example.com",
+        "scan_timestamp": "2024-05-01T12:00:00.000000",
+        "ssl": {
+            "is_valid": True, "issued_to": f"site{i}.example.com", "issued_by": "Let's Encrypt",
+            "expires_in_days": random.randint(1, 365), "warning": None,
+            "protocol_version": "TLSv1.3", "cipher": "TLS_AES_256_GCM_SHA384"
+        },
+        "headers": {
+            "present_headers": [
+                {"name": h, "value": "max-age=31536000", "description": d}
+                for h, d in REQUIRED_HEADERS.items() if h not in missing
+            ],
+            "missing_headers": [{"name": h, "description": REQUIRED_HEADERS[h]} for h in missing],
+            "headers_score": 25.0 * (len(REQUIRED_HEADERS) - len(missing)),
+            "missing_count": len(missing),
+            "all_headers": {f"X-Header-{n}": "some-value-" * 3 for n in range(15)}
+        },
+        "ports": {
+            "open_ports": [{"port": p, "status": "open", "service": COMMON_PORTS[p]} for p in ports],
+            "total_scanned": 1024, "ports_open_count": len(ports), "hostname": f"site{i}.example.com"
+        },
+        "risk_score": {"score": random.randint(0, 100), "risk_level": "Medium"},
+        "scan_id": f"{i:032x}"
+    }
+
+
+def fastapi_default(payload) -> bytes:
+    """What FastAPI does for a returned dict: jsonable_encoder + JSONResponse.render."""
+    return json.dumps(
+        jsonable_encoder(payload), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def bench(name, encode, payload, rounds):
+    best = float("inf")
+    body = b""
+    for _ in range(rounds):
+        start = time.perf_counter()
+        body = encode(payload)
+        best = min(best, time.perf_counter() - start)
+    compressed = len(gzip.compress(body, 6))
+    count = len(payload["results"])
+    print(f"{name:<22} {best * 1000:9.1f} ms  {count / best:12,.0f} results/s  "
+          f"{len(body) / 1024:9.1f} KiB  {compressed / 1024:8.1f} KiB gzip")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--results", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    random.seed(0)
+    payload = {"results": [synthetic_scan(i) for i in range(args.results)]}
+
+    print(f"{args.results} scan results, best of {args.rounds}")
+    baseline = bench("fastapi default json", fastapi_default, payload, args.rounds)
+    fast = bench(f"json ({'orjson' if encoding.orjson else 'stdlib'})", encoding.encode_json, payload, args.rounds)
+    print(f"  -> {baseline / fast:.1f}x faster than default")
+    if encoding.msgpack is not None:
+        packed = bench("msgpack", encoding.encode_msgpack, payload, args.rounds)
+        print(f"  -> {baseline / packed:.1f}x faster than default")
+    else:
+        print("msgpack not installed; skipping")
+
+
+if __name__ == "__main__":
+    main()
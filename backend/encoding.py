@@ -0,0 +1,100 @@
+"""
+Response Encoding Module
+Content negotiation for scan endpoints: compact JSON by default (orjson when
+installed) and MessagePack when the client asks for it. Compression is
+handled app-wide by GZipMiddleware.
+"""
+
+import json
+from typing import Any, Optional
+
+from fastapi import Request, Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional encoding
+    msgpack = None
+
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+
+
+def _json_default(value: Any) -> Any:
+    """Fallback for values the encoders don't know (numpy scalars, sets, datetimes)."""
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    return str(value)
+
+
+def encode_json(data: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(data, default=_json_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False, default=_json_default).encode("utf-8")
+
+
+def encode_msgpack(data: Any) -> bytes:
+    """Serialize to MessagePack (requires the msgpack package)."""
+    return msgpack.packb(data, default=_json_default, use_bin_type=True)
+
+
+def negotiate_media_type(accept: Optional[str]) -> str:
+    """
+    Pick the response media type from an Accept header.
+
+    MessagePack is chosen when the client prefers it over JSON (higher q-value,
+    or listed first on a tie) and msgpack is installed; everything else gets JSON.
+
+    Args:
+        accept: Accept header value
+
+    Returns:
+        Chosen media type
+    """
+    if not accept or msgpack is None:
+        return JSON_MEDIA_TYPE
+
+    best_type, best_q = JSON_MEDIA_TYPE, -1.0
+    for part in accept.split(","):
+        media_type, _, params = part.strip().partition(";")
+        media_type = media_type.strip().lower()
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q <= 0:
+            continue
+        if media_type in MSGPACK_MEDIA_TYPES and q > best_q:
+            best_type, best_q = MSGPACK_MEDIA_TYPES[0], q
+        elif media_type in (JSON_MEDIA_TYPE, "application/*", "*/*") and q > best_q:
+            best_type, best_q = JSON_MEDIA_TYPE, q
+    return best_type
+
+
+def encoded_response(request: Request, data: Any, status_code: int = 200) -> Response:
+    """
+    Encode a payload in the representation the client asked for.
+
+    Args:
+        request: Incoming request (its Accept header drives the choice)
+        data: JSON-compatible payload
+        status_code: HTTP status
+
+    Returns:
+        Response with the encoded body and a Vary: Accept header
+    """
+    media_type = negotiate_media_type(request.headers.get("accept"))
+    body = encode_msgpack(data) if media_type != JSON_MEDIA_TYPE else encode_json(data)
+    return Response(content=body, status_code=status_code, media_type=media_type, headers={"Vary": "Accept"})
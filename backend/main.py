@@ -7,13 +7,30 @@ Always obtain proper authorization before scanning any website.
 Unauthorized network scanning may be illegal in your jurisdiction.
 """
 
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from typing import Dict, Any
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field
+from typing import Dict, Any, List, Optional, Tuple
+import asyncio
 import re
 from urllib.parse import urlparse
 
 from scanners import check_ssl, check_headers, check_ports, calculate_risk_score
+from scanners.security_drift import ScanHistoryTracker, get_security_timeline
+from scanners.drift_alerts import AlertDispatcher
+from scanners.scan_store import ScanResultStore
+from scanners.port_sweep_cache import PortSweepCache
+from scanners.port_sweep_jobs import PortSweepJobs, SweepCapacityExceeded
+from scanners.host_backoff import HostBackoff, unreachable_reason
+from scanners.circuit_breaker import CircuitBreakers, circuit_notice, short_circuited
+from scanners.analysis import run_analysis, parse_views
+from scanners.fix_engine import fix_catalog_response
+from scanners.attacker_defender_analysis import attack_catalog_response
+from scanners.headers_check import parse_paths
+from encoding import encoded_response
+from admission import AdmissionController, AdmissionRejected, INTERACTIVE, BATCH, MONITORING
 
 
 # Initialize FastAPI app
@@ -44,6 +61,76 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress responses (JSON or MessagePack) for clients sending Accept-Encoding: gzip
+app.add_middleware(GZipMiddleware, minimum_size=1000)
+
+# Shared scan history used for drift tracking and timelines.
+# New risks are pushed to DRIFT_ALERT_WEBHOOKS when configured.
+alert_dispatcher = AlertDispatcher.from_env()
+scan_tracker = ScanHistoryTracker(alert_dispatcher=alert_dispatcher)
+
+
+# Raw scanner output kept for a while so context/mode switches can be
+# re-analyzed without rescanning
+scan_store = ScanResultStore.from_env()
+
+# Scans are admitted through priority lanes (interactive > batch > monitoring):
+# at most SCAN_MAX_IN_FLIGHT run at once, BATCH_SCAN_WORKERS of them batch or
+# monitoring, and full lanes answer 429 with Retry-After
+BATCH_MAX_URLS = int(os.getenv("BATCH_MAX_URLS", 100))
+admission = AdmissionController.from_env()
+
+# Batch scans sweep each resolved IP once per PORT_SWEEP_TTL_SECONDS and share
+# the open ports with every hostname behind it
+port_sweep_cache = PortSweepCache.from_env()
+
+# Full-range (1-65535) sweeps run as background jobs, PORT_SWEEP_JOB_WORKERS
+# at a time and at most PORT_SWEEP_MAX_ACTIVE queued or running (429 beyond),
+# pausing after PORT_SWEEP_TIME_BUDGET seconds
+port_sweep_jobs = PortSweepJobs.from_env()
+
+# Hosts that didn't resolve or timed out are skipped for HOST_BACKOFF_BASE_SECONDS,
+# doubling per consecutive failure up to HOST_BACKOFF_MAX_SECONDS
+host_backoff = HostBackoff.from_env()
+
+# Each scanner of each host fails fast after CIRCUIT_BREAKER_FAILURES consecutive
+# timeouts, probing again every CIRCUIT_BREAKER_RESET_SECONDS
+circuit_breakers = CircuitBreakers.from_env()
+
+
+class ScanBatchRequest(BaseModel):
+    """Body of POST /scan/batch."""
+    urls: List[str] = Field(..., min_length=1)
+    paths: List[str] = Field(default_factory=list)
+
+
+@app.exception_handler(AdmissionRejected)
+async def scan_queue_full(request: Request, exc: AdmissionRejected) -> JSONResponse:
+    """Backpressure: tell clients when to come back instead of queueing without bound."""
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+
+@app.exception_handler(SweepCapacityExceeded)
+async def port_sweeps_full(request: Request, exc: SweepCapacityExceeded) -> JSONResponse:
+    """Background port sweeps are capped too; same 429 contract as scans."""
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+
+@app.on_event("shutdown")
+def flush_drift_alerts() -> None:
+    """Deliver any pending drift alerts and journal pending history before the process exits."""
+    scan_tracker.flush()
+    if alert_dispatcher:
+        alert_dispatcher.close()
+
 
 def validate_url(url: str) -> tuple[bool, str]:
     """
@@ -89,6 +176,12 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "scan": "/scan?url=example.com",
+            "batch": "POST /scan/batch",
+            "advanced": "/scan/advanced?url=example.com&context=authentication&paths=/login",
+            "rescore": "POST /scans/{scan_id}/rescore?context=ecommerce&advanced=true",
+            "fixes": "/fixes/catalog?framework=nginx",
+            "attacks": "/attacks/catalog",
+            "timeline": "/history/timeline?url=example.com",
             "health": "/health"
         }
     }
@@ -99,61 +192,259 @@ async def health_check():
     """Health check endpoint for deployment monitoring."""
     return {
         "status": "healthy",
-        "service": "Health Check Dashboard API"
+        "service": "Health Check Dashboard API",
+        "admission": admission.stats()
+    }
+
+
+def run_checks(
+    normalized_url: str,
+    paths: Optional[List[str]] = None,
+    sweep_cache: Optional[PortSweepCache] = None,
+    enumerate_protocols: bool = False
+) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+    """
+    Run the SSL, header and port checks, each behind the host's circuit breaker.
+    
+    Args:
+        normalized_url: URL returned by validate_url
+        paths: Extra paths to check headers on
+        sweep_cache: Reuse recent port sweeps of the same IP
+        enumerate_protocols: Also enumerate TLS versions and cipher groups
+    
+    Returns:
+        (ssl, headers, ports) results; a check whose breaker is open returns
+        an error result with a circuit entry instead of running
+    """
+    ssl_result = circuit_breakers.call(
+        normalized_url, "ssl", lambda: check_ssl(normalized_url, enumerate_protocols=enumerate_protocols)
+    )
+    headers_result = circuit_breakers.call(
+        normalized_url, "headers", lambda: check_headers(f"https://{normalized_url}", paths)
+    )
+    ports_result = circuit_breakers.call(
+        normalized_url, "ports", lambda: check_ports(normalized_url, sweep_cache=sweep_cache)
+    )
+    return ssl_result, headers_result, ports_result
+
+
+def record_reachability(
+    normalized_url: str,
+    ssl_result: Dict[str, Any],
+    headers_result: Dict[str, Any],
+    ports_result: Dict[str, Any]
+) -> Optional[Dict[str, Any]]:
+    """
+    Update the host's backoff from a scan's results.
+    
+    Scans with a short-circuited check say nothing about reachability and
+    leave the backoff as it is.
+    
+    Returns:
+        The new backoff if the host was unreachable, else None
+    """
+    if short_circuited(ssl_result, headers_result, ports_result):
+        return None
+    failure = unreachable_reason(ssl_result, headers_result, ports_result)
+    if failure:
+        return host_backoff.record_failure(normalized_url, failure)
+    host_backoff.record_success(normalized_url)
+    return None
+
+
+def perform_scan(
+    normalized_url: str,
+    paths: Optional[List[str]] = None,
+    sweep_cache: Optional[PortSweepCache] = None,
+    force: bool = False
+) -> Dict[str, Any]:
+    """
+    Run all security checks for a validated URL and record the result.
+    
+    Hosts backing off after a DNS failure or timeout (see HostBackoff) are
+    not scanned; the response says so and when the last failure was.
+    
+    Args:
+        normalized_url: URL returned by validate_url
+        paths: Extra paths to check headers on (see parse_paths)
+        sweep_cache: Reuse recent port sweeps of the same IP (SSL and
+            headers always run per hostname)
+        force: Scan even if the host is backing off
+    
+    Scans with a short-circuited check (see CircuitBreakers) are returned
+    but not recorded: their placeholder results are not findings.
+    
+    Returns:
+        Comprehensive security scan results including scan_id (None when
+        not recorded), or {url, scan_timestamp, skipped, reason,
+        last_failure_at, ...}
+    """
+    if not force:
+        skipped = host_backoff.skipped(normalized_url)
+        if skipped is not None:
+            return {
+                "url": normalized_url,
+                "scan_timestamp": __import__('datetime').datetime.utcnow().isoformat(),
+                **skipped
+            }
+    
+    # Execute all security checks
+    ssl_result, headers_result, ports_result = run_checks(normalized_url, paths, sweep_cache)
+    
+    # Calculate risk score
+    risk_score_result = calculate_risk_score(ssl_result, headers_result, ports_result)
+    
+    # Compile final response
+    response = {
+        "url": normalized_url,
+        "scan_timestamp": __import__('datetime').datetime.utcnow().isoformat(),
+        "ssl": ssl_result,
+        "headers": headers_result,
+        "ports": ports_result,
+        "risk_score": risk_score_result,
+        "summary": {
+            "overall_risk": risk_score_result['risk_level'],
+            "risk_score": risk_score_result['score'],
+            "ssl_valid": ssl_result.get('is_valid', False),
+            "missing_headers_count": headers_result.get('missing_count', 0),
+            "open_ports_count": ports_result.get('ports_open_count', 0)
+        }
+    }
+    
+    backoff = record_reachability(normalized_url, ssl_result, headers_result, ports_result)
+    if backoff:
+        response["backoff"] = backoff
+    
+    if short_circuited(ssl_result, headers_result, ports_result):
+        response["scan_id"] = None
+        return response
+    
+    response["scan_id"] = scan_tracker.record_scan(normalized_url, response)
+    scan_store.put(response["scan_id"], {
+        "url": normalized_url,
+        "scan_timestamp": response["scan_timestamp"],
+        "ssl": ssl_result,
+        "headers": headers_result,
+        "ports": ports_result
+    })
+    return response
+
+
+def perform_advanced_scan(
+    normalized_url: str,
+    paths: Optional[List[str]],
+    enumerate_protocols: bool,
+    force: bool,
+    analysis_options: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Run all checks, the context-aware analysis and history bookkeeping for
+    /scan/advanced.
+    
+    Runs entirely on the admission pool: analysis, record_scan (which
+    persists history) and drift never block the event loop.
+    
+    Args:
+        normalized_url: URL returned by validate_url
+        paths: Extra paths to check headers on (see parse_paths)
+        enumerate_protocols: Enumerate TLS versions and cipher groups
+        force: Scan even if the host is backing off
+        analysis_options: Keyword arguments for run_analysis
+    
+    Returns:
+        scan_id, the analysis and drift, or a skip notice while the host is
+        backing off
+    """
+    if not force:
+        skipped = host_backoff.skipped(normalized_url)
+        if skipped is not None:
+            return {
+                "url": normalized_url,
+                "scan_timestamp": __import__('datetime').datetime.utcnow().isoformat(),
+                **skipped
+            }
+    
+    ssl_result, headers_result, ports_result = run_checks(normalized_url, paths, None, enumerate_protocols)
+    backoff = record_reachability(normalized_url, ssl_result, headers_result, ports_result)
+    scan_data = {
+        "url": normalized_url,
+        "scan_timestamp": __import__('datetime').datetime.utcnow().isoformat(),
+        "ssl": ssl_result,
+        "headers": headers_result,
+        "ports": ports_result
+    }
+    
+    analysis = run_analysis(scan_data, **analysis_options)
+    # History holds one canonical (basic) score per scan, whatever context
+    # or mode was requested, so /scan and /scan/advanced never drift apart.
+    # Short-circuited checks are placeholders, not findings, and aren't recorded.
+    scan_id = None
+    if not short_circuited(ssl_result, headers_result, ports_result):
+        scan_id = scan_tracker.record_scan(normalized_url, {
+            **scan_data,
+            "risk_score": calculate_risk_score(ssl_result, headers_result, ports_result),
+            "site_context": analysis_options["site_context"],
+            "advanced": analysis_options["advanced"]
+        })
+        scan_store.put(scan_id, scan_data)
+    
+    response = {
+        "scan_id": scan_id,
+        **analysis,
+        "drift": scan_tracker.calculate_drift(normalized_url)
     }
+    if backoff:
+        response["backoff"] = backoff
+    return response
 
 
 @app.get("/scan")
-async def scan_website(url: str = Query(..., min_length=3, max_length=500)) -> Dict[str, Any]:
+async def scan_website(
+    request: Request,
+    url: str = Query(..., min_length=3, max_length=500),
+    paths: Optional[str] = Query(None, description="Comma-separated extra paths to check headers on, e.g. /login,/checkout"),
+    force: bool = Query(False, description="Scan even if the host is backing off after a failure"),
+    lane: str = Query(INTERACTIVE, pattern="^(interactive|monitoring)$")
+) -> Response:
     """
     Scan a website for security issues.
     
     DISCLAIMER: This endpoint should only be used to scan websites you own
     or have explicit permission to scan. Unauthorized scanning may be illegal.
     
+    Responds with JSON, or MessagePack when requested via
+    Accept: application/msgpack.
+    
     Args:
         url: Website URL to scan (e.g., example.com or https://example.com)
+        paths: Extra paths whose headers are checked over the same connection
+        force: Scan even if the host is backing off after a DNS failure or timeout
+        lane: Admission lane; scheduled checks should use monitoring
     
     Returns:
-        Comprehensive security scan results
+        Comprehensive security scan results, or a skip notice
     
     Raises:
         HTTPException: If URL is invalid or scan fails
+        AdmissionRejected: If the lane's queue is full (429)
     """
     try:
+        try:
+            header_paths = parse_paths(paths)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
         # Validate and normalize URL
         is_valid, result = validate_url(url)
         if not is_valid:
             raise HTTPException(status_code=400, detail=result)
         
-        normalized_url = result
-        
-        # Execute all security checks
-        ssl_result = check_ssl(normalized_url)
-        headers_result = check_headers(f"https://{normalized_url}")
-        ports_result = check_ports(normalized_url)
-        
-        # Calculate risk score
-        risk_score_result = calculate_risk_score(ssl_result, headers_result, ports_result)
-        
-        # Compile final response
-        return {
-            "url": normalized_url,
-            "scan_timestamp": __import__('datetime').datetime.utcnow().isoformat(),
-            "ssl": ssl_result,
-            "headers": headers_result,
-            "ports": ports_result,
-            "risk_score": risk_score_result,
-            "summary": {
-                "overall_risk": risk_score_result['risk_level'],
-                "risk_score": risk_score_result['score'],
-                "ssl_valid": ssl_result.get('is_valid', False),
-                "missing_headers_count": headers_result.get('missing_count', 0),
-                "open_ports_count": ports_result.get('ports_open_count', 0)
-            }
-        }
+        # Scheduled checks share port sweeps per IP like batch scans do
+        sweep_cache = port_sweep_cache if lane == MONITORING else None
+        scan = await admission.run(lane, perform_scan, result, header_paths, sweep_cache, force)
+        return encoded_response(request, scan)
     
-    except HTTPException:
+    except (HTTPException, AdmissionRejected):
         raise
     except Exception as e:
         raise HTTPException(
@@ -162,17 +453,95 @@ async def scan_website(url: str = Query(..., min_length=3, max_length=500)) -> D
         )
 
 
+@app.post("/scan/batch")
+async def scan_batch(
+    request: Request,
+    batch: ScanBatchRequest,
+    lane: str = Query(BATCH, pattern="^(batch|monitoring)$")
+) -> Response:
+    """
+    Scan several websites in one request.
+    
+    URLs are scanned concurrently in the batch (or monitoring) admission lane,
+    behind interactive scans; invalid or failed URLs are reported per item
+    instead of failing the batch. Hostnames that resolve to the same IP share
+    one port sweep (see PortSweepCache). Responds with JSON, or MessagePack
+    when requested via Accept: application/msgpack.
+    
+    Args:
+        batch: {"urls": [...], "paths": [...]} (at most BATCH_MAX_URLS; paths
+            are checked on every URL)
+        lane: Admission lane; scheduled checks should use monitoring
+    
+    Returns:
+        {results: [scan result, skip notice or {url, error}], scanned,
+        skipped, failed}
+    
+    Raises:
+        AdmissionRejected: If the lane can't queue the whole batch (429)
+    """
+    if len(batch.urls) > BATCH_MAX_URLS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_URLS} URLs per batch")
+    try:
+        header_paths = parse_paths(",".join(batch.paths))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    validated = [validate_url(url) for url in batch.urls]
+    normalized = {result for is_valid, result in validated if is_valid}
+    admission.check_capacity(lane, len(normalized))
+    
+    pending = {
+        result: asyncio.ensure_future(
+            admission.run(lane, perform_scan, result, header_paths, port_sweep_cache)
+        )
+        for result in normalized
+    }
+    results: List[Any] = [
+        pending[result] if is_valid else {"url": url, "error": result}
+        for url, (is_valid, result) in zip(batch.urls, validated)
+    ]
+    
+    await asyncio.gather(*pending.values(), return_exceptions=True)
+    
+    items = []
+    for url, item in zip(batch.urls, results):
+        if isinstance(item, asyncio.Future):
+            error = item.exception()
+            item = {"url": url, "error": f"Scan failed: {str(error)}"} if error else item.result()
+        items.append(item)
+    
+    failed = sum(1 for item in items if "error" in item)
+    skipped = sum(1 for item in items if item.get("skipped"))
+    return encoded_response(request, {
+        "results": items,
+        "scanned": len(items) - failed - skipped,
+        "skipped": skipped,
+        "failed": failed
+    })
+
+
 @app.get("/scan/quick")
-async def quick_scan(url: str = Query(..., min_length=3, max_length=500)) -> Dict[str, Any]:
+async def quick_scan(
+    request: Request,
+    url: str = Query(..., min_length=3, max_length=500),
+    lane: str = Query(INTERACTIVE, pattern="^(interactive|monitoring)$")
+) -> Response:
     """
     Quick scan endpoint that returns only critical information.
     Useful for repeated checks on the same domain.
     
     Args:
         url: Website URL to scan
+        lane: Admission lane; scheduled checks should use monitoring
     
     Returns:
-        Simplified scan results with key metrics only
+        Simplified scan results with key metrics only, or a skip notice
+        while the host is backing off or one of its checks has an open
+        circuit (placeholder results aren't scored)
+    
+    Raises:
+        AdmissionRejected: If the lane's queue is full (429)
     """
     try:
         # Validate and normalize URL
@@ -181,23 +550,32 @@ async def quick_scan(url: str = Query(..., min_length=3, max_length=500)) -> Dic
             raise HTTPException(status_code=400, detail=result)
         
         normalized_url = result
+        skipped = host_backoff.skipped(normalized_url)
+        if skipped is not None:
+            return encoded_response(request, {"url": normalized_url, **skipped})
         
         # Execute security checks
-        ssl_result = check_ssl(normalized_url)
-        headers_result = check_headers(f"https://{normalized_url}")
-        ports_result = check_ports(normalized_url)
+        sweep_cache = port_sweep_cache if lane == MONITORING else None
+        ssl_result, headers_result, ports_result = await admission.run(
+            lane, run_checks, normalized_url, None, sweep_cache
+        )
+        if short_circuited(ssl_result, headers_result, ports_result):
+            return encoded_response(
+                request, {"url": normalized_url, **circuit_notice(ssl=ssl_result, headers=headers_result, ports=ports_result)}
+            )
+        record_reachability(normalized_url, ssl_result, headers_result, ports_result)
         risk_score_result = calculate_risk_score(ssl_result, headers_result, ports_result)
         
-        return {
+        return encoded_response(request, {
             "url": normalized_url,
             "score": risk_score_result['score'],
             "risk_level": risk_score_result['risk_level'],
             "ssl_valid": ssl_result.get('is_valid', False),
             "missing_headers": headers_result.get('missing_count', 0),
             "open_ports": ports_result.get('ports_open_count', 0)
-        }
+        })
     
-    except HTTPException:
+    except (HTTPException, AdmissionRejected):
         raise
     except Exception as e:
         raise HTTPException(
@@ -206,6 +584,401 @@ async def quick_scan(url: str = Query(..., min_length=3, max_length=500)) -> Dic
         )
 
 
+@app.get("/scan/advanced")
+async def advanced_scan(
+    request: Request,
+    url: str = Query(..., min_length=3, max_length=500),
+    context: str = Query("marketing", pattern="^(marketing|authentication|ecommerce|internal)$"),
+    advanced: bool = Query(False),
+    mode: str = Query("both", pattern="^(attacker|defender|both)$"),
+    include_fixes: bool = Query(True),
+    views: Optional[str] = Query(None, description="Comma-separated layers: executive,technical,attacker,defender,fixes,raw"),
+    inline_fixes: bool = Query(False),
+    framework: Optional[str] = Query(None, pattern="^(nginx|apache|express|django|flask)$"),
+    inline_attacks: bool = Query(False),
+    paths: Optional[str] = Query(None, description="Comma-separated extra paths to check headers on, e.g. /login,/checkout"),
+    tls_profile: bool = Query(False, description="Enumerate accepted TLS versions and cipher groups"),
+    force: bool = Query(False, description="Scan even if the host is backing off after a failure")
+) -> Response:
+    """
+    Scan a website and return context-aware analysis.
+    
+    The response carries a scan_id; switching context or mode afterwards
+    should go through POST /scans/{scan_id}/rescore instead of rescanning.
+    
+    Args:
+        url: Website URL to scan
+        context: Site context for weighting
+        advanced: Apply advanced-mode penalties
+        mode: attacker, defender or both
+        include_fixes: Include actionable fix snippets
+        views: Layers to build and return (overrides mode/include_fixes)
+        inline_fixes: Inline fix snippet bodies (default: ids from /fixes/catalog)
+        framework: Only inline this framework's header snippets
+        inline_attacks: Inline attack descriptions (default: ids from /attacks/catalog)
+        paths: Extra paths whose headers are checked over the same connection
+            and scored (e.g. /login for authentication sites)
+        tls_profile: Enumerate TLS versions and cipher groups (ssl.tls_profile)
+        force: Scan even if the host is backing off after a DNS failure or timeout
+    
+    Returns:
+        Context-aware risk, the requested layers and drift, or a skip notice
+        while the host is backing off
+    """
+    try:
+        try:
+            requested_views = parse_views(views)
+            header_paths = parse_paths(paths)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        is_valid, result = validate_url(url)
+        if not is_valid:
+            raise HTTPException(status_code=400, detail=result)
+        
+        normalized_url = result
+        response = await admission.run(
+            INTERACTIVE, perform_advanced_scan, normalized_url, header_paths, tls_profile, force, {
+                "site_context": context,
+                "advanced": advanced,
+                "mode": mode,
+                "include_fixes": include_fixes,
+                "views": requested_views,
+                "inline_fixes": inline_fixes,
+                "fix_framework": framework,
+                "inline_attacks": inline_attacks
+            }
+        )
+        return encoded_response(request, response)
+    
+    except (HTTPException, AdmissionRejected):
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Advanced scan failed: {str(e)}"
+        )
+
+
+@app.post("/scans/{scan_id}/rescore")
+async def rescore_scan(
+    request: Request,
+    scan_id: str,
+    context: str = Query("marketing", pattern="^(marketing|authentication|ecommerce|internal)$"),
+    advanced: bool = Query(False),
+    mode: str = Query("both", pattern="^(attacker|defender|both)$"),
+    include_fixes: bool = Query(True),
+    views: Optional[str] = Query(None, description="Comma-separated layers: executive,technical,attacker,defender,fixes,raw"),
+    inline_fixes: bool = Query(False),
+    framework: Optional[str] = Query(None, pattern="^(nginx|apache|express|django|flask)$"),
+    inline_attacks: bool = Query(False)
+) -> Response:
+    """
+    Rerun only the analysis stage for a recent scan.
+    
+    Uses the raw findings retained server-side, so switching site context or
+    advanced mode costs milliseconds instead of a full port scan.
+    
+    Args:
+        scan_id: Id returned by /scan or /scan/advanced
+        context: Site context for weighting
+        advanced: Apply advanced-mode penalties
+        mode: attacker, defender or both
+        include_fixes: Include actionable fix snippets
+        views: Layers to build and return (overrides mode/include_fixes)
+        inline_fixes: Inline fix snippet bodies (default: ids from /fixes/catalog)
+        framework: Only inline this framework's header snippets
+        inline_attacks: Inline attack descriptions (default: ids from /attacks/catalog)
+    
+    Returns:
+        Same analysis shape as /scan/advanced
+    """
+    try:
+        requested_views = parse_views(views)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    scan_data = scan_store.get(scan_id)
+    if scan_data is None:
+        raise HTTPException(status_code=404, detail="Scan not found or expired; run a new scan")
+    
+    return encoded_response(request, {
+        "scan_id": scan_id,
+        **run_analysis(
+            scan_data, context, advanced, mode, include_fixes, requested_views, inline_fixes, framework,
+            inline_attacks
+        )
+    })
+
+
+def catalog_response(request: Request, body: bytes, etag: str) -> Response:
+    """Serve a pre-serialized catalog with a strong ETag; If-None-Match gets a 304."""
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=86400"}
+    
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=headers)
+    
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@app.get("/fixes/catalog")
+async def fix_catalog(
+    request: Request,
+    framework: Optional[str] = Query(None, pattern="^(nginx|apache|express|django|flask)$")
+) -> Response:
+    """
+    Versioned catalog of fix snippets, keyed by the fix ids in scan responses.
+    
+    The catalog only changes with FIX_CATALOG_VERSION, so it is served with a
+    strong ETag and a long max-age; If-None-Match gets a 304.
+    
+    Args:
+        framework: Only include this framework's header snippets
+    
+    Returns:
+        {version, framework, fixes: {fix_id: entry}}
+    """
+    _, body, etag = fix_catalog_response(framework)
+    return catalog_response(request, body, etag)
+
+
+@app.get("/attacks/catalog")
+async def attack_catalog(request: Request) -> Response:
+    """
+    Versioned catalog of attack descriptions, keyed by the attack ids in
+    attacker views.
+    
+    Cached like /fixes/catalog; bump ATTACK_CATALOG_VERSION when the
+    descriptions change.
+    
+    Returns:
+        {version, attacks: {attack_id: {attack_type, description, impact}}}
+    """
+    _, body, etag = attack_catalog_response()
+    return catalog_response(request, body, etag)
+
+
+@app.get("/history/timeline")
+async def security_timeline(
+    url: str = Query(..., min_length=3, max_length=500),
+    start: Optional[str] = Query(None, description="ISO timestamp, inclusive"),
+    end: Optional[str] = Query(None, description="ISO timestamp, inclusive"),
+    max_points: int = Query(100, ge=2, le=500)
+) -> Dict[str, Any]:
+    """
+    Security timeline for charting, downsampled to at most max_points.
+    
+    Points where SSL validity, missing headers or open ports change are always
+    kept; the rest of the budget preserves the shape of the risk score curve.
+    
+    Args:
+        url: Website URL
+        start: Optional start of the time range
+        end: Optional end of the time range
+        max_points: Maximum number of points to return
+    
+    Returns:
+        Downsampled timeline points
+    """
+    is_valid, result = validate_url(url)
+    if not is_valid:
+        raise HTTPException(status_code=400, detail=result)
+    
+    try:
+        timeline = get_security_timeline(
+            result, scan_tracker, start=start, end=end, max_points=max_points
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid start or end timestamp")
+    
+    return {
+        "url": result,
+        "points": timeline,
+        "point_count": len(timeline)
+    }
+
+
+@app.get("/history/drift")
+async def drift_between(
+    url: str = Query(..., min_length=3, max_length=500),
+    start: Optional[str] = Query(None, description="ISO timestamp of the baseline state"),
+    end: Optional[str] = Query(None, description="ISO timestamp of the compared state"),
+    from_scan: Optional[str] = Query(None, description="Scan id of the baseline state"),
+    to_scan: Optional[str] = Query(None, description="Scan id of the compared state")
+) -> Dict[str, Any]:
+    """
+    Security drift between two timestamps or two recorded scans.
+    
+    Args:
+        url: Website URL
+        start: Baseline timestamp (defaults to the first scan)
+        end: Compared timestamp (defaults to the latest scan)
+        from_scan: Baseline scan id (overrides start)
+        to_scan: Compared scan id (overrides end)
+    
+    Returns:
+        Drift report between the two resolved scans
+    """
+    is_valid, result = validate_url(url)
+    if not is_valid:
+        raise HTTPException(status_code=400, detail=result)
+    
+    try:
+        return scan_tracker.calculate_drift_between(
+            result, start=start, end=end, from_scan_id=from_scan, to_scan_id=to_scan
+        )
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid start or end timestamp")
+
+
+@app.get("/history/ports/first-seen")
+async def port_first_seen(
+    url: str = Query(..., min_length=3, max_length=500),
+    port: int = Query(..., ge=1, le=65535)
+) -> Dict[str, Any]:
+    """
+    When a port was first seen open for a URL.
+    
+    Args:
+        url: Website URL
+        port: Port number
+    
+    Returns:
+        First timestamp the port was observed open, or null if never
+    """
+    is_valid, result = validate_url(url)
+    if not is_valid:
+        raise HTTPException(status_code=400, detail=result)
+    
+    return {
+        "url": result,
+        "port": port,
+        "first_seen_open": scan_tracker.first_seen_open(result, port)
+    }
+
+
+@app.post("/ports/sweeps", status_code=202)
+async def start_port_sweep(
+    url: str = Query(..., min_length=3, max_length=500),
+    max_port: int = Query(65535, ge=1, le=65535)
+) -> Dict[str, Any]:
+    """
+    Start a background sweep of ports 1..max_port.
+    
+    Poll GET /ports/sweeps/{job_id} for progress; a sweep that runs out of
+    time budget pauses and can be resumed.
+    
+    Args:
+        url: Website URL to sweep
+        max_port: Last port to sweep (default: full range)
+    
+    Returns:
+        Job snapshot (the URL's running job if one is already in progress)
+    
+    Raises:
+        SweepCapacityExceeded: If PORT_SWEEP_MAX_ACTIVE sweeps are queued
+            or running (429 with Retry-After)
+    """
+    is_valid, result = validate_url(url)
+    if not is_valid:
+        raise HTTPException(status_code=400, detail=result)
+    
+    return port_sweep_jobs.start(result, max_port)
+
+
+@app.get("/ports/sweeps/{job_id}")
+async def port_sweep_status(job_id: str) -> Dict[str, Any]:
+    """
+    Progress and open ports found so far of a port sweep.
+    
+    Args:
+        job_id: Id returned by POST /ports/sweeps
+    
+    Returns:
+        Job snapshot
+    """
+    job = port_sweep_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown port sweep job: {job_id}")
+    return job
+
+
+@app.post("/ports/sweeps/{job_id}/resume", status_code=202)
+async def resume_port_sweep(job_id: str) -> Dict[str, Any]:
+    """
+    Resume a paused or failed port sweep from its next unswept port.
+    
+    Args:
+        job_id: Id returned by POST /ports/sweeps
+    
+    Returns:
+        Job snapshot
+    
+    Raises:
+        SweepCapacityExceeded: If PORT_SWEEP_MAX_ACTIVE sweeps are queued
+            or running (429 with Retry-After)
+    """
+    try:
+        return port_sweep_jobs.resume(job_id)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@app.get("/fleet/drift")
+async def fleet_drift(
+    category: str = Query("any", pattern="^(any|regressions|ssl_broken|new_ports)$"),
+    order: str = Query("desc", pattern="^(desc|asc)$"),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500)
+) -> Dict[str, Any]:
+    """
+    Fleet-wide drift dashboard.
+    
+    Lists hosts whose latest scan regressed, broke SSL or opened new ports,
+    sorted by severity and paginated.
+    
+    Args:
+        category: any, regressions, ssl_broken or new_ports
+        order: desc (most severe first) or asc
+        offset: Number of hosts to skip
+        limit: Page size
+    
+    Returns:
+        Page of fleet drift entries with the total count
+    """
+    return scan_tracker.get_fleet_drift(category=category, order=order, offset=offset, limit=limit)
+
+
+@app.post("/history/rescore")
+def rescore_history(
+    weights_version: Optional[str] = Query(None, description="Weight table version (defaults to current)")
+) -> Dict[str, Any]:
+    """
+    Recompute every stored risk score from raw findings, without rescanning.
+    
+    A plain def, so FastAPI runs it on its thread pool: rescoring holds the
+    history lock and rewrites the history file.
+    
+    Each record's context-aware score is recomputed under the weight table,
+    with the context and advanced mode it was recorded with.
+    
+    Args:
+        weights_version: Weight table version
+    
+    Returns:
+        Summary of the rescoring run
+    """
+    try:
+        return scan_tracker.rescore_history(weights_version=weights_version)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown weights version: {weights_version}")
+
+
 @app.get("/api/health-check")
 async def api_health():
     """Alternative health endpoint for load balancers."""
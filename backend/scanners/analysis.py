@@ -0,0 +1,122 @@
+"""
+Analysis Stage Module
+Runs the pure, findings-only analysis on raw scanner output: context-aware
+scoring, attacker/defender views, fixes and response layers.
+"""
+
+from typing import Dict, Any, Iterable, Optional, FrozenSet, Union
+
+from .findings import findings_from_scan
+from .result_model import ScanResult
+from .context_risk_scoring import risk_for_findings, recommendations_for_findings
+from .attacker_defender_analysis import attacker_view_for_findings, defender_view_for_findings
+from .fix_engine import fix_snippets_for_findings
+from .response_layers import generate_executive_layer, generate_technical_layer, generate_raw_layer
+
+
+# Layers run_analysis can build; risk_score and recommendations are always included
+VIEWS = ("executive", "technical", "attacker", "defender", "fixes", "raw")
+
+
+def parse_views(views: Optional[str]) -> Optional[FrozenSet[str]]:
+    """
+    Parse a comma-separated views/fields query value.
+
+    Args:
+        views: e.g. "executive,fixes" (None or empty = defaults)
+
+    Returns:
+        Set of view names, or None for the defaults
+
+    Raises:
+        ValueError: If a view name is unknown
+    """
+    if not views:
+        return None
+    requested = frozenset(v.strip().lower() for v in views.split(",") if v.strip())
+    unknown = requested - set(VIEWS)
+    if unknown:
+        raise ValueError(f"Unknown view(s): {', '.join(sorted(unknown))}. Valid views: {', '.join(VIEWS)}")
+    return requested
+
+
+def default_views(mode: str = "both", include_fixes: bool = True) -> FrozenSet[str]:
+    """Views built when none are requested: both summary layers plus mode/fixes."""
+    views = {"executive", "technical"}
+    if mode in ("attacker", "both"):
+        views.add("attacker")
+    if mode in ("defender", "both"):
+        views.add("defender")
+    if include_fixes:
+        views.add("fixes")
+    return frozenset(views)
+
+
+def run_analysis(
+    scan_data: Union[ScanResult, Dict[str, Any]],
+    site_context: str = "marketing",
+    advanced: bool = False,
+    mode: str = "both",
+    include_fixes: bool = True,
+    views: Optional[Iterable[str]] = None,
+    inline_fixes: bool = False,
+    fix_framework: Optional[str] = None,
+    inline_attacks: bool = False
+) -> Dict[str, Any]:
+    """
+    Analyze stored scan results without touching the network.
+
+    Only the requested views are built.
+
+    Args:
+        scan_data: ScanResult, or raw scan dict (url, scan_timestamp, ssl, headers, ports)
+        site_context: Site context (marketing, authentication, ecommerce, internal)
+        advanced: Apply advanced-mode penalties
+        mode: attacker, defender or both (ignored when views is given)
+        include_fixes: Include actionable fix snippets (ignored when views is given)
+        views: Layers to build (see VIEWS); defaults to default_views(mode, include_fixes)
+        inline_fixes: Inline fix snippet bodies instead of catalog ids only
+        fix_framework: Only inline this framework's header snippets
+        inline_attacks: Inline attack descriptions instead of catalog ids only
+
+    Returns:
+        Context-aware risk, recommendations and the requested layers
+    """
+    views = frozenset(views) if views is not None else default_views(mode, include_fixes)
+
+    # Normalize once; every stage below reads the same findings
+    if isinstance(scan_data, ScanResult):
+        findings = scan_data.findings()
+        if views & {"executive", "technical", "raw"}:
+            scan_data = scan_data.to_dict()
+        else:
+            scan_data = {"url": scan_data.url, "scan_timestamp": scan_data.scan_timestamp}
+    else:
+        findings = findings_from_scan(scan_data)
+
+    risk = risk_for_findings(findings, site_context, advanced)
+
+    analysis = {
+        "url": scan_data.get("url"),
+        "scan_timestamp": scan_data.get("scan_timestamp"),
+        "site_context": risk["site_context"],
+        "advanced": advanced,
+        "views": [view for view in VIEWS if view in views],
+        "risk_score": risk,
+        "recommendations": recommendations_for_findings(risk["site_context"], findings)
+    }
+
+    if "attacker" in views:
+        analysis["attacker_view"] = attacker_view_for_findings(findings, risk["score"], inline_attacks)
+    if "defender" in views:
+        analysis["defender_view"] = defender_view_for_findings(findings, risk["score"], risk["site_context"])
+    if "fixes" in views:
+        analysis["fixes"] = fix_snippets_for_findings(findings, inline_fixes, fix_framework)
+    if "executive" in views:
+        analysis["executive_view"] = generate_executive_layer(scan_data, risk)
+    if "technical" in views:
+        analysis["technical_view"] = generate_technical_layer(scan_data, risk)
+    if "raw" in views:
+        analysis["raw"] = generate_raw_layer(scan_data)
+
+    return analysis
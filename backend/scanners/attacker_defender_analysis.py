@@ -3,8 +3,16 @@ Attacker vs Defender Analysis Module
 Provides two perspectives on security findings: attacker exploitation view vs defender remediation view.
 """
 
+import hashlib
+import json
+from functools import lru_cache
 from typing import Dict, List, Any
 
+from .findings import ScanFindings, normalize_findings
+
+
+# Bump whenever ATTACK_MAPPINGS or PORT_EXPLOITS change so clients refetch the catalog
+ATTACK_CATALOG_VERSION = "2024.1"
 
 # Mapping of issues to attack types
 ATTACK_MAPPINGS = {
@@ -97,6 +105,49 @@ SSL_ATTACKS = {
 }
 
 
+def header_attack_id(header_name: str) -> str:
+    """Catalog id of the attack enabled by a missing header."""
+    return f"header:{header_name}"
+
+
+def port_attack_id(port: int) -> str:
+    """Catalog id of the attack on an open port."""
+    return f"port:{port}"
+
+
+def _header_attack_entry(header_name: str) -> Dict[str, Any]:
+    mapping = ATTACK_MAPPINGS[header_name]
+    return {
+        "attack_type": mapping["attack_type"],
+        "description": mapping["exploit_description"],
+        "impact": mapping["impact"]
+    }
+
+
+def _port_attack_entry(port: int) -> Dict[str, Any]:
+    exploit = PORT_EXPLOITS[port]
+    return {
+        "attack_type": exploit["attack_type"],
+        "description": exploit["exploit"],
+        "impact": exploit["impact"]
+    }
+
+
+@lru_cache(maxsize=None)
+def attack_catalog_response() -> tuple:
+    """(catalog, serialized JSON bytes, ETag) of the attack descriptions; built once."""
+    catalog = {
+        "version": ATTACK_CATALOG_VERSION,
+        "attacks": {
+            **{header_attack_id(name): _header_attack_entry(name) for name in ATTACK_MAPPINGS},
+            **{port_attack_id(port): _port_attack_entry(port) for port in PORT_EXPLOITS}
+        }
+    }
+    body = json.dumps(catalog, separators=(",", ":")).encode("utf-8")
+    etag = f'"{ATTACK_CATALOG_VERSION}-{hashlib.sha256(body).hexdigest()[:16]}"'
+    return catalog, body, etag
+
+
 def generate_attacker_view(
     ssl_data: Dict[str, Any],
     headers_data: Dict[str, Any],
@@ -116,11 +167,25 @@ def generate_attacker_view(
     Returns:
         Attacker-perspective analysis with attack vectors and exploitation paths
     """
+    return attacker_view_for_findings(normalize_findings(ssl_data, headers_data, ports_data), risk_score, inline=True)
+
+
+def attacker_view_for_findings(findings: ScanFindings, risk_score: float, inline: bool = False) -> Dict[str, Any]:
+    """
+    Attacker perspective for normalized findings.
+    
+    Header and port attack vectors reference ATTACK_MAPPINGS and
+    PORT_EXPLOITS by attack_id; their text is served once by
+    GET /attacks/catalog.
     
-    # Defensive defaults
-    ssl_data = ssl_data or {}
-    headers_data = headers_data or {}
-    ports_data = ports_data or {}
+    Args:
+        findings: Normalized scan findings
+        risk_score: Overall risk score
+        inline: Include attack_type, description and impact as well
+    
+    Returns:
+        Attacker-perspective analysis with attack vectors and exploitation paths
+    """
     try:
         risk_score = float(risk_score or 0)
     except Exception:
@@ -130,7 +195,7 @@ def generate_attacker_view(
     exploitation_paths = []
     
     # SSL/TLS vulnerabilities
-    if not ssl_data.get('is_valid', False):
+    if not findings.ssl_valid:
         attack_vectors.append({
             "severity": "CRITICAL",
             "attack_type": SSL_ATTACKS["missing_ssl"]["attack_type"],
@@ -140,39 +205,30 @@ def generate_attacker_view(
         })
         exploitation_paths.append("Setup malicious WiFi hotspot → intercept credentials → compromise user account")
     
-    try:
-        expires_in_days = int(ssl_data.get('expires_in_days', 365) or 365)
-    except Exception:
-        expires_in_days = 365
-    if 0 < expires_in_days < 30:
+    if findings.ssl_expiring:
         attack_vectors.append({
             "severity": "HIGH",
             "attack_type": "SSL Certificate Expiration",
-            "description": f"Certificate expires in {expires_in_days} days. Attacker can replace with spoofed cert.",
+            "description": f"Certificate expires in {findings.expires_in_days} days. Attacker can replace with spoofed cert.",
             "impact": "Temporary window for successful MITM attacks",
             "ease_of_exploitation": "Medium"
         })
     
-    # Missing security headers - normalize input
-    missing_headers = headers_data.get('missing_headers') or headers_data.get('missing') or []
-    if not isinstance(missing_headers, list):
-        missing_headers = []
+    # Missing security headers
     header_exploits = {}
 
-    for header in missing_headers:
-        header_name = header.get('name') if isinstance(header, dict) else (str(header) if header else '')
-        header_name = header_name or ''
+    for header_name in findings.missing_headers:
         if header_name in ATTACK_MAPPINGS:
             mapping = ATTACK_MAPPINGS[header_name]
             header_exploits[header_name] = mapping
             
-            attack_vectors.append({
+            vector = _header_attack_entry(header_name) if inline else {}
+            vector.update({
+                "attack_id": header_attack_id(header_name),
                 "severity": "HIGH",
-                "attack_type": mapping.get("attack_type"),
-                "description": mapping.get("exploit_description"),
-                "impact": mapping.get("impact"),
                 "ease_of_exploitation": "Medium" if mapping.get("likelihood") == "High" else "Hard"
             })
+            attack_vectors.append(vector)
     
     # Add exploitation path for XSS if CSP missing
     if header_exploits.get("Content-Security-Policy"):
@@ -182,28 +238,20 @@ def generate_attacker_view(
     if header_exploits.get("X-Frame-Options"):
         exploitation_paths.append("Create fake login form overlay → trick user into entering credentials → harvest credentials")
     
-    # Open ports vulnerabilities - normalize
-    open_ports = ports_data.get('open_ports') or ports_data.get('ports') or []
-    if not isinstance(open_ports, list):
-        open_ports = []
+    # Open ports vulnerabilities
     dangerous_ports_found = []
     
-    for port_info in open_ports:
-        try:
-            port = port_info.get('port') if isinstance(port_info, dict) else int(port_info)
-        except Exception:
-            continue
+    for port in findings.open_ports:
         if port in PORT_EXPLOITS:
-            exploit = PORT_EXPLOITS[port]
             dangerous_ports_found.append(port)
             
-            attack_vectors.append({
+            vector = _port_attack_entry(port) if inline else {}
+            vector.update({
+                "attack_id": port_attack_id(port),
                 "severity": "CRITICAL",
-                "attack_type": exploit.get("attack_type"),
-                "description": exploit.get("exploit"),
-                "impact": exploit.get("impact"),
                 "ease_of_exploitation": "Easy" if port in [27017, 3306, 5432] else "Medium"
             })
+            attack_vectors.append(vector)
     
     if dangerous_ports_found:
         ports_str = ", ".join(map(str, dangerous_ports_found))
@@ -251,11 +299,25 @@ def generate_defender_view(
     Returns:
         Defender-perspective remediation plan with prioritized fixes
     """
+    return defender_view_for_findings(normalize_findings(ssl_data, headers_data, ports_data), risk_score, site_context)
+
+
+def defender_view_for_findings(
+    findings: ScanFindings,
+    risk_score: float,
+    site_context: str = "marketing"
+) -> Dict[str, Any]:
+    """
+    Defender perspective for normalized findings.
+    
+    Args:
+        findings: Normalized scan findings
+        risk_score: Overall risk score
+        site_context: Site context for prioritization
     
-    # Defensive defaults and normalization
-    ssl_data = ssl_data or {}
-    headers_data = headers_data or {}
-    ports_data = ports_data or {}
+    Returns:
+        Defender-perspective remediation plan with prioritized fixes
+    """
     try:
         risk_score = float(risk_score or 0)
     except Exception:
@@ -276,7 +338,7 @@ def generate_defender_view(
     priority_order = context_priorities.get(site_context, ["SSL/TLS", "CSP", "Ports"])
     
     # SSL/TLS fixes
-    if not ssl_data.get('is_valid', False):
+    if not findings.ssl_valid:
         fixes.append({
             "priority": 1,
             "category": "SSL/TLS",
@@ -287,22 +349,15 @@ def generate_defender_view(
             "tools": ["Let's Encrypt", "Certbot", "AWS Certificate Manager"]
         })
         impact_reductions.append(f"Fixes SSL/TLS: Risk score would improve by ~40 points")
-    else:
-        try:
-            expires_in_days = int(ssl_data.get('expires_in_days', 365) or 365)
-        except Exception:
-            expires_in_days = 365
-        if 0 < expires_in_days < 30:
-            quick_wins.append({
-                "action": "Renew SSL certificate",
-                "timeline": "Within 30 days",
-                "effort": "Very Low (10 mins)"
-            })
+    elif findings.ssl_expiring:
+        quick_wins.append({
+            "action": "Renew SSL certificate",
+            "timeline": "Within 30 days",
+            "effort": "Very Low (10 mins)"
+        })
     
     # Security headers fixes
-    missing_headers = headers_data.get('missing_headers') or headers_data.get('missing') or []
-    if not isinstance(missing_headers, list):
-        missing_headers = []
+    missing_headers = findings.missing_headers
     header_priority_map = {h: i for i, h in enumerate([
         "Content-Security-Policy",
         "Strict-Transport-Security",
@@ -310,9 +365,7 @@ def generate_defender_view(
         "X-Content-Type-Options"
     ])}
     
-    for idx, header in enumerate(missing_headers):
-        header_name = header.get('name') if isinstance(header, dict) else (str(header) if header else '')
-        header_name = header_name or ''
+    for header_name in missing_headers:
         header_priority = header_priority_map.get(header_name, 5)
 
         fixes.append({
@@ -326,19 +379,26 @@ def generate_defender_view(
             "config_example": get_header_config_snippet(header_name)
         })
     
+    # Present but ineffective headers (failed value policy)
+    for header_name, issues in findings.weak_headers:
+        fixes.append({
+            "priority": 2 + header_priority_map.get(header_name, 5),
+            "category": "Security Headers",
+            "header": header_name,
+            "issue": f"Weak {header_name}: {issues[0] if issues else 'value fails policy'}",
+            "fix": f"Tighten the '{header_name}' value",
+            "effort": "Low (10-20 mins)",
+            "impact_reduction": f"Restores protection against {ATTACK_MAPPINGS.get(header_name, {}).get('attack_type', 'various attacks')}",
+            "config_example": get_header_config_snippet(header_name)
+        })
+    
     if missing_headers:
         reduction_count = len(missing_headers) * 5
         impact_reductions.append(f"Fixes all headers: Risk score would improve by ~{reduction_count} points")
     
     # Open ports fixes
-    open_ports = ports_data.get('open_ports') or ports_data.get('ports') or []
-    if not isinstance(open_ports, list):
-        open_ports = []
-    for port_info in open_ports:
-        try:
-            port = port_info.get('port') if isinstance(port_info, dict) else int(port_info)
-        except Exception:
-            continue
+    open_ports = findings.open_ports
+    for port in open_ports:
         if port in PORT_EXPLOITS:
             exploit = PORT_EXPLOITS[port]
             
@@ -354,12 +414,12 @@ def generate_defender_view(
             })
     
     if open_ports:
-        dangerous = [p for p in open_ports if (isinstance(p, dict) and p.get('port') in PORT_EXPLOITS) or (isinstance(p, int) and p in PORT_EXPLOITS)]
+        dangerous = [p for p in open_ports if p in PORT_EXPLOITS]
         if dangerous:
             impact_reductions.append(f"Closes {len(dangerous)} dangerous ports: Risk score would improve by ~{len(dangerous) * 3} points")
     
     # Quick wins (high impact, low effort)
-    if not ssl_data.get('is_valid', False) and len(missing_headers) == 0 and len(open_ports) == 0:
+    if not findings.ssl_valid and len(missing_headers) == 0 and len(open_ports) == 0:
         quick_wins.append({
             "action": "Site is already well-configured!",
             "timeline": "Maintain current state",
@@ -384,7 +444,7 @@ def generate_defender_view(
 def get_header_config_snippet(header_name: str) -> str:
     """Generate configuration snippet for adding header."""
     snippets = {
-        "Content-Security-Policy": "default-src 'self'; script-src 'self' 'unsafe-inline' https://trusted.cdn; style-src 'self' 'unsafe-inline'",
+        "Content-Security-Policy": "default-src 'self'; script-src 'self' 'nonce-<per-request-random>'; style-src 'self'; object-src 'none'; base-uri 'self'; frame-ancestors 'self'",
         "Strict-Transport-Security": "max-age=31536000; includeSubDomains; preload",
         "X-Frame-Options": "SAMEORIGIN",
         "X-Content-Type-Options": "nosniff"
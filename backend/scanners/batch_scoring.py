@@ -0,0 +1,271 @@
+"""
+Batch Risk Scoring Module
+Scores many scans at once with NumPy, matching calculate_risk_score and
+calculate_context_aware_risk exactly.
+"""
+
+from typing import Dict, Any, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .context_risk_scoring import SiteContext, WEIGHTS_VERSION, UNKNOWN_PORT_DANGER, get_weight_table
+from .findings import normalize_findings
+from .risk_score import is_dangerous_port
+
+CONTEXT_CODES = {context.value: code for code, context in enumerate(SiteContext)}
+
+PAD = -1
+
+
+class ScanFeatureMatrix:
+    """
+    Compact per-scan features for N scans.
+
+    Missing headers and open ports are kept as padded code matrices in their
+    original order so deductions can be summed column by column, which gives
+    bit-identical floats to the scalar scorers. Codes index into per-matrix
+    vocabularies (header_names, port_values of (port, identified service)),
+    so the same features can be scored under any weight table version.
+    """
+
+    def __init__(self, scans: Sequence[Dict[str, Any]]):
+        n = len(scans)
+        self.size = n
+        self.ssl_valid = np.zeros(n, dtype=bool)
+        self.expires_in_days = np.full(n, 365, dtype=np.int64)       # context-aware semantics
+        self.basic_expires_in_days = np.full(n, 365.0)               # basic scorer semantics
+        self.missing_count = np.zeros(n, dtype=np.int64)             # headers_data['missing_count']
+        self.basic_ports_total = np.zeros(n, dtype=np.int64)
+        self.basic_ports_dangerous = np.zeros(n, dtype=np.int64)
+
+        header_rows: List[List[int]] = []
+        port_rows: List[List[int]] = []
+        header_vocab: Dict[str, int] = {}
+        port_vocab: Dict[Tuple[Any, Optional[str]], int] = {}
+
+        for i, scan in enumerate(scans):
+            ssl_data = scan.get("ssl") or {}
+            headers_data = scan.get("headers") or {}
+            ports_data = scan.get("ports") or {}
+
+            findings = normalize_findings(ssl_data, headers_data, ports_data)
+            self.ssl_valid[i] = findings.ssl_valid
+            self.expires_in_days[i] = findings.expires_in_days
+            basic_expiry = ssl_data.get("expires_in_days", 365)
+            if isinstance(basic_expiry, (int, float)):
+                self.basic_expires_in_days[i] = basic_expiry
+            self.missing_count[i] = headers_data.get("missing_count", 0) or 0
+
+            identified = dict(findings.services)
+            for port_info in ports_data.get("open_ports", []) or []:
+                if isinstance(port_info, dict):
+                    self.basic_ports_total[i] += 1
+                    if is_dangerous_port(port_info.get("port"), identified):
+                        self.basic_ports_dangerous[i] += 1
+
+            header_rows.append([header_vocab.setdefault(name, len(header_vocab)) for name in findings.missing_headers])
+            port_rows.append([
+                port_vocab.setdefault((port, identified.get(port)), len(port_vocab))
+                for port in findings.open_ports
+            ])
+
+        self.header_names = list(header_vocab)
+        self.port_values = list(port_vocab)
+        self.header_codes = _pad(header_rows)
+        self.port_codes = _pad(port_rows)
+        self.header_count = np.array([len(r) for r in header_rows], dtype=np.int64)
+
+
+def _pad(rows: List[List[int]]) -> np.ndarray:
+    """Pack ragged code lists into an (N, max_len) matrix padded with PAD."""
+    width = max((len(r) for r in rows), default=0)
+    matrix = np.full((len(rows), width), PAD, dtype=np.int32)
+    for i, row in enumerate(rows):
+        matrix[i, :len(row)] = row
+    return matrix
+
+
+def build_feature_matrix(scans: Sequence[Dict[str, Any]]) -> ScanFeatureMatrix:
+    """
+    Build the feature matrix for a list of scans.
+
+    Args:
+        scans: Scan results, each with ssl, headers and ports sections
+
+    Returns:
+        ScanFeatureMatrix for the scans
+    """
+    return ScanFeatureMatrix(scans)
+
+
+def _risk_levels(score: np.ndarray, labels: Sequence[str]) -> np.ndarray:
+    """Map scores to risk labels using the shared 80/60/40 thresholds."""
+    return np.select(
+        [score >= 80, score >= 60, score >= 40],
+        list(labels[:3]),
+        default=labels[3]
+    )
+
+
+def batch_risk_score(features: ScanFeatureMatrix) -> Dict[str, np.ndarray]:
+    """
+    Vectorized equivalent of calculate_risk_score.
+
+    Args:
+        features: Feature matrix built by build_feature_matrix
+
+    Returns:
+        Arrays of score, risk_level and per-category deductions
+    """
+    expiring = (features.basic_expires_in_days < 30) & (features.basic_expires_in_days > 0)
+    ssl_deduction = np.where(~features.ssl_valid, 40, np.where(expiring, 10, 0))
+    headers_deduction = features.missing_count * 5
+    ports_deduction = features.basic_ports_dangerous * 3 + (features.basic_ports_total - features.basic_ports_dangerous) * 2
+
+    score = np.clip(100 - ssl_deduction - headers_deduction - ports_deduction, 0, 100)
+
+    return {
+        "score": score,
+        "risk_level": _risk_levels(score, ["Low", "Medium", "High", "Critical"]),
+        "ssl_deduction": ssl_deduction,
+        "headers_deduction": headers_deduction,
+        "ports_deduction": ports_deduction
+    }
+
+
+def _port_danger(dangerous_ports: Dict[int, Dict[str, Any]], port: Any, service: Optional[str]) -> Dict[str, Any]:
+    """Danger entry for a port, falling back to its banner-identified service (like the scalar scorer)."""
+    entry = dangerous_ports.get(port)
+    if entry is None and service is not None:
+        entry = next((info for info in dangerous_ports.values() if info.get("name") == service), None)
+        if entry is not None:
+            entry = {**entry, "base_danger": max(entry.get("base_danger", UNKNOWN_PORT_DANGER), UNKNOWN_PORT_DANGER)}
+    return entry or {}
+
+
+def _context_tables(
+    features: ScanFeatureMatrix,
+    context: str,
+    weight_table: Dict[str, Any]
+) -> Dict[str, np.ndarray]:
+    """Per-code deduction tables for one site context, computed like the scalar scorer."""
+    header_weights = weight_table["header_weights"]
+    dangerous_ports = weight_table["dangerous_ports"]
+    multiplier = weight_table["port_danger_multipliers"].get(context, 0.5)
+
+    header_table = [
+        float(5 * (header_weights.get(name, {}).get(context, 0.5) or 0.5))
+        for name in features.header_names
+    ]
+    port_table = [
+        float((_port_danger(dangerous_ports, port, service).get("base_danger", UNKNOWN_PORT_DANGER) * 3) * (multiplier or 1.0))
+        for port, service in features.port_values
+    ]
+    # PAD (-1) indexes the trailing zero, so padding adds exactly 0.0
+    return {"headers": np.array(header_table + [0.0]), "ports": np.array(port_table + [0.0])}
+
+
+def batch_context_aware_risk(
+    features: ScanFeatureMatrix,
+    site_context: Union[str, Sequence[str]] = "marketing",
+    advanced: bool = False,
+    weights_version: Optional[str] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Vectorized equivalent of calculate_context_aware_risk.
+
+    Args:
+        features: Feature matrix built by build_feature_matrix
+        site_context: One context for all scans, or one per scan
+        advanced: Apply advanced-mode combination penalties
+        weights_version: Weight table version (defaults to WEIGHTS_VERSION)
+
+    Returns:
+        Arrays of score (rounded like the scalar scorer), risk_level and
+        per-category deductions
+    """
+    n = features.size
+    if isinstance(site_context, str):
+        contexts = [site_context] * n
+    else:
+        contexts = list(site_context)
+    context_codes = np.array(
+        [CONTEXT_CODES.get(c, CONTEXT_CODES[SiteContext.MARKETING.value]) for c in contexts],
+        dtype=np.int64
+    )
+
+    weight_table = get_weight_table(weights_version)
+    tables = [_context_tables(features, context.value, weight_table) for context in SiteContext]
+    header_tables = np.stack([t["headers"] for t in tables])
+    port_tables = np.stack([t["ports"] for t in tables])
+
+    expiring = (features.expires_in_days > 0) & (features.expires_in_days < 30)
+    ssl_deduction = np.where(~features.ssl_valid, 40, np.where(expiring, 10, 0))
+
+    headers_deduction = np.zeros(n)
+    for j in range(features.header_codes.shape[1]):
+        column = features.header_codes[:, j]
+        headers_deduction = headers_deduction + header_tables[context_codes, column]
+
+    ports_deduction = np.zeros(n)
+    for j in range(features.port_codes.shape[1]):
+        column = features.port_codes[:, j]
+        ports_deduction = ports_deduction + port_tables[context_codes, column]
+
+    score = np.full(n, 100.0)
+    score = score - ssl_deduction
+    score = score - headers_deduction
+    score = score - ports_deduction
+
+    advanced_deduction = np.zeros(n, dtype=np.int64)
+    if advanced:
+        missing_count = features.header_count
+        combo_penalty = np.where(missing_count >= 2, np.minimum(15, 5 * (missing_count - 1)), 0)
+
+        names = features.header_names
+        csp = names.index("Content-Security-Policy") if "Content-Security-Policy" in names else PAD
+        hsts = names.index("Strict-Transport-Security") if "Strict-Transport-Security" in names else PAD
+        has_csp = (features.header_codes == csp).any(axis=1) & (csp != PAD)
+        has_hsts = (features.header_codes == hsts).any(axis=1) & (hsts != PAD)
+        chain_penalty = np.where(has_csp & has_hsts, 10, 0)
+
+        dangerous_codes = np.array(
+            [bool(_port_danger(weight_table["dangerous_ports"], port, service)) for port, service in features.port_values]
+            + [False]
+        )
+        dangerous_open = dangerous_codes[features.port_codes].sum(axis=1)
+        corr_penalty = np.where((dangerous_open > 0) & (missing_count > 0), np.minimum(20, 5 * dangerous_open), 0)
+
+        score = score - combo_penalty
+        score = score - chain_penalty
+        score = score - corr_penalty
+        advanced_deduction = combo_penalty + chain_penalty + corr_penalty
+
+    score = np.clip(score, 0, 100)
+    risk_level = _risk_levels(score, ["LOW", "MEDIUM", "HIGH", "CRITICAL"])
+    rounded = np.array([round(value, 2) for value in score.tolist()])
+
+    return {
+        "score": rounded,
+        "risk_level": risk_level,
+        "site_context": np.array([c.value for c in SiteContext])[context_codes],
+        "weights_version": np.full(n, weights_version or WEIGHTS_VERSION),
+        "ssl_deduction": ssl_deduction,
+        "headers_deduction": headers_deduction,
+        "ports_deduction": ports_deduction,
+        "advanced_deduction": advanced_deduction
+    }
+
+
+def batch_results_to_records(results: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+    """
+    Convert batch result arrays into one plain dict per scan.
+
+    Args:
+        results: Output of batch_risk_score or batch_context_aware_risk
+
+    Returns:
+        List of JSON-serializable dicts
+    """
+    columns = {key: values.tolist() for key, values in results.items()}
+    return [dict(zip(columns, row)) for row in zip(*columns.values())]
@@ -0,0 +1,242 @@
+"""
+Circuit Breaker Module
+Fails scanner checks fast while a host is timing out.
+
+Each (host, scanner) pair has its own breaker: after failure_threshold
+consecutive failures it opens and the check returns immediately with an
+error result of the scanner's usual shape. After reset_seconds one
+half-open probe is let through; success closes the breaker, failure opens
+it again. A partial outage (e.g. HTTPS down, ports still answering) only
+trips the scanners that are actually failing.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Any, Callable, Optional, Tuple
+
+from .headers_check import REQUIRED_HEADERS
+
+
+DEFAULT_FAILURE_THRESHOLD = 3
+DEFAULT_RESET_SECONDS = 30
+DEFAULT_MAX_ENTRIES = 10000
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def ssl_failed(result: Dict[str, Any]) -> bool:
+    """check_ssl timed out."""
+    return result.get("error") == "Connection timeout"
+
+
+def headers_failed(result: Dict[str, Any]) -> bool:
+    """check_headers timed out or couldn't connect."""
+    return result.get("error") in ("Request timeout", "Connection error")
+
+
+def ports_failed(result: Dict[str, Any]) -> bool:
+    """check_ports errored (a host with every port closed or filtered is a finding, not a failure)."""
+    return "error" in result
+
+
+def ssl_open_result(message: str) -> Dict[str, Any]:
+    """check_ssl result while its breaker is open."""
+    return {
+        "is_valid": False,
+        "error": message,
+        "issued_to": "Unknown",
+        "issued_by": "Unknown",
+        "expires_in_days": -1,
+        "warning": "Unable to verify SSL",
+        "protocol_version": None,
+        "cipher": None
+    }
+
+
+def headers_open_result(message: str) -> Dict[str, Any]:
+    """check_headers result while its breaker is open."""
+    return {
+        "present_headers": [],
+        "missing_headers": [{"name": h, "description": REQUIRED_HEADERS[h]} for h in REQUIRED_HEADERS],
+        "headers_score": 0,
+        "missing_count": len(REQUIRED_HEADERS),
+        "error": message
+    }
+
+
+def ports_open_result(message: str) -> Dict[str, Any]:
+    """check_ports result while its breaker is open."""
+    return {
+        "open_ports": [],
+        "total_scanned": 0,
+        "error": message
+    }
+
+
+def short_circuited(*results: Dict[str, Any]) -> bool:
+    """True if any scanner result was returned by an open breaker instead of a real check."""
+    return any("circuit" in result for result in results)
+
+
+def circuit_notice(**results: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Skip notice for a scan whose checks were short-circuited.
+
+    Args:
+        **results: Scanner name -> result (e.g. ssl=..., headers=..., ports=...)
+
+    Returns:
+        {skipped, reason, circuits, retry_after, message}, circuits keyed
+        by the scanners whose breaker is open
+    """
+    open_results = {name: result for name, result in results.items() if "circuit" in result}
+    return {
+        "skipped": True,
+        "reason": "Circuit open",
+        "circuits": {name: result["circuit"] for name, result in open_results.items()},
+        "retry_after": max(result["circuit"]["retry_after"] for result in open_results.values()),
+        "message": "; ".join(result["error"] for result in open_results.values())
+    }
+
+
+# scanner -> (is the result a failure, result to return while open)
+SCANNERS = {
+    "ssl": (ssl_failed, ssl_open_result),
+    "headers": (headers_failed, headers_open_result),
+    "ports": (ports_failed, ports_open_result),
+}
+
+
+class _Breaker:
+    """State of one (host, scanner) breaker."""
+
+    __slots__ = ("state", "failures", "opened_at", "probing")
+
+    def __init__(self):
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+
+
+class CircuitBreakers:
+    """
+    Bounded registry of per-host, per-scanner circuit breakers.
+
+    Only one half-open probe per breaker is in flight at a time; other
+    checks keep failing fast until it finishes.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        reset_seconds: float = DEFAULT_RESET_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.max_entries = max_entries
+        self.short_circuits = 0
+        self._breakers: "OrderedDict[Tuple[str, str], _Breaker]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "CircuitBreakers":
+        """Build a registry from CIRCUIT_BREAKER_FAILURES, CIRCUIT_BREAKER_RESET_SECONDS and CIRCUIT_BREAKER_MAX_ENTRIES."""
+        return cls(
+            failure_threshold=int(os.getenv("CIRCUIT_BREAKER_FAILURES", DEFAULT_FAILURE_THRESHOLD)),
+            reset_seconds=float(os.getenv("CIRCUIT_BREAKER_RESET_SECONDS", DEFAULT_RESET_SECONDS)),
+            max_entries=int(os.getenv("CIRCUIT_BREAKER_MAX_ENTRIES", DEFAULT_MAX_ENTRIES))
+        )
+
+    def _acquire(self, key: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+        """
+        Let a check through, or describe the open breaker that stops it.
+
+        Moves an expired open breaker to half-open and lets this caller
+        make the probe.
+        """
+        with self._lock:
+            breaker = self._breakers.get(key)
+            if breaker is None or breaker.state == CLOSED:
+                return None
+            self._breakers.move_to_end(key)
+            now = time.time()
+            if breaker.state == OPEN and now - breaker.opened_at >= self.reset_seconds:
+                breaker.state = HALF_OPEN
+            if breaker.state == HALF_OPEN and not breaker.probing:
+                breaker.probing = True
+                return None
+            self.short_circuits += 1
+            return {
+                "state": breaker.state,
+                "failures": breaker.failures,
+                "opened_at": datetime.utcfromtimestamp(breaker.opened_at).isoformat(),
+                "retry_after": datetime.utcfromtimestamp(breaker.opened_at + self.reset_seconds).isoformat()
+            }
+
+    def _record(self, key: Tuple[str, str], failed: bool) -> None:
+        """Close the breaker on success; count the failure and open it if due."""
+        with self._lock:
+            breaker = self._breakers.get(key)
+            if not failed:
+                if breaker is not None:
+                    del self._breakers[key]
+                return
+            if breaker is None:
+                breaker = self._breakers[key] = _Breaker()
+                while len(self._breakers) > self.max_entries:
+                    self._breakers.popitem(last=False)
+            breaker.failures += 1
+            if breaker.state == HALF_OPEN or breaker.failures >= self.failure_threshold:
+                breaker.state = OPEN
+                breaker.opened_at = time.time()
+            breaker.probing = False
+
+    def call(self, host: str, scanner: str, check: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Run a scanner check behind the host's breaker for that scanner.
+
+        Args:
+            host: Normalized hostname
+            scanner: "ssl", "headers" or "ports" (see SCANNERS)
+            check: Runs the check and returns its result
+
+        Returns:
+            The check's result, or while the breaker is open an error result
+            of the same shape with a circuit entry {state, failures,
+            opened_at, retry_after}
+        """
+        is_failure, open_result = SCANNERS[scanner]
+        key = (host, scanner)
+        circuit = self._acquire(key)
+        if circuit is not None:
+            result = open_result(f"Skipped: {scanner} checks of {host} are failing, circuit open since {circuit['opened_at']}")
+            result["circuit"] = circuit
+            return result
+
+        failed = True
+        try:
+            result = check()
+            failed = is_failure(result)
+            return result
+        finally:
+            self._record(key, failed)
+
+    def stats(self) -> Dict[str, Any]:
+        """Breakers currently tracked, open, and checks short-circuited so far."""
+        with self._lock:
+            return {
+                "tracked": len(self._breakers),
+                "open": sum(1 for breaker in self._breakers.values() if breaker.state != CLOSED),
+                "short_circuits": self.short_circuits
+            }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._breakers)
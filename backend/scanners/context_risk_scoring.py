@@ -3,8 +3,11 @@ Context-Aware Risk Scoring Module
 Dynamically adjusts risk score weights based on site context (marketing, authentication, ecommerce, internal).
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from enum import Enum
+from functools import lru_cache
+
+from .findings import ScanFindings, normalize_findings
 
 
 class SiteContext(str, Enum):
@@ -43,8 +46,8 @@ HEADER_WEIGHTS = {
     },
 }
 
-# Context-specific port danger weights
-DANGEROUS_PORTS = {
+# Context-specific port danger weights (2024.1 table, kept for rescoring)
+DANGEROUS_PORTS_2024_1 = {
     21: {"name": "FTP", "base_danger": 1.0},
     22: {"name": "SSH", "base_danger": 0.7},
     23: {"name": "Telnet", "base_danger": 1.0},
@@ -56,37 +59,260 @@ DANGEROUS_PORTS = {
     5900: {"name": "VNC", "base_danger": 0.8},
 }
 
+# Names double as service ids: a banner-identified service on another port
+# is scored like the entry with the same name (see service_fingerprint), but
+# never below UNKNOWN_PORT_DANGER: identifying a service must not make it cheaper
+DANGEROUS_PORTS = {
+    **DANGEROUS_PORTS_2024_1,
+    6379: {"name": "Redis", "base_danger": 2.0},
+}
 
-def calculate_context_aware_risk(
-    ssl_data: Dict[str, Any],
-    headers_data: Dict[str, Any],
-    ports_data: Dict[str, Any],
-    site_context: str = "marketing",
-    advanced: bool = False
+# Danger of an open port that is in no table and runs no identified service
+UNKNOWN_PORT_DANGER = 1.5
+
+# Context-specific multiplier applied to every open port's danger
+PORT_DANGER_MULTIPLIERS = {
+    "marketing": 0.5,
+    "authentication": 1.0,
+    "ecommerce": 1.0,
+    "internal": 0.3,
+}
+
+# Versioned weight tables. Bump WEIGHTS_VERSION whenever the tables above
+# change so stored scores can be recomputed under the new weights.
+WEIGHTS_VERSION = "2024.2"
+
+WEIGHT_TABLES = {
+    "2024.1": {
+        "header_weights": HEADER_WEIGHTS,
+        "dangerous_ports": DANGEROUS_PORTS_2024_1,
+        "port_danger_multipliers": PORT_DANGER_MULTIPLIERS,
+    },
+    WEIGHTS_VERSION: {
+        "header_weights": HEADER_WEIGHTS,
+        "dangerous_ports": DANGEROUS_PORTS,
+        "port_danger_multipliers": PORT_DANGER_MULTIPLIERS,
+    }
+}
+
+
+def register_weight_table(
+    version: str,
+    header_weights: Optional[Dict[str, Dict[str, float]]] = None,
+    dangerous_ports: Optional[Dict[int, Dict[str, Any]]] = None,
+    port_danger_multipliers: Optional[Dict[str, float]] = None
 ) -> Dict[str, Any]:
     """
-    Calculate risk score with context-aware weighting.
+    Register a weight table version. Omitted tables default to the current ones.
     
     Args:
-        ssl_data: SSL/TLS check results
-        headers_data: Security headers check results
-        ports_data: Open ports check results
-        site_context: Site context (marketing, authentication, ecommerce, internal)
+        version: Version label
+        header_weights: Header -> context -> weight
+        dangerous_ports: Port -> {name, base_danger}
+        port_danger_multipliers: Context -> multiplier
     
     Returns:
-        Dictionary with contextualized risk score, reasoning, and weighted factors
+        The registered weight table
     """
+    WEIGHT_TABLES[version] = {
+        "header_weights": header_weights if header_weights is not None else HEADER_WEIGHTS,
+        "dangerous_ports": dangerous_ports if dangerous_ports is not None else DANGEROUS_PORTS,
+        "port_danger_multipliers": port_danger_multipliers if port_danger_multipliers is not None else PORT_DANGER_MULTIPLIERS,
+    }
+    clear_scoring_caches()
+    return WEIGHT_TABLES[version]
+
+
+def get_weight_table(version: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Look up a weight table by version (None = current).
     
-    # Defensive defaults for missing inputs
-    ssl_data = ssl_data or {}
-    headers_data = headers_data or {}
-    ports_data = ports_data or {}
+    Raises:
+        KeyError: If the version is not registered
+    """
+    return WEIGHT_TABLES[version or WEIGHTS_VERSION]
 
-    # Validate context
-    try:
-        context = SiteContext(site_context)
-    except ValueError:
-        context = SiteContext.MARKETING
+
+# Distinct scoring results kept by the memo (see _score_finding_set)
+SCORE_CACHE_SIZE = 4096
+
+
+def _importance(weight: float) -> str:
+    """Importance label for a header weight."""
+    return "CRITICAL" if weight >= 0.8 else "HIGH" if weight >= 0.5 else "MEDIUM" if weight >= 0.3 else "LOW"
+
+
+def _port_entry(base_danger: float, multiplier: float) -> tuple:
+    """(base_deduction, adjusted_deduction, concern_text) for one port."""
+    base_deduction = base_danger * 3
+    adjusted_deduction = float(base_deduction * (multiplier or 1.0))
+    concern_text = "highly concerning" if adjusted_deduction > 2 else "concerning"
+    return base_deduction, adjusted_deduction, concern_text
+
+
+@lru_cache(maxsize=None)
+def compile_weight_table(weights_version: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Flatten a weight table into per-context lookup tables.
+    
+    Every per-header and per-port deduction, label and concern string is
+    computed once here instead of on every scoring call.
+    
+    Args:
+        weights_version: Weight table version (defaults to WEIGHTS_VERSION)
+    
+    Returns:
+        Context value -> {headers, default_header, ports, services, unknown_port,
+        multiplier, dangerous_ports}
+    """
+    weight_table = get_weight_table(weights_version)
+    header_weights = weight_table["header_weights"]
+    dangerous_ports = weight_table["dangerous_ports"]
+    
+    compiled = {}
+    for context in SiteContext:
+        multiplier = weight_table["port_danger_multipliers"].get(context.value, 0.5)
+        headers = {}
+        for name, weights in header_weights.items():
+            weight = weights.get(context.value, 0.5)
+            headers[name] = (weight, float(5 * (weight or 0.5)), _importance(weight))
+        ports = {
+            port: (info.get("name", f"Unknown (:{port})"),) + _port_entry(info.get("base_danger", UNKNOWN_PORT_DANGER), multiplier)
+            for port, info in dangerous_ports.items()
+        }
+        services = {
+            info.get("name"): (info.get("name"),) + _port_entry(
+                max(info.get("base_danger", UNKNOWN_PORT_DANGER), UNKNOWN_PORT_DANGER), multiplier
+            )
+            for info in dangerous_ports.values()
+        }
+        compiled[context.value] = {
+            "headers": headers,
+            "default_header": (0.5, float(5 * 0.5), _importance(0.5)),
+            "ports": ports,
+            "services": services,
+            "unknown_port": _port_entry(UNKNOWN_PORT_DANGER, multiplier),
+            "multiplier": multiplier,
+            "dangerous_ports": frozenset(dangerous_ports),
+        }
+    return compiled
+
+
+# Static text for advanced-mode factors: key -> (category, issue, reasoning)
+ADVANCED_FACTORS = {
+    "combo": ("Advanced Penalty", "Multiple missing headers", "Stricter scoring applied in advanced analysis"),
+    "chain": ("Attack Chain", "CSP+HSTS missing", "Detected header combination that enables attack chaining"),
+    "correlation": ("Advanced Correlation", "Ports + Headers", "Correlated risk identified in advanced analysis"),
+}
+
+
+class RiskResult:
+    """
+    Compact context-aware scoring result.
+    
+    Weighted factors are kept as small tuples and expanded into dicts (with
+    their reasoning text) only by to_dict(), so memoized results stay small
+    and every caller gets fresh dicts.
+    """
+    
+    __slots__ = ("score", "risk_level", "risk_color", "site_context", "weights_version", "reasoning", "factors")
+    
+    def __init__(self, score, risk_level, risk_color, site_context, weights_version, reasoning, factors):
+        self.score = score
+        self.risk_level = risk_level
+        self.risk_color = risk_color
+        self.site_context = site_context
+        self.weights_version = weights_version
+        self.reasoning = reasoning
+        self.factors = factors
+    
+    def _factor_dict(self, factor: tuple) -> Dict[str, Any]:
+        kind = factor[0]
+        if kind == "ssl":
+            _, deduction, reasoning = factor
+            return {
+                "category": "SSL/TLS",
+                "weight": 1.0,  # No context adjustment for SSL
+                "base_deduction": deduction,
+                "adjusted_deduction": deduction,
+                "reasoning": reasoning
+            }
+        if kind == "header":
+            _, header_name, weight, adjusted_deduction, importance = factor
+            return {
+                "category": "Security Headers",
+                "header": header_name,
+                "weight": weight,
+                "base_deduction": 5,
+                "adjusted_deduction": adjusted_deduction,
+                "reasoning": f"{header_name} is {importance} for {self.site_context} sites"
+            }
+        if kind == "port":
+            _, port, port_name, multiplier, base_deduction, adjusted_deduction = factor
+            return {
+                "category": "Open Ports",
+                "port": port,
+                "port_name": port_name,
+                "weight": multiplier,
+                "base_deduction": base_deduction,
+                "adjusted_deduction": adjusted_deduction,
+                "reasoning": f"Port {port} ({port_name}) exposure risk"
+            }
+        _, key, penalty = factor
+        category, issue, reasoning = ADVANCED_FACTORS[key]
+        return {
+            "category": category,
+            "issue": issue,
+            "adjusted_deduction": penalty,
+            "reasoning": reasoning
+        }
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize to the calculate_context_aware_risk response shape."""
+        weighted_factors = [self._factor_dict(factor) for factor in self.factors]
+        return {
+            "score": self.score,
+            "risk_level": self.risk_level,
+            "risk_color": self.risk_color,
+            "site_context": self.site_context,
+            "weights_version": self.weights_version,
+            "why_score": {
+                "summary": f"Risk score is {self.risk_level} for {self.site_context} site context",
+                "factors": list(self.reasoning),
+                "weighted_factors": weighted_factors
+            },
+            "deductions": weighted_factors
+        }
+
+
+@lru_cache(maxsize=SCORE_CACHE_SIZE)
+def _score_finding_set(
+    weights_version: str,
+    context_value: str,
+    advanced: bool,
+    ssl_valid: bool,
+    expiring_in_days: Optional[int],
+    header_names: tuple,
+    ports: tuple,
+    services: tuple = ()
+) -> RiskResult:
+    """
+    Score one canonical finding set. Memoized.
+    
+    Args:
+        weights_version: Weight table version
+        context_value: Validated site context value
+        advanced: Apply advanced-mode penalties
+        ssl_valid: Whether the certificate is valid
+        expiring_in_days: Days to expiry when inside the 30-day window, else None
+        header_names: Missing header names, in scan order
+        ports: Open ports, in scan order
+        services: (port, service) pairs identified from banners
+    
+    Returns:
+        RiskResult for the finding set
+    """
+    tables = compile_weight_table(weights_version)[context_value]
     
     score = 100.0
     weighted_factors = []
@@ -96,78 +322,36 @@ def calculate_context_aware_risk(
     ssl_deduction = 0
     ssl_reasoning = ""
     
-    if not ssl_data.get('is_valid', False):
+    if not ssl_valid:
         # Critical for all contexts
         ssl_deduction = 40
-        ssl_reasoning = f"Invalid or missing SSL certificate (critical for all site types)"
+        ssl_reasoning = "Invalid or missing SSL certificate (critical for all site types)"
+        reasoning.append(ssl_reasoning)
+    elif expiring_in_days is not None:
+        ssl_deduction = 10
+        ssl_reasoning = f"Certificate expires in {expiring_in_days} days"
         reasoning.append(ssl_reasoning)
-    else:
-        # Ensure numeric expiry value
-        try:
-            expires_in_days = int(ssl_data.get('expires_in_days', 365) or 365)
-        except Exception:
-            expires_in_days = 365
-
-        if 0 < expires_in_days < 30:
-            ssl_deduction = 10
-            ssl_reasoning = f"Certificate expires in {expires_in_days} days"
-            reasoning.append(ssl_reasoning)
     
     if ssl_deduction > 0:
-        weighted_factors.append({
-            "category": "SSL/TLS",
-            "weight": 1.0,  # No context adjustment for SSL
-            "base_deduction": ssl_deduction,
-            "adjusted_deduction": ssl_deduction,
-            "reasoning": ssl_reasoning or "SSL/TLS configuration issues"
-        })
+        weighted_factors.append(("ssl", ssl_deduction, ssl_reasoning))
     
     score -= ssl_deduction
     
     # ===== SECURITY HEADERS SCORING =====
-    # Accept different shapes for headers_data and normalize
-    missing_headers = headers_data.get('missing_headers') or headers_data.get('missing') or []
-    if not isinstance(missing_headers, list):
-        # If it's an integer (count), we can't reason about names; treat as empty list
-        if isinstance(missing_headers, int):
-            missing_headers = []
-        else:
-            missing_headers = []
     headers_deduction = 0
     headers_reasoning_list = []
+    context_label = context_value.upper()
+    header_table = tables["headers"]
     
-    # Iterate safely - header may be a dict or a simple string
-    for header in missing_headers:
-        header_name = header.get('name') if isinstance(header, dict) else (str(header) if header else '')
-        header_name = header_name or ''
-
-        weight = HEADER_WEIGHTS.get(header_name, {}).get(context.value, 0.5)
-        base_deduction = 5
-        adjusted_deduction = base_deduction * (weight or 0.5)
-
-        # Ensure numeric
-        try:
-            adjusted_deduction = float(adjusted_deduction)
-        except Exception:
-            adjusted_deduction = base_deduction * 0.5
-
+    for header_name in header_names:
+        weight, adjusted_deduction, importance = header_table.get(header_name, tables["default_header"])
         headers_deduction += adjusted_deduction
-
-        context_label = context.value.upper()
-        importance = "CRITICAL" if weight >= 0.8 else "HIGH" if weight >= 0.5 else "MEDIUM" if weight >= 0.3 else "LOW"
-
+        
         headers_reasoning_list.append(
             f"Missing {header_name}: {importance} importance for {context_label} sites"
         )
-
-        weighted_factors.append({
-            "category": "Security Headers",
-            "header": header_name,
-            "weight": weight,
-            "base_deduction": base_deduction,
-            "adjusted_deduction": adjusted_deduction,
-            "reasoning": f"{header_name} is {importance} for {context.value} sites"
-        })
+        
+        weighted_factors.append(("header", header_name, weight, adjusted_deduction, importance))
     
     if headers_deduction > 0:
         reasoning.extend(headers_reasoning_list[:3])  # Limit to 3 items
@@ -175,55 +359,30 @@ def calculate_context_aware_risk(
     score -= headers_deduction
     
     # ===== OPEN PORTS SCORING =====
-    open_ports = ports_data.get('open_ports') or ports_data.get('ports') or []
-    if not isinstance(open_ports, list):
-        open_ports = []
     ports_deduction = 0
     ports_reasoning_list = []
+    port_table = tables["ports"]
+    multiplier = tables["multiplier"]
+    identified = dict(services)
+    dangerous_open_ports = 0
     
-    # Context-specific port danger multiplier
-    port_danger_multipliers = {
-        "marketing": 0.5,
-        "authentication": 1.0,
-        "ecommerce": 1.0,
-        "internal": 0.3,
-    }
-    multiplier = port_danger_multipliers.get(context.value, 0.5)
-    
-    for port_info in open_ports:
-        # port_info may be dict or simple int
-        try:
-            port = port_info.get('port') if isinstance(port_info, dict) else int(port_info)
-        except Exception:
-            # Skip invalid entries
-            continue
-
-        port_danger = DANGEROUS_PORTS.get(port, {}).get('base_danger', 1.5)
-        port_name = DANGEROUS_PORTS.get(port, {}).get('name', f'Unknown (:{port})')
-
-        base_deduction = port_danger * 3
-        adjusted_deduction = base_deduction * (multiplier or 1.0)
-        try:
-            adjusted_deduction = float(adjusted_deduction)
-        except Exception:
-            adjusted_deduction = base_deduction
-
+    for port in ports:
+        # The port's own entry first; otherwise what its banner says it runs
+        entry = port_table.get(port) or tables["services"].get(identified.get(port))
+        if entry is None:
+            port_name = f"Unknown (:{port})"
+            base_deduction, adjusted_deduction, concern_text = tables["unknown_port"]
+        else:
+            port_name, base_deduction, adjusted_deduction, concern_text = entry
+            dangerous_open_ports += 1
+        
         ports_deduction += adjusted_deduction
-
-        concern_text = "highly concerning" if adjusted_deduction > 2 else "concerning"
+        
         ports_reasoning_list.append(
-            f"Port {port} ({port_name}) open - {concern_text} for {context.value} sites"
+            f"Port {port} ({port_name}) open - {concern_text} for {context_value} sites"
         )
-
-        weighted_factors.append({
-            "category": "Open Ports",
-            "port": port,
-            "port_name": port_name,
-            "weight": multiplier,
-            "base_deduction": base_deduction,
-            "adjusted_deduction": adjusted_deduction,
-            "reasoning": f"Port {port} ({port_name}) exposure risk"
-        })
+        
+        weighted_factors.append(("port", port, port_name, multiplier, base_deduction, adjusted_deduction))
     
     if ports_deduction > 0:
         reasoning.extend(ports_reasoning_list[:3])  # Limit to 3 items
@@ -233,53 +392,29 @@ def calculate_context_aware_risk(
     # ===== ADVANCED ANALYSIS PENALTIES =====
     # When advanced mode is enabled, apply stricter penalties for dangerous combinations
     if advanced:
-        try:
-            missing_count = len(missing_headers)
-        except Exception:
-            missing_count = 0
-
+        missing_count = len(header_names)
+        
         # Multiple missing headers => additional penalty
         if missing_count >= 2:
             combo_penalty = min(15, 5 * (missing_count - 1))
             score -= combo_penalty
             reasoning.append(f"Advanced penalty: {missing_count} missing headers increases attack surface")
-            weighted_factors.append({
-                "category": "Advanced Penalty",
-                "issue": "Multiple missing headers",
-                "adjusted_deduction": combo_penalty,
-                "reasoning": "Stricter scoring applied in advanced analysis"
-            })
-
+            weighted_factors.append(("advanced", "combo", combo_penalty))
+        
         # Specific attack-chain detection: CSP + HSTS missing
-        header_names = { (h.get('name') if isinstance(h, dict) else str(h)) for h in missing_headers }
-        if ('Content-Security-Policy' in header_names) and ('Strict-Transport-Security' in header_names):
+        if 'Content-Security-Policy' in header_names and 'Strict-Transport-Security' in header_names:
             chain_penalty = 10
             score -= chain_penalty
             reasoning.append("Advanced penalty: Missing CSP and HSTS - increased XSS+MITM chain risk")
-            weighted_factors.append({
-                "category": "Attack Chain",
-                "issue": "CSP+HSTS missing",
-                "adjusted_deduction": chain_penalty,
-                "reasoning": "Detected header combination that enables attack chaining"
-            })
-
+            weighted_factors.append(("advanced", "chain", chain_penalty))
+        
         # Correlate open dangerous ports with missing headers
-        try:
-            dangerous_open_ports = [p for p in open_ports if (isinstance(p, dict) and p.get('port') in DANGEROUS_PORTS) or (isinstance(p, int) and p in DANGEROUS_PORTS)]
-        except Exception:
-            dangerous_open_ports = []
-
         if dangerous_open_ports and missing_count > 0:
-            corr_penalty = min(20, 5 * len(dangerous_open_ports))
+            corr_penalty = min(20, 5 * dangerous_open_ports)
             score -= corr_penalty
             reasoning.append("Advanced penalty: Dangerous open ports combined with missing headers increase exploitation risk")
-            weighted_factors.append({
-                "category": "Advanced Correlation",
-                "issue": "Ports + Headers",
-                "adjusted_deduction": corr_penalty,
-                "reasoning": "Correlated risk identified in advanced analysis"
-            })
-
+            weighted_factors.append(("advanced", "correlation", corr_penalty))
+    
     # Ensure score stays within 0-100 range
     score = max(0, min(100, score))
     
@@ -297,18 +432,89 @@ def calculate_context_aware_risk(
         risk_level = "CRITICAL"
         risk_color = "red"
     
-    return {
-        "score": round(score, 2),
-        "risk_level": risk_level,
-        "risk_color": risk_color,
-        "site_context": context.value,
-        "why_score": {
-            "summary": f"Risk score is {risk_level} for {context.value} site context",
-            "factors": reasoning,
-            "weighted_factors": weighted_factors
-        },
-        "deductions": weighted_factors
-    }
+    return RiskResult(
+        round(score, 2), risk_level, risk_color, context_value, weights_version,
+        tuple(reasoning), tuple(weighted_factors)
+    )
+
+
+def finding_set_key(findings: ScanFindings) -> tuple:
+    """
+    Canonical, hashable key for the findings that affect scoring.
+    
+    Args:
+        findings: Normalized scan findings
+    
+    Returns:
+        (ssl_valid, expiring_in_days, header_names, ports, services)
+    """
+    expiring_in_days = findings.expires_in_days if findings.ssl_valid and findings.ssl_expiring else None
+    return findings.ssl_valid, expiring_in_days, findings.missing_headers, findings.open_ports, findings.services
+
+
+def clear_scoring_caches() -> None:
+    """Drop compiled tables and memoized scores (after weight tables change)."""
+    compile_weight_table.cache_clear()
+    _score_finding_set.cache_clear()
+
+
+def risk_for_findings(
+    findings: ScanFindings,
+    site_context: str = "marketing",
+    advanced: bool = False,
+    weights_version: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Context-aware risk score for already normalized findings.
+    
+    Results are memoized by finding set, so rescoring a combination the fleet
+    has already produced is a cache hit.
+    
+    Args:
+        findings: Normalized scan findings
+        site_context: Site context (marketing, authentication, ecommerce, internal)
+        advanced: Apply stricter penalties for dangerous combinations
+        weights_version: Weight table version (defaults to WEIGHTS_VERSION)
+    
+    Returns:
+        Dictionary with contextualized risk score, reasoning, and weighted factors
+    """
+    # Validate context
+    try:
+        context = SiteContext(site_context)
+    except ValueError:
+        context = SiteContext.MARKETING
+    
+    weights_version = weights_version or WEIGHTS_VERSION
+    get_weight_table(weights_version)  # KeyError for unknown versions
+    
+    return _score_finding_set(weights_version, context.value, bool(advanced), *finding_set_key(findings)).to_dict()
+
+
+def calculate_context_aware_risk(
+    ssl_data: Dict[str, Any],
+    headers_data: Dict[str, Any],
+    ports_data: Dict[str, Any],
+    site_context: str = "marketing",
+    advanced: bool = False,
+    weights_version: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Calculate risk score with context-aware weighting.
+    
+    Args:
+        ssl_data: SSL/TLS check results
+        headers_data: Security headers check results
+        ports_data: Open ports check results
+        site_context: Site context (marketing, authentication, ecommerce, internal)
+        advanced: Apply stricter penalties for dangerous combinations
+        weights_version: Weight table version (defaults to WEIGHTS_VERSION)
+    
+    Returns:
+        Dictionary with contextualized risk score, reasoning, and weighted factors
+    """
+    findings = normalize_findings(ssl_data, headers_data, ports_data)
+    return risk_for_findings(findings, site_context, advanced, weights_version)
 
 
 def get_context_recommendations(
@@ -326,6 +532,25 @@ def get_context_recommendations(
         open_ports: List of open ports
         ssl_valid: Whether SSL is valid
     
+    Returns:
+        List of prioritized recommendations
+    """
+    findings = normalize_findings(
+        {"is_valid": ssl_valid},
+        {"missing_headers": missing_headers},
+        {"open_ports": open_ports}
+    )
+    return recommendations_for_findings(context, findings)
+
+
+def recommendations_for_findings(context: str, findings: ScanFindings) -> List[Dict[str, str]]:
+    """
+    Context-specific security recommendations for normalized findings.
+    
+    Args:
+        context: Site context
+        findings: Normalized scan findings
+    
     Returns:
         List of prioritized recommendations
     """
@@ -342,7 +567,7 @@ def get_context_recommendations(
     priority_list = priorities.get(context, ["SSL/TLS", "Headers", "Ports"])
     
     # SSL recommendations
-    if not ssl_valid and "SSL/TLS" in priority_list:
+    if not findings.ssl_valid and "SSL/TLS" in priority_list:
         recommendations.append({
             "priority": "CRITICAL",
             "category": "SSL/TLS",
@@ -359,20 +584,25 @@ def get_context_recommendations(
     }
     
     context_headers = header_priorities.get(context, [])
-    for header in missing_headers:
-        if header.get('name') in context_headers and "Headers" in priority_list:
-            priority = "CRITICAL" if context_headers.index(header.get('name', '')) == 0 else "HIGH"
+    for header_name in findings.missing_headers:
+        if header_name in context_headers and "Headers" in priority_list:
+            priority = "CRITICAL" if context_headers.index(header_name) == 0 else "HIGH"
             recommendations.append({
                 "priority": priority,
                 "category": "Security Headers",
-                "header": header.get('name'),
-                "recommendation": f"Implement {header.get('name')}",
+                "header": header_name,
+                "recommendation": f"Implement {header_name}",
                 "context_reason": f"Critical for {context} site protection"
             })
     
     # Port recommendations
-    if open_ports and "Ports" in priority_list:
-        dangerous_count = sum(1 for p in open_ports if p.get('port') in DANGEROUS_PORTS)
+    if findings.open_ports and "Ports" in priority_list:
+        dangerous_services = {info["name"] for info in DANGEROUS_PORTS.values()}
+        identified = dict(findings.services)
+        dangerous_count = sum(
+            1 for port in findings.open_ports
+            if port in DANGEROUS_PORTS or identified.get(port) in dangerous_services
+        )
         if dangerous_count > 0:
             recommendations.append({
                 "priority": "CRITICAL" if context != "internal" else "HIGH",
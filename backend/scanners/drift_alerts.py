@@ -0,0 +1,198 @@
+"""
+Drift Alert Delivery Module
+Pushes newly introduced risks to webhooks, batched and debounced per destination.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Callable
+
+import requests
+
+
+DEFAULT_DEBOUNCE_SECONDS = 5.0     # Quiet period before a batch is sent
+DEFAULT_MAX_BATCH_WINDOW = 30.0    # Upper bound on how long an alert waits
+DEFAULT_MAX_BATCH_SIZE = 500       # Alerts per HTTP call
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_SECONDS = 1.0
+
+
+def _post_json(webhook_url: str, payload: Dict[str, Any]) -> None:
+    """Deliver a payload to a webhook, raising on failure."""
+    response = requests.post(webhook_url, json=payload, timeout=5)
+    response.raise_for_status()
+
+
+class AlertDispatcher:
+    """
+    Batches drift alerts per webhook and delivers them in the background.
+
+    Alerts for the same host within a batch are collapsed (latest wins), and a
+    batch is sent once its destination has been quiet for debounce_seconds,
+    has waited max_batch_window, or reaches max_batch_size. A burst of
+    regressions across many hosts therefore becomes a handful of HTTP calls.
+    """
+
+    def __init__(
+        self,
+        webhooks: List[str],
+        debounce_seconds: float = DEFAULT_DEBOUNCE_SECONDS,
+        max_batch_window: float = DEFAULT_MAX_BATCH_WINDOW,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_seconds: float = DEFAULT_BACKOFF_SECONDS,
+        sender: Optional[Callable[[str, Dict[str, Any]], None]] = None
+    ):
+        self.webhooks = list(webhooks)
+        self.debounce_seconds = debounce_seconds
+        self.max_batch_window = max_batch_window
+        self.max_batch_size = max_batch_size
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.sender = sender or _post_json
+
+        self.delivered_batches = 0
+        self.failed_batches = 0
+
+        self._pending: Dict[str, "OrderedDict[str, Dict[str, Any]]"] = {w: OrderedDict() for w in self.webhooks}
+        self._first_enqueued: Dict[str, float] = {}
+        self._last_enqueued: Dict[str, float] = {}
+        self._condition = threading.Condition()
+        self._closed = False
+        self._executor = ThreadPoolExecutor(max_workers=max(1, min(len(self.webhooks), 8)))
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    @classmethod
+    def from_env(cls) -> Optional["AlertDispatcher"]:
+        """
+        Build a dispatcher from DRIFT_ALERT_WEBHOOKS (comma-separated URLs).
+
+        Returns:
+            Dispatcher, or None when no webhooks are configured
+        """
+        webhooks = [w.strip() for w in os.getenv("DRIFT_ALERT_WEBHOOKS", "").split(",") if w.strip()]
+        if not webhooks:
+            return None
+        return cls(
+            webhooks,
+            debounce_seconds=float(os.getenv("DRIFT_ALERT_DEBOUNCE_SECONDS", DEFAULT_DEBOUNCE_SECONDS)),
+            max_batch_window=float(os.getenv("DRIFT_ALERT_MAX_WINDOW_SECONDS", DEFAULT_MAX_BATCH_WINDOW))
+        )
+
+    def enqueue(self, url: str, drift: Dict[str, Any], severity: Optional[str] = None) -> None:
+        """
+        Queue an alert for every configured webhook.
+
+        Args:
+            url: Host the drift was detected on
+            drift: Drift report with new_risks
+            severity: Optional severity label for the alert
+        """
+        alert = {
+            "url": url,
+            "severity": severity,
+            "new_risks": drift.get("new_risks", []),
+            "risk_score_change": drift.get("risk_score_change"),
+            "latest_timestamp": drift.get("latest_timestamp")
+        }
+        now = time.monotonic()
+        with self._condition:
+            if self._closed:
+                return
+            for webhook in self.webhooks:
+                pending = self._pending[webhook]
+                pending.pop(url, None)
+                pending[url] = alert
+                self._first_enqueued.setdefault(webhook, now)
+                self._last_enqueued[webhook] = now
+            self._condition.notify()
+
+    def flush(self) -> None:
+        """Deliver everything pending now and wait for delivery to finish."""
+        with self._condition:
+            batches = [
+                (w, self._take_batch(w))
+                for w in self.webhooks
+                for _ in range(-(-len(self._pending[w]) // self.max_batch_size))
+            ]
+        for future in [self._executor.submit(self._deliver, w, batch) for w, batch in batches]:
+            future.result()
+
+    def close(self) -> None:
+        """Flush pending alerts and stop the background worker."""
+        self.flush()
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._worker.join(timeout=5)
+        self._executor.shutdown(wait=True)
+
+    def _take_batch(self, webhook: str) -> List[Dict[str, Any]]:
+        """Remove up to max_batch_size pending alerts for a webhook (lock held)."""
+        pending = self._pending[webhook]
+        batch = []
+        while pending and len(batch) < self.max_batch_size:
+            batch.append(pending.popitem(last=False)[1])
+        if pending:
+            self._first_enqueued[webhook] = time.monotonic()
+        else:
+            self._first_enqueued.pop(webhook, None)
+            self._last_enqueued.pop(webhook, None)
+        return batch
+
+    def _due_in(self, webhook: str, now: float) -> Optional[float]:
+        """Seconds until a webhook's batch is due (0 = now, None = nothing pending)."""
+        if not self._pending[webhook]:
+            return None
+        if len(self._pending[webhook]) >= self.max_batch_size:
+            return 0.0
+        quiet_deadline = self._last_enqueued[webhook] + self.debounce_seconds
+        window_deadline = self._first_enqueued[webhook] + self.max_batch_window
+        return max(0.0, min(quiet_deadline, window_deadline) - now)
+
+    def _run(self) -> None:
+        """Background loop: wait for batches to become due and hand them off."""
+        while True:
+            with self._condition:
+                if self._closed:
+                    return
+                now = time.monotonic()
+                due = []
+                wait = None
+                for webhook in self.webhooks:
+                    remaining = self._due_in(webhook, now)
+                    if remaining is None:
+                        continue
+                    if remaining == 0.0:
+                        due.append((webhook, self._take_batch(webhook)))
+                    else:
+                        wait = remaining if wait is None else min(wait, remaining)
+                if not due:
+                    self._condition.wait(timeout=wait)
+                    continue
+            for webhook, batch in due:
+                self._executor.submit(self._deliver, webhook, batch)
+
+    def _deliver(self, webhook: str, batch: List[Dict[str, Any]]) -> bool:
+        """Send one batch with exponential backoff between retries."""
+        payload = {
+            "event": "security_drift",
+            "alert_count": len(batch),
+            "alerts": batch
+        }
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.sender(webhook, payload)
+                with self._condition:
+                    self.delivered_batches += 1
+                return True
+            except Exception:
+                if attempt < self.max_retries:
+                    time.sleep(self.backoff_seconds * (2 ** attempt))
+        with self._condition:
+            self.failed_batches += 1
+        return False
@@ -0,0 +1,181 @@
+"""
+Findings Normalization Module
+Turns raw scanner output into one normalized findings object per scan, so the
+scoring, attacker/defender, fix and recommendation stages share the same
+defensive parsing instead of each re-walking headers_data and ports_data.
+"""
+
+from typing import Dict, Any, List, Tuple
+
+
+class ScanFindings:
+    """
+    Normalized findings for one scan.
+
+    Attributes:
+        ssl_valid: Whether the certificate is valid
+        expires_in_days: Days until certificate expiry (365 when unknown)
+        missing_headers: Missing security header names, in scan order (root, then extra paths)
+        open_ports: Open port numbers, in scan order (invalid entries dropped)
+        weak_headers: (header name, issues) for present headers whose value fails policy
+        services: (port, service) for open ports identified by their banner
+    """
+
+    __slots__ = ("ssl_valid", "expires_in_days", "missing_headers", "open_ports", "weak_headers", "services")
+
+    def __init__(
+        self,
+        ssl_valid: bool,
+        expires_in_days: int,
+        missing_headers: Tuple[str, ...],
+        open_ports: Tuple[Any, ...],
+        weak_headers: Tuple[Tuple[str, Tuple[str, ...]], ...] = (),
+        services: Tuple[Tuple[int, str], ...] = ()
+    ):
+        self.ssl_valid = ssl_valid
+        self.expires_in_days = expires_in_days
+        self.missing_headers = missing_headers
+        self.open_ports = open_ports
+        self.weak_headers = weak_headers
+        self.services = services
+
+    @property
+    def ssl_expiring(self) -> bool:
+        """Certificate expires within 30 days (regardless of validity)."""
+        return 0 < self.expires_in_days < 30
+
+
+def _parse_header_names(headers_data: Dict[str, Any]) -> Tuple[str, ...]:
+    """Missing header names from dict or string entries."""
+    # Accept different shapes for headers_data; a bare count can't be reasoned about
+    missing_headers = headers_data.get('missing_headers') or headers_data.get('missing') or []
+    if not isinstance(missing_headers, list):
+        return ()
+    return tuple(
+        (header.get('name') if isinstance(header, dict) else (str(header) if header else '')) or ''
+        for header in missing_headers
+    )
+
+
+def _parse_weak_headers(headers_data: Dict[str, Any]) -> Tuple[Tuple[str, Tuple[str, ...]], ...]:
+    """Headers whose graded policy failed (see header_policy)."""
+    policies = headers_data.get('policies')
+    if not isinstance(policies, dict):
+        return ()
+    return tuple(
+        (name, tuple(policy.get('issues') or ()))
+        for name, policy in policies.items()
+        if isinstance(policy, dict) and policy.get('status') == 'fail'
+    )
+
+
+def _path_reports(headers_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Per-path header results (see headers_check.check_header_paths), errors skipped."""
+    paths = headers_data.get('paths')
+    results = paths.get('results') if isinstance(paths, dict) else None
+    if not isinstance(results, dict):
+        return []
+    return [report for report in results.values() if isinstance(report, dict) and 'error' not in report]
+
+
+def _merge_path_findings(
+    missing_headers: Tuple[str, ...],
+    weak_headers: Tuple[Tuple[str, Tuple[str, ...]], ...],
+    headers_data: Dict[str, Any]
+) -> Tuple[Tuple[str, ...], Tuple[Tuple[str, Tuple[str, ...]], ...]]:
+    """A header missing or weak on any checked path counts against the target."""
+    missing = list(missing_headers)
+    weak = list(weak_headers)
+    weak_names = {name for name, _ in weak}
+    for report in _path_reports(headers_data):
+        for name in _parse_header_names(report):
+            if name not in missing:
+                missing.append(name)
+        for name, issues in _parse_weak_headers(report):
+            if name not in weak_names:
+                weak_names.add(name)
+                weak.append((name, issues))
+    return tuple(missing), tuple(weak)
+
+
+def _parse_ports(ports_data: Dict[str, Any]) -> Tuple[Any, ...]:
+    """Open port numbers from dict or int entries, skipping invalid ones."""
+    open_ports = ports_data.get('open_ports') or ports_data.get('ports') or []
+    if not isinstance(open_ports, list):
+        return ()
+    ports: List[Any] = []
+    for port_info in open_ports:
+        try:
+            ports.append(port_info.get('port') if isinstance(port_info, dict) else int(port_info))
+        except Exception:
+            continue
+    return tuple(ports)
+
+
+def _parse_services(ports_data: Dict[str, Any]) -> Tuple[Tuple[int, str], ...]:
+    """(port, service) for banner-identified ports (see service_fingerprint)."""
+    identified = ports_data.get('identified_services')
+    if not isinstance(identified, list):
+        return ()
+    return tuple(
+        (entry['port'], entry['service'])
+        for entry in identified
+        if isinstance(entry, dict) and isinstance(entry.get('port'), int) and entry.get('service')
+    )
+
+
+def normalize_findings(
+    ssl_data: Dict[str, Any],
+    headers_data: Dict[str, Any],
+    ports_data: Dict[str, Any]
+) -> ScanFindings:
+    """
+    Normalize raw scanner output once per scan.
+
+    Args:
+        ssl_data: SSL/TLS check results
+        headers_data: Security headers check results
+        ports_data: Open ports check results
+
+    Returns:
+        ScanFindings for the scan
+    """
+    ssl_data = ssl_data or {}
+    headers_data = headers_data or {}
+    ports_data = ports_data or {}
+
+    # Ensure numeric expiry value
+    try:
+        expires_in_days = int(ssl_data.get('expires_in_days', 365) or 365)
+    except Exception:
+        expires_in_days = 365
+
+    missing_headers, weak_headers = _merge_path_findings(
+        _parse_header_names(headers_data), _parse_weak_headers(headers_data), headers_data
+    )
+
+    return ScanFindings(
+        ssl_valid=bool(ssl_data.get('is_valid', False)),
+        expires_in_days=expires_in_days,
+        missing_headers=missing_headers,
+        open_ports=_parse_ports(ports_data),
+        weak_headers=weak_headers,
+        services=_parse_services(ports_data)
+    )
+
+
+def findings_from_scan(scan_data: Dict[str, Any]) -> ScanFindings:
+    """
+    Normalize a full scan result (ssl, headers and ports sections).
+
+    Args:
+        scan_data: Scan result dict
+
+    Returns:
+        ScanFindings for the scan
+    """
+    return normalize_findings(
+        scan_data.get("ssl") or {},
+        scan_data.get("headers") or {},
+        scan_data.get("ports") or {}
+    )
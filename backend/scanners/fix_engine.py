@@ -3,7 +3,19 @@ Actionable Fix Engine
 Provides structured fix snippets for every issue across different web servers and frameworks.
 """
 
-from typing import Dict, List, Any
+import hashlib
+import json
+from functools import lru_cache
+from typing import Dict, List, Any, Optional
+
+from .findings import ScanFindings, normalize_findings
+
+
+# Bump whenever HEADER_FIXES or PORT_CLOSURE_FIXES change so clients refetch the catalog
+FIX_CATALOG_VERSION = "2024.2"
+
+# Frameworks that header fixes are written for
+FIX_FRAMEWORKS = ("nginx", "apache", "express", "django", "flask")
 
 
 # Fix snippets for missing headers
@@ -12,27 +24,27 @@ HEADER_FIXES = {
         "description": "Restricts what resources can be loaded, preventing XSS attacks",
         "fixes": {
             "nginx": {
-                "config": "add_header Content-Security-Policy \"default-src 'self'; script-src 'self' 'unsafe-inline' https://trusted.cdn; style-src 'self' 'unsafe-inline'; img-src 'self' data: https:; font-src 'self'; connect-src 'self'; frame-ancestors 'self'; form-action 'self'; base-uri 'self'\" always;",
-                "location": "In http or server block of /etc/nginx/nginx.conf",
+                "config": "add_header Content-Security-Policy \"default-src 'self'; script-src 'self' 'nonce-$request_id'; style-src 'self'; img-src 'self' data: https:; font-src 'self'; connect-src 'self'; object-src 'none'; frame-ancestors 'self'; form-action 'self'; base-uri 'self'\" always;\nsub_filter '<script' '<script nonce=\"$request_id\"';\nsub_filter_once off;",
+                "location": "In http or server block of /etc/nginx/nginx.conf (the nonce is the per-request $request_id; sub_filter adds it to inline scripts)",
                 "restart": "sudo systemctl restart nginx"
             },
             "apache": {
-                "config": "Header always set Content-Security-Policy \"default-src 'self'; script-src 'self' 'unsafe-inline' https://trusted.cdn; style-src 'self' 'unsafe-inline'; img-src 'self' data: https:; font-src 'self'; connect-src 'self'; frame-ancestors 'self'; form-action 'self'; base-uri 'self'\"",
-                "location": "In .htaccess or Apache config file",
+                "config": "Header always set Content-Security-Policy \"default-src 'self'; script-src 'self' 'nonce-%{UNIQUE_ID}e'; style-src 'self'; img-src 'self' data: https:; font-src 'self'; connect-src 'self'; object-src 'none'; frame-ancestors 'self'; form-action 'self'; base-uri 'self'\"",
+                "location": "In .htaccess or Apache config file (requires mod_unique_id; add nonce=\"<!--#echo var='UNIQUE_ID' -->\" to inline scripts)",
                 "restart": "sudo systemctl restart apache2"
             },
             "express": {
-                "code": "const csp = require('helmet-csp');\napp.use(csp({\n  directives: {\n    defaultSrc: [\"'self'\"],\n    scriptSrc: [\"'self'\", \"'unsafe-inline'\", \"https://trusted.cdn\"],\n    styleSrc: [\"'self'\", \"'unsafe-inline'\"],\n    imgSrc: [\"'self'\", \"data:\", \"https:\"],\n    connectSrc: [\"'self'\"],\n  }\n}));",
+                "code": "const crypto = require('crypto');\nconst csp = require('helmet-csp');\napp.use((req, res, next) => {\n  res.locals.cspNonce = crypto.randomBytes(16).toString('base64');\n  next();\n});\napp.use(csp({\n  directives: {\n    defaultSrc: [\"'self'\"],\n    scriptSrc: [\"'self'\", (req, res) => `'nonce-${res.locals.cspNonce}'`],\n    styleSrc: [\"'self'\"],\n    imgSrc: [\"'self'\", \"data:\", \"https:\"],\n    connectSrc: [\"'self'\"],\n    objectSrc: [\"'none'\"],\n    baseUri: [\"'self'\"],\n    frameAncestors: [\"'self'\"],\n  }\n}));\n// Templates: <script nonce=\"<%= cspNonce %>\">",
                 "package": "npm install helmet-csp",
                 "restart": "Restart Node.js application"
             },
             "django": {
-                "code": "# settings.py\nCSP_DEFAULT_SRC = (\"'self'\",)\nCSP_SCRIPT_SRC = (\"'self'\", \"'unsafe-inline'\", \"https://trusted.cdn\")\nCSP_STYLE_SRC = (\"'self'\", \"'unsafe-inline'\")\n# Install django-csp: pip install django-csp\n# Add 'csp.middleware.CSPMiddleware' to MIDDLEWARE",
+                "code": "# settings.py\nCSP_DEFAULT_SRC = (\"'self'\",)\nCSP_SCRIPT_SRC = (\"'self'\",)\nCSP_STYLE_SRC = (\"'self'\",)\nCSP_OBJECT_SRC = (\"'none'\",)\nCSP_BASE_URI = (\"'self'\",)\nCSP_FRAME_ANCESTORS = (\"'self'\",)\nCSP_INCLUDE_NONCE_IN = (\"script-src\",)\n# Templates: <script nonce=\"{{ request.csp_nonce }}\">\n# Install django-csp: pip install django-csp\n# Add 'csp.middleware.CSPMiddleware' to MIDDLEWARE",
                 "package": "pip install django-csp",
                 "restart": "Restart Django application"
             },
             "flask": {
-                "code": "from flask_talisman import Talisman\nfrom flask import Flask\napp = Flask(__name__)\nTalisman(app, force_https=True, strict_transport_security=True, content_security_policy={\n    'default-src': \"'self'\",\n    'script-src': [\"'self'\", \"'unsafe-inline'\", \"https://trusted.cdn\"],\n    'style-src': [\"'self'\", \"'unsafe-inline'\"]\n})",
+                "code": "from flask_talisman import Talisman\nfrom flask import Flask\napp = Flask(__name__)\nTalisman(app, force_https=True, strict_transport_security=True, content_security_policy={\n    'default-src': \"'self'\",\n    'script-src': \"'self'\",\n    'style-src': \"'self'\",\n    'object-src': \"'none'\",\n    'base-uri': \"'self'\",\n    'frame-ancestors': \"'self'\"\n}, content_security_policy_nonce_in=['script-src'])\n# Templates: <script nonce=\"{{ csp_nonce() }}\">",
                 "package": "pip install flask-talisman",
                 "restart": "Restart Flask application"
             }
@@ -196,9 +208,91 @@ PORT_CLOSURE_FIXES = {
 }
 
 
+def header_fix_id(header_name: str) -> str:
+    """Catalog id of the fix for a missing header."""
+    return f"header:{header_name}"
+
+
+def port_fix_id(port: int) -> str:
+    """Catalog id of the fix for an open port."""
+    return f"port:{port}"
+
+
+def _filter_framework(fixes: Dict[str, Any], framework: Optional[str]) -> Dict[str, Any]:
+    """Keep only one framework's snippet (header fixes are keyed by framework)."""
+    if framework is None:
+        return fixes
+    return {name: body for name, body in fixes.items() if name == framework}
+
+
+def _header_fix_entry(header_name: str, framework: Optional[str] = None) -> Dict[str, Any]:
+    header_fix = HEADER_FIXES[header_name]
+    return {
+        "header": header_name,
+        "description": header_fix["description"],
+        "fixes": _filter_framework(header_fix["fixes"], framework)
+    }
+
+
+def _port_fix_entry(port: int) -> Dict[str, Any]:
+    port_fix = PORT_CLOSURE_FIXES[port]
+    return {
+        "port": port,
+        "description": port_fix["description"],
+        "fixes": port_fix["fixes"]
+    }
+
+
+@lru_cache(maxsize=None)
+def _catalog_payload(framework: Optional[str]) -> tuple:
+    """(catalog, serialized JSON bytes, ETag) for one framework filter; built once."""
+    catalog = {
+        "version": FIX_CATALOG_VERSION,
+        "framework": framework,
+        "fixes": {
+            **{header_fix_id(name): _header_fix_entry(name, framework) for name in HEADER_FIXES},
+            **{port_fix_id(port): _port_fix_entry(port) for port in PORT_CLOSURE_FIXES}
+        }
+    }
+    body = json.dumps(catalog, separators=(",", ":")).encode("utf-8")
+    etag = f'"{FIX_CATALOG_VERSION}-{hashlib.sha256(body).hexdigest()[:16]}"'
+    return catalog, body, etag
+
+
+def get_fix_catalog(framework: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Full fix catalog keyed by fix id.
+    
+    Args:
+        framework: Only include this framework's header snippets (port fixes are
+            firewall commands and are always included)
+    
+    Returns:
+        {version, framework, fixes: {fix_id: entry}}
+    
+    Raises:
+        ValueError: If framework is not one of FIX_FRAMEWORKS
+    """
+    return fix_catalog_response(framework)[0]
+
+
+def fix_catalog_response(framework: Optional[str] = None) -> tuple:
+    """
+    Catalog plus its pre-serialized JSON body and ETag, for HTTP caching.
+    
+    Raises:
+        ValueError: If framework is not one of FIX_FRAMEWORKS
+    """
+    if framework is not None and framework not in FIX_FRAMEWORKS:
+        raise ValueError(f"Unknown framework: {framework}. Valid frameworks: {', '.join(FIX_FRAMEWORKS)}")
+    return _catalog_payload(framework)
+
+
 def generate_fix_snippets(
     missing_headers: List[Dict[str, Any]],
-    open_ports: List[Dict[str, Any]]
+    open_ports: List[Dict[str, Any]],
+    inline: bool = True,
+    framework: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     Generate structured fix snippets for all issues.
@@ -206,12 +300,40 @@ def generate_fix_snippets(
     Args:
         missing_headers: List of missing security headers
         open_ports: List of open ports
+        inline: Include full snippet bodies (False = catalog ids only)
+        framework: Only include this framework's header snippets
     
     Returns:
         Structured JSON with fixes for Nginx, Apache, and common frameworks
     """
+    findings = normalize_findings({}, {"missing_headers": missing_headers}, {"open_ports": open_ports})
+    return fix_snippets_for_findings(findings, inline, framework)
+
+
+def fix_snippets_for_findings(
+    findings: ScanFindings,
+    inline: bool = False,
+    framework: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Fix references for normalized findings.
+    
+    By default only catalog ids are returned; the snippet bodies are served
+    once by GET /fixes/catalog.
+    
+    Args:
+        findings: Normalized scan findings
+        inline: Include full snippet bodies as well
+        framework: Only include this framework's header snippets (with inline)
+    
+    Returns:
+        {catalog_version, headers, ports, summary}
+    """
+    missing_headers = findings.missing_headers
+    open_ports = findings.open_ports
     
     fixes = {
+        "catalog_version": FIX_CATALOG_VERSION,
         "headers": [],
         "ports": [],
         "summary": {
@@ -222,26 +344,18 @@ def generate_fix_snippets(
     }
     
     # Generate header fixes
-    for header in missing_headers:
-        header_name = header.get('name', '')
+    for header_name in missing_headers:
         if header_name in HEADER_FIXES:
-            header_fix = HEADER_FIXES[header_name]
-            fixes["headers"].append({
-                "header": header_name,
-                "description": header_fix["description"],
-                "fixes": header_fix["fixes"]
-            })
+            entry = _header_fix_entry(header_name, framework) if inline else {"header": header_name}
+            entry["fix_id"] = header_fix_id(header_name)
+            fixes["headers"].append(entry)
     
     # Generate port closure fixes
-    for port_info in open_ports:
-        port = port_info['port']
+    for port in open_ports:
         if port in PORT_CLOSURE_FIXES:
-            port_fix = PORT_CLOSURE_FIXES[port]
-            fixes["ports"].append({
-                "port": port,
-                "description": port_fix["description"],
-                "fixes": port_fix["fixes"]
-            })
+            entry = _port_fix_entry(port) if inline else {"port": port}
+            entry["fix_id"] = port_fix_id(port)
+            fixes["ports"].append(entry)
     
     return fixes
 
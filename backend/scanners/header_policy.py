@@ -0,0 +1,240 @@
+"""
+Header Policy Engine
+Parses and grades security header values (CSP, HSTS, X-Frame-Options, ...),
+so a header that is present but ineffective (e.g. HSTS max-age=0, CSP with
+'unsafe-inline') is reported as such.
+
+Grades are cached by (header, value): sites behind the same CDN share
+identical header strings, so grading a fleet costs one parse per distinct
+value.
+"""
+
+from functools import lru_cache
+from typing import Dict, Any, Optional, Tuple
+
+
+# Distinct (header, value) pairs kept in the parse cache
+POLICY_CACHE_SIZE = 4096
+
+PASS = "pass"
+WARN = "warn"
+FAIL = "fail"
+
+# HSTS max-age below this (6 months) is considered too short
+HSTS_MIN_MAX_AGE = 15768000
+
+# Headers the engine knows how to grade (lower-case name -> canonical name)
+GRADED_HEADERS = {
+    "content-security-policy": "Content-Security-Policy",
+    "strict-transport-security": "Strict-Transport-Security",
+    "x-frame-options": "X-Frame-Options",
+    "x-content-type-options": "X-Content-Type-Options",
+    "referrer-policy": "Referrer-Policy",
+    "permissions-policy": "Permissions-Policy",
+}
+
+_STRICT_REFERRER_POLICIES = {
+    "no-referrer", "same-origin", "strict-origin", "strict-origin-when-cross-origin",
+}
+_LOOSE_REFERRER_POLICIES = {
+    "unsafe-url", "no-referrer-when-downgrade", "origin", "origin-when-cross-origin",
+}
+
+
+class HeaderGrade:
+    """
+    Graded header value. Instances are cached and shared; treat as read-only.
+
+    Attributes:
+        header: Canonical header name
+        status: pass, warn or fail
+        issues: Human-readable problems found
+        directives: Parsed value (directive -> tuple of tokens)
+    """
+
+    __slots__ = ("header", "status", "issues", "directives")
+
+    def __init__(self, header: str, status: str, issues: Tuple[str, ...], directives: Tuple[Tuple[str, Tuple[str, ...]], ...]):
+        self.header = header
+        self.status = status
+        self.issues = issues
+        self.directives = directives
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "issues": list(self.issues),
+            "directives": {name: list(tokens) for name, tokens in self.directives}
+        }
+
+
+def _status(issues_by_level: Dict[str, list]) -> str:
+    if issues_by_level[FAIL]:
+        return FAIL
+    if issues_by_level[WARN]:
+        return WARN
+    return PASS
+
+
+def _parse_directives(value: str, separator: str = ";") -> Tuple[Tuple[str, Tuple[str, ...]], ...]:
+    """Split 'name tok tok; name tok' into ((name, (tok, ...)), ...), first occurrence wins."""
+    seen = {}
+    for part in value.split(separator):
+        tokens = part.strip().split()
+        if not tokens:
+            continue
+        name = tokens[0].lower()
+        if name not in seen:
+            seen[name] = tuple(tokens[1:])
+    return tuple(seen.items())
+
+
+def _grade_csp(value: str) -> Tuple[str, Tuple[str, ...], tuple]:
+    directives = _parse_directives(value)
+    parsed = dict(directives)
+    issues = {FAIL: [], WARN: []}
+
+    script_src = parsed.get("script-src", parsed.get("default-src"))
+    if script_src is None:
+        issues[FAIL].append("No script-src or default-src: scripts may load from anywhere")
+    else:
+        lowered = {token.lower() for token in script_src}
+        has_nonce_or_hash = any(t.startswith(("'nonce-", "'sha256-", "'sha384-", "'sha512-")) for t in lowered)
+        if "'unsafe-inline'" in lowered and not has_nonce_or_hash:
+            issues[FAIL].append("'unsafe-inline' scripts allowed without nonce or hash")
+        if "'unsafe-eval'" in lowered:
+            issues[WARN].append("'unsafe-eval' allows eval() and similar")
+        if lowered & {"*", "http:", "https:", "data:"}:
+            issues[FAIL].append("Script sources include a wildcard or scheme-only source")
+
+    object_src = parsed.get("object-src", parsed.get("default-src"))
+    if object_src is None or [t.lower() for t in object_src] != ["'none'"]:
+        issues[WARN].append("object-src is not 'none'")
+    if "base-uri" not in parsed:
+        issues[WARN].append("No base-uri restriction")
+    if "frame-ancestors" not in parsed:
+        issues[WARN].append("No frame-ancestors (clickjacking relies on X-Frame-Options)")
+
+    return _status(issues), tuple(issues[FAIL] + issues[WARN]), directives
+
+
+def _grade_hsts(value: str) -> Tuple[str, Tuple[str, ...], tuple]:
+    directives = _parse_directives(value.replace("=", " "))
+    parsed = dict(directives)
+    issues = {FAIL: [], WARN: []}
+
+    max_age = parsed.get("max-age")
+    try:
+        max_age = int(max_age[0].strip('"')) if max_age else None
+    except ValueError:
+        max_age = None
+
+    if max_age is None:
+        issues[FAIL].append("Missing or invalid max-age")
+    elif max_age == 0:
+        issues[FAIL].append("max-age=0 disables HSTS")
+    elif max_age < HSTS_MIN_MAX_AGE:
+        issues[WARN].append(f"max-age {max_age} is shorter than 6 months")
+    if "includesubdomains" not in parsed:
+        issues[WARN].append("includeSubDomains not set")
+
+    return _status(issues), tuple(issues[FAIL] + issues[WARN]), directives
+
+
+def _grade_xfo(value: str) -> Tuple[str, Tuple[str, ...], tuple]:
+    normalized = value.strip().upper()
+    directives = ((normalized.split()[0].lower(), tuple(normalized.split()[1:])),) if normalized else ()
+    if normalized in ("DENY", "SAMEORIGIN"):
+        return PASS, (), directives
+    if normalized.startswith("ALLOW-FROM"):
+        return WARN, ("ALLOW-FROM is obsolete and ignored by modern browsers",), directives
+    return FAIL, (f"Invalid value '{value.strip()}'",), directives
+
+
+def _grade_xcto(value: str) -> Tuple[str, Tuple[str, ...], tuple]:
+    normalized = value.strip().lower()
+    directives = ((normalized, ()),) if normalized else ()
+    if normalized == "nosniff":
+        return PASS, (), directives
+    return FAIL, (f"Invalid value '{value.strip()}' (expected nosniff)",), directives
+
+
+def _grade_referrer_policy(value: str) -> Tuple[str, Tuple[str, ...], tuple]:
+    # Browsers use the last policy they understand
+    policies = [p.strip().lower() for p in value.split(",") if p.strip()]
+    directives = tuple((p, ()) for p in policies)
+    effective = policies[-1] if policies else ""
+    if effective in _STRICT_REFERRER_POLICIES:
+        return PASS, (), directives
+    if effective in _LOOSE_REFERRER_POLICIES:
+        return WARN, (f"'{effective}' leaks full or cross-origin referrers",), directives
+    return FAIL, (f"Unknown referrer policy '{effective}'",), directives
+
+
+def _grade_permissions_policy(value: str) -> Tuple[str, Tuple[str, ...], tuple]:
+    directives = []
+    issues = []
+    for part in value.split(","):
+        feature, _, allowlist = part.strip().partition("=")
+        if not feature:
+            continue
+        directives.append((feature.strip().lower(), tuple(allowlist.strip("() ").split())))
+        if allowlist.strip() == "*":
+            issues.append(f"{feature.strip()} allowed for all origins")
+    return (WARN if issues else PASS), tuple(issues), tuple(directives)
+
+
+_GRADERS = {
+    "content-security-policy": _grade_csp,
+    "strict-transport-security": _grade_hsts,
+    "x-frame-options": _grade_xfo,
+    "x-content-type-options": _grade_xcto,
+    "referrer-policy": _grade_referrer_policy,
+    "permissions-policy": _grade_permissions_policy,
+}
+
+
+@lru_cache(maxsize=POLICY_CACHE_SIZE)
+def _grade_cached(header_key: str, value: str) -> HeaderGrade:
+    status, issues, directives = _GRADERS[header_key](value)
+    return HeaderGrade(GRADED_HEADERS[header_key], status, issues, directives)
+
+
+def grade_header(name: str, value: Any) -> Optional[HeaderGrade]:
+    """
+    Grade one header value (cached by header and value).
+
+    Args:
+        name: Header name (case-insensitive)
+        value: Raw header value
+
+    Returns:
+        HeaderGrade, or None if the header isn't one the engine grades
+    """
+    header_key = name.lower()
+    if header_key not in _GRADERS:
+        return None
+    return _grade_cached(header_key, str(value))
+
+
+def grade_headers(headers: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    Grade every recognized security header in a response.
+
+    Args:
+        headers: Response headers (name -> value)
+
+    Returns:
+        Canonical header name -> {status, issues, directives}
+    """
+    policies = {}
+    for name, value in headers.items():
+        grade = grade_header(name, value)
+        if grade is not None:
+            policies[grade.header] = grade.to_dict()
+    return policies
+
+
+def policy_cache_info():
+    """Hit/miss statistics of the parse cache."""
+    return _grade_cached.cache_info()
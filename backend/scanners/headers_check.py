@@ -3,8 +3,23 @@ HTTP Security Headers Check Module
 Verifies the presence of critical security headers.
 """
 
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.cookiejar import DefaultCookiePolicy
+from typing import Dict, List, Any, Optional, Tuple
+from urllib.parse import urljoin
+
 import requests
-from typing import Dict, List, Any
+from requests.adapters import HTTPAdapter
+
+try:
+    import httpx
+    import h2  # noqa: F401 - httpx needs it for HTTP/2
+except ImportError:  # pragma: no cover - optional HTTP/2 multiplexing
+    httpx = None
+
+from .header_policy import grade_headers, GRADED_HEADERS, FAIL
 
 
 REQUIRED_HEADERS = {
@@ -14,13 +29,306 @@ REQUIRED_HEADERS = {
     "X-Content-Type-Options": "Prevents MIME type sniffing"
 }
 
+# Header probes never read more than this much of any response body
+HEADER_PROBE_MAX_BYTES = 64 * 1024
+
+# Redirect chain budgets
+HEADER_PROBE_MAX_REDIRECTS = 10
+HEADER_PROBE_TIME_BUDGET = 10.0    # seconds for the whole chain
+
+# Extra paths checked per target (e.g. /login, /checkout)
+HEADER_PATHS_MAX = 10
+
+# Pooled connections shared by all header probes
+HTTP_POOL_CONNECTIONS = 32    # distinct hosts kept
+HTTP_POOL_MAXSIZE = 8         # connections per host
 
-def check_headers(url: str) -> Dict[str, Any]:
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """
+    Shared pooled session for header probes.
+    
+    Redirect hops to the same host, and HEAD-then-GET fallbacks, reuse the
+    same keep-alive connection. Cookies are never stored, so scans of
+    different sites stay independent.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+        return _session
+
+
+def _release(response: requests.Response) -> None:
+    """Close a streamed response, draining it first only if the body is small."""
+    try:
+        length = int(response.headers.get("Content-Length", -1))
+    except ValueError:
+        length = -1
+    try:
+        if 0 <= length <= HEADER_PROBE_MAX_BYTES:
+            response.raw.read(HEADER_PROBE_MAX_BYTES, decode_content=False)
+    except Exception:
+        pass
+    response.close()
+
+
+def walk_redirects(
+    url: str,
+    method: str = "HEAD",
+    timeout: float = 5,
+    max_hops: int = HEADER_PROBE_MAX_REDIRECTS,
+    time_budget: float = HEADER_PROBE_TIME_BUDGET
+) -> Tuple[List[Dict[str, Any]], requests.structures.CaseInsensitiveDict, int]:
+    """
+    Follow a redirect chain hop by hop without reading response bodies.
+    
+    Args:
+        url: Starting URL
+        method: HEAD or GET (GET is streamed and closed after the headers)
+        timeout: Per-request timeout in seconds
+        max_hops: Maximum redirects to follow
+        time_budget: Maximum seconds for the whole chain
+    
+    Returns:
+        (hops, final response headers, final status code). Each hop records
+        url, status_code and the security headers it sent.
+    
+    Raises:
+        requests.exceptions.Timeout: If the time budget runs out
+        requests.exceptions.TooManyRedirects: If the hop budget runs out
+    """
+    session = get_session()
+    deadline = time.monotonic() + time_budget
+    hops = []
+    
+    for _ in range(max_hops + 1):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise requests.exceptions.Timeout(f"Redirect chain exceeded {time_budget}s budget")
+        
+        response = session.request(method, url, timeout=min(timeout, remaining), allow_redirects=False, stream=True)
+        try:
+            hops.append({
+                "url": url,
+                "status_code": response.status_code,
+                "security_headers": {
+                    name: value for name, value in response.headers.items() if name.lower() in GRADED_HEADERS
+                }
+            })
+            if not response.is_redirect:
+                return hops, response.headers, response.status_code
+            url = urljoin(url, response.headers["Location"])
+        finally:
+            _release(response)
+    
+    raise requests.exceptions.TooManyRedirects(f"Exceeded {max_hops} redirects")
+
+
+def fetch_headers(
+    url: str,
+    timeout: float = 5
+) -> Tuple[requests.structures.CaseInsensitiveDict, str, List[Dict[str, Any]]]:
+    """
+    Fetch response headers without downloading the page body.
+    
+    Tries HEAD first; servers that reject or mishandle HEAD (4xx/5xx) get a
+    streamed GET that is closed as soon as the headers arrive.
+    
+    Args:
+        url: Complete URL of the website
+        timeout: Per-request timeout in seconds
+    
+    Returns:
+        (final headers, probe method used: "HEAD" or "GET", redirect chain hops)
+    """
+    try:
+        hops, headers, status_code = walk_redirects(url, "HEAD", timeout)
+        if status_code < 400:
+            return headers, "HEAD", hops
+    except requests.exceptions.Timeout:
+        raise
+    except requests.exceptions.RequestException:
+        pass
+    hops, headers, _ = walk_redirects(url, "GET", timeout)
+    return headers, "GET", hops
+
+
+def _header_report(headers: Any) -> Dict[str, Any]:
+    """Presence, score and policy grades for one response's headers."""
+    missing_headers = []
+    present_headers = []
+    
+    # Check each required header
+    for header_name, description in REQUIRED_HEADERS.items():
+        if header_name in headers:
+            present_headers.append({
+                "name": header_name,
+                "value": headers[header_name],
+                "description": description
+            })
+        else:
+            missing_headers.append({
+                "name": header_name,
+                "description": description
+            })
+    
+    # Calculate score (percentage of headers present)
+    headers_score = (len(present_headers) / len(REQUIRED_HEADERS)) * 100
+    
+    # Grade header values, not just presence (cached per distinct value)
+    all_headers = dict(headers)
+    policies = grade_headers(all_headers)
+    
+    return {
+        "present_headers": present_headers,
+        "missing_headers": missing_headers,
+        "headers_score": headers_score,
+        "missing_count": len(missing_headers),
+        "all_headers": all_headers,
+        "policies": policies,
+        "weak_headers": [name for name, policy in policies.items() if policy["status"] == FAIL]
+    }
+
+
+def parse_paths(paths: Optional[str]) -> List[str]:
+    """
+    Parse a comma-separated list of paths to check headers on.
+    
+    Args:
+        paths: e.g. "/login,/checkout" (leading slashes optional)
+    
+    Returns:
+        Distinct paths in request order, each starting with "/"
+    
+    Raises:
+        ValueError: If more than HEADER_PATHS_MAX paths are given
+    """
+    if not paths:
+        return []
+    parsed = []
+    for path in paths.split(","):
+        path = path.strip()
+        if not path:
+            continue
+        if not path.startswith("/"):
+            path = "/" + path
+        if path not in parsed:
+            parsed.append(path)
+    if len(parsed) > HEADER_PATHS_MAX:
+        raise ValueError(f"At most {HEADER_PATHS_MAX} paths per target")
+    return parsed
+
+
+def _path_report(headers: Any, probe_method: str, status_code: int) -> Dict[str, Any]:
+    """Per-path result: the check_headers shape without the full header dump."""
+    report = _header_report(headers)
+    del report["all_headers"]
+    report["status_code"] = status_code
+    report["probe_method"] = probe_method
+    return report
+
+
+def _fetch_paths_http2(base_url: str, paths: List[str], timeout: float) -> Tuple[Dict[str, Any], str]:
+    """
+    Fetch all paths concurrently as streams on one HTTP/2 connection.
+    
+    The client is capped at a single connection, so a server that doesn't
+    negotiate HTTP/2 gets the requests serialized over one keep-alive
+    HTTP/1.1 connection instead of one handshake per path.
+    """
+    def fetch(path: str) -> Dict[str, Any]:
+        try:
+            response = client.head(base_url + path)
+            probe_method = "HEAD"
+            if response.status_code >= 400:
+                with client.stream("GET", base_url + path) as response:
+                    probe_method = "GET"
+                    # Drain small bodies so an HTTP/1.1 connection stays reusable
+                    if response.headers.get("Content-Length", "").isdigit() and \
+                            int(response.headers["Content-Length"]) <= HEADER_PROBE_MAX_BYTES:
+                        response.read()
+            versions.add(response.http_version)
+            return _path_report(response.headers, probe_method, response.status_code)
+        except httpx.TimeoutException:
+            return {"error": "Request timeout"}
+        except httpx.ConnectError:
+            return {"error": "Connection error"}
+        except Exception as e:
+            return {"error": f"Error checking headers: {str(e)}"}
+    
+    versions = set()
+    with httpx.Client(
+        http2=True,
+        timeout=timeout,
+        follow_redirects=True,
+        max_redirects=HEADER_PROBE_MAX_REDIRECTS,
+        limits=httpx.Limits(max_connections=1)
+    ) as client:
+        with ThreadPoolExecutor(max_workers=len(paths)) as executor:
+            reports = dict(zip(paths, executor.map(fetch, paths)))
+    return reports, "HTTP/2" if "HTTP/2" in versions else "HTTP/1.1"
+
+
+def _fetch_paths_keepalive(base_url: str, paths: List[str], timeout: float) -> Tuple[Dict[str, Any], str]:
+    """Fetch paths one after another over the shared session's keep-alive connection."""
+    reports = {}
+    for path in paths:
+        try:
+            headers, probe_method, hops = fetch_headers(base_url + path, timeout)
+            reports[path] = _path_report(headers, probe_method, hops[-1]["status_code"])
+        except requests.exceptions.Timeout:
+            reports[path] = {"error": "Request timeout"}
+        except requests.exceptions.ConnectionError:
+            reports[path] = {"error": "Connection error"}
+        except Exception as e:
+            reports[path] = {"error": f"Error checking headers: {str(e)}"}
+    return reports, "HTTP/1.1"
+
+
+def check_header_paths(url: str, paths: List[str], timeout: float = 5) -> Dict[str, Any]:
+    """
+    Check security headers on several paths of one target.
+    
+    Uses a single connection per target: HTTP/2 streams when httpx and h2
+    are installed, otherwise sequential requests over one keep-alive
+    connection.
+    
+    Args:
+        url: Target URL (scheme and host; any path is ignored)
+        paths: Paths to check, e.g. ["/login", "/checkout"]
+        timeout: Per-request timeout in seconds
+    
+    Returns:
+        {"protocol": "HTTP/2" or "HTTP/1.1", "results": {path: report or {"error"}}}
+    """
+    if not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+    scheme, _, rest = url.partition("://")
+    base_url = f"{scheme}://{rest.split('/')[0]}"
+    
+    if httpx is not None:
+        reports, protocol = _fetch_paths_http2(base_url, paths, timeout)
+    else:
+        reports, protocol = _fetch_paths_keepalive(base_url, paths, timeout)
+    return {"protocol": protocol, "results": reports}
+
+
+def check_headers(url: str, paths: Optional[List[str]] = None) -> Dict[str, Any]:
     """
     Check for presence of critical HTTP security headers.
     
     Args:
         url: Complete URL of the website
+        paths: Extra paths to check on the same host (see check_header_paths)
     
     Returns:
         Dictionary with header check results
@@ -30,37 +338,15 @@ def check_headers(url: str) -> Dict[str, Any]:
         if not url.startswith(('http://', 'https://')):
             url = 'https://' + url
         
-        # Make request with timeout
-        response = requests.get(url, timeout=5, allow_redirects=True)
-        headers = response.headers
+        # Probe headers only (HEAD, or streamed GET without reading the body)
+        headers, probe_method, redirect_chain = fetch_headers(url, timeout=5)
         
-        missing_headers = []
-        present_headers = []
-        
-        # Check each required header
-        for header_name, description in REQUIRED_HEADERS.items():
-            if header_name in headers:
-                present_headers.append({
-                    "name": header_name,
-                    "value": headers[header_name],
-                    "description": description
-                })
-            else:
-                missing_headers.append({
-                    "name": header_name,
-                    "description": description
-                })
-        
-        # Calculate score (percentage of headers present)
-        headers_score = (len(present_headers) / len(REQUIRED_HEADERS)) * 100
-        
-        return {
-            "present_headers": present_headers,
-            "missing_headers": missing_headers,
-            "headers_score": headers_score,
-            "missing_count": len(missing_headers),
-            "all_headers": dict(headers)
-        }
+        result = _header_report(headers)
+        result["probe_method"] = probe_method
+        result["redirect_chain"] = redirect_chain
+        if paths:
+            result["paths"] = check_header_paths(url, paths, timeout=5)
+        return result
     
     except requests.exceptions.Timeout:
         return {
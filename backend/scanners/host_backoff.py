@@ -0,0 +1,165 @@
+"""
+Host Backoff Module
+Negative cache of hosts that failed to resolve or timed out.
+
+A dead host in a monitored list costs every scanner its full timeout on
+every cycle. After such a failure the host is skipped until its backoff
+expires; the backoff doubles with each consecutive failure up to a cap and
+is cleared by the first scan that reaches the host.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+
+DEFAULT_BASE_SECONDS = 60
+DEFAULT_MAX_SECONDS = 3600
+DEFAULT_MAX_ENTRIES = 10000
+
+DNS_FAILURE = "DNS resolution failed"
+CONNECTION_TIMEOUT = "Connection timeout"
+
+
+def unreachable_reason(
+    ssl_result: Dict[str, Any],
+    headers_result: Dict[str, Any],
+    ports_result: Dict[str, Any]
+) -> Optional[str]:
+    """
+    Why a scan never reached its host, if it didn't.
+
+    A host counts as unreachable when its name doesn't resolve, or when both
+    the TLS handshake and the HTTP request timed out and no port was open.
+    Refused connections are not failures: they are fast and the host is up.
+
+    Each signal maps to one exception type: ports' "Unable to resolve
+    hostname" is socket.gaierror, ssl's "Connection timeout" is
+    socket.timeout and headers' "Request timeout" is requests' Timeout
+    (connect timeouts included). Headers' "Connection error" is everything
+    else requests can't connect through (refused, reset, proxy), so it
+    doesn't count.
+
+    Args:
+        ssl_result: check_ssl output
+        headers_result: check_headers output
+        ports_result: check_ports output
+
+    Returns:
+        DNS_FAILURE, CONNECTION_TIMEOUT or None
+    """
+    if str(ports_result.get("error", "")).startswith("Unable to resolve hostname"):
+        return DNS_FAILURE
+    if (
+        ssl_result.get("error") == "Connection timeout"
+        and headers_result.get("error") == "Request timeout"
+        and not ports_result.get("ports_open_count")
+    ):
+        return CONNECTION_TIMEOUT
+    return None
+
+
+class HostBackoff:
+    """
+    Bounded negative cache of unreachable hosts with exponential backoff.
+
+    The n-th consecutive failure skips the host for
+    min(base_seconds * 2 ** (n - 1), max_seconds). When full, the host that
+    failed least recently is forgotten.
+    """
+
+    def __init__(
+        self,
+        base_seconds: float = DEFAULT_BASE_SECONDS,
+        max_seconds: float = DEFAULT_MAX_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES
+    ):
+        self.base_seconds = base_seconds
+        self.max_seconds = max_seconds
+        self.max_entries = max_entries
+        self.skips = 0
+        # hostname -> (consecutive failures, last failure time, retry time, reason)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "HostBackoff":
+        """Build a cache from HOST_BACKOFF_BASE_SECONDS, HOST_BACKOFF_MAX_SECONDS and HOST_BACKOFF_MAX_ENTRIES."""
+        return cls(
+            base_seconds=float(os.getenv("HOST_BACKOFF_BASE_SECONDS", DEFAULT_BASE_SECONDS)),
+            max_seconds=float(os.getenv("HOST_BACKOFF_MAX_SECONDS", DEFAULT_MAX_SECONDS)),
+            max_entries=int(os.getenv("HOST_BACKOFF_MAX_ENTRIES", DEFAULT_MAX_ENTRIES))
+        )
+
+    def skipped(self, hostname: str) -> Optional[Dict[str, Any]]:
+        """
+        Skip notice for a host still in backoff.
+
+        Args:
+            hostname: Host to be scanned
+
+        Returns:
+            {skipped, reason, failures, last_failure_at, retry_after, message},
+            or None if the host should be scanned
+        """
+        with self._lock:
+            entry = self._entries.get(hostname)
+            if entry is None or time.time() >= entry[2]:
+                return None
+            self.skips += 1
+        failures, last_failure, retry_at, reason = entry
+        last_failure_at = datetime.utcfromtimestamp(last_failure).isoformat()
+        return {
+            "skipped": True,
+            "reason": reason,
+            "failures": failures,
+            "last_failure_at": last_failure_at,
+            "retry_after": datetime.utcfromtimestamp(retry_at).isoformat(),
+            "message": f"Skipped: {reason}, last failure at {last_failure_at}"
+        }
+
+    def record_failure(self, hostname: str, reason: str) -> Dict[str, Any]:
+        """
+        Record a failed attempt and start (or double) the host's backoff.
+
+        Args:
+            hostname: Host that could not be reached
+            reason: DNS_FAILURE or CONNECTION_TIMEOUT
+
+        Returns:
+            {reason, failures, retry_after} for the new backoff
+        """
+        now = time.time()
+        with self._lock:
+            failures = self._entries.pop(hostname, (0,))[0] + 1
+            retry_at = now + min(self.base_seconds * 2 ** (failures - 1), self.max_seconds)
+            self._entries[hostname] = (failures, now, retry_at, reason)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return {
+            "reason": reason,
+            "failures": failures,
+            "retry_after": datetime.utcfromtimestamp(retry_at).isoformat()
+        }
+
+    def record_success(self, hostname: str) -> None:
+        """Forget a host's failures once a scan reaches it."""
+        with self._lock:
+            self._entries.pop(hostname, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hosts in the negative cache and scans skipped so far."""
+        with self._lock:
+            now = time.time()
+            return {
+                "hosts": len(self._entries),
+                "backing_off": sum(1 for entry in self._entries.values() if now < entry[2]),
+                "skips": self.skips
+            }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
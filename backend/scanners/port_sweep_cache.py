@@ -0,0 +1,107 @@
+"""
+Port Sweep Cache Module
+Shares port sweeps between hostnames that resolve to the same address.
+
+Large portfolios put hundreds of virtual hosts behind a few load-balancer
+IPs; the open ports are a property of the address, not the hostname, so
+each IP is swept once per freshness window. SSL and header checks stay
+per hostname (SNI and vhost routing differ).
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Callable, Optional, Tuple
+
+
+DEFAULT_TTL_SECONDS = 900
+DEFAULT_MAX_ENTRIES = 4096
+
+
+class PortSweepCache:
+    """
+    Expiring, bounded cache of port sweeps keyed by (ip, max_port).
+
+    Concurrent requests for the same address wait for the sweep already in
+    flight instead of starting their own. Failed sweeps are not cached.
+    """
+
+    def __init__(self, ttl_seconds: float = DEFAULT_TTL_SECONDS, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.sweeps = 0
+        self.hits = 0
+        self._entries: "OrderedDict[Tuple[str, int], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, int], threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "PortSweepCache":
+        """Build a cache from PORT_SWEEP_TTL_SECONDS and PORT_SWEEP_MAX_ENTRIES."""
+        return cls(
+            ttl_seconds=float(os.getenv("PORT_SWEEP_TTL_SECONDS", DEFAULT_TTL_SECONDS)),
+            max_entries=int(os.getenv("PORT_SWEEP_MAX_ENTRIES", DEFAULT_MAX_ENTRIES))
+        )
+
+    def _fresh(self, key: Tuple[str, int]) -> Optional[Tuple[float, Dict[str, Any]]]:
+        """Cached entry if still within the freshness window (caller holds _lock)."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.time() - entry[0] > self.ttl_seconds:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def get_or_sweep(
+        self,
+        ip: str,
+        max_port: int,
+        sweep: Callable[[], Dict[str, Any]]
+    ) -> Tuple[Dict[str, Any], Optional[float]]:
+        """
+        Return the sweep for an address, running it only if none is fresh.
+
+        Args:
+            ip: Resolved address
+            max_port: Highest port swept (part of the key)
+            sweep: Runs the sweep; results containing "error" are not cached
+
+        Returns:
+            (sweep result, time.time() it was taken if reused from the cache, else None)
+        """
+        key = (ip, max_port)
+        with self._lock:
+            entry = self._fresh(key)
+            if entry is not None:
+                self.hits += 1
+                return entry[1], entry[0]
+            inflight = self._inflight.setdefault(key, threading.Lock())
+
+        with inflight:
+            with self._lock:
+                entry = self._fresh(key)
+                if entry is not None:
+                    self.hits += 1
+                    return entry[1], entry[0]
+            result = sweep()
+            with self._lock:
+                self.sweeps += 1
+                if "error" not in result:
+                    self._entries.pop(key, None)
+                    self._entries[key] = (time.time(), result)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+                self._inflight.pop(key, None)
+            return result, None
+
+    def stats(self) -> Dict[str, Any]:
+        """Sweeps run, sweeps shared and addresses currently cached."""
+        with self._lock:
+            return {"sweeps": self.sweeps, "hits": self.hits, "cached_addresses": len(self._entries)}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
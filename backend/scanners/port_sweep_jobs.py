@@ -0,0 +1,275 @@
+"""
+Port Sweep Jobs Module
+Runs full-range (1-65535) port sweeps in the background with progress
+reporting and resume.
+
+A full sweep takes minutes on hosts that drop packets, far longer than a
+request should block. Jobs run on a small dedicated pool (each sweep on its
+own bounded connect pool, see ports_check.sweep_port_range) and stop at a
+chunk boundary once their time budget is spent; a paused or failed job
+resumes from the first port it hasn't swept.
+"""
+
+import math
+import os
+import socket
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+from .ports_check import MAX_PORT, sweep_port_range
+from .service_fingerprint import identify_services
+
+
+DEFAULT_WORKERS = 1
+DEFAULT_TIME_BUDGET = 300
+DEFAULT_MAX_JOBS = 200
+DEFAULT_MAX_ACTIVE = 4
+
+QUEUED = "queued"
+RUNNING = "running"
+PAUSED = "paused"          # time budget spent; resumable
+COMPLETED = "completed"
+FAILED = "failed"          # resumable once the cause is fixed
+
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+RESUMABLE_STATUSES = (PAUSED, FAILED)
+
+
+class SweepCapacityExceeded(Exception):
+    """Too many sweeps queued or running; retry after retry_after seconds."""
+
+    def __init__(self, max_active: int, retry_after: int):
+        super().__init__(f"At most {max_active} port sweeps can be queued or running, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class PortSweepJob:
+    """State of one background sweep, updated after every chunk."""
+
+    __slots__ = (
+        "job_id", "url", "hostname", "max_port", "status", "ip", "next_port",
+        "open_ports", "identified_services", "error", "created_at", "updated_at",
+        "elapsed_seconds", "runs", "run_started"
+    )
+
+    def __init__(self, url: str, max_port: int):
+        self.job_id = uuid.uuid4().hex
+        self.url = url
+        self.hostname = url.replace("http://", "").replace("https://", "").split('/')[0]
+        self.max_port = max_port
+        self.status = QUEUED
+        self.ip: Optional[str] = None
+        self.next_port = 1
+        self.open_ports: List[Dict[str, Any]] = []
+        self.identified_services: List[Dict[str, Any]] = []
+        self.error: Optional[str] = None
+        self.created_at = datetime.utcnow().isoformat()
+        self.updated_at = self.created_at
+        self.elapsed_seconds = 0.0
+        self.runs = 0
+        self.run_started: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Progress snapshot returned by the API."""
+        scanned = self.next_port - 1
+        return {
+            "job_id": self.job_id,
+            "url": self.url,
+            "hostname": self.hostname,
+            "ip": self.ip,
+            "status": self.status,
+            "max_port": self.max_port,
+            "next_port": self.next_port if self.next_port <= self.max_port else None,
+            "ports_scanned": scanned,
+            "progress_percent": round(100.0 * scanned / self.max_port, 1),
+            "open_ports": [dict(entry) for entry in self.open_ports],
+            "ports_open_count": len(self.open_ports),
+            "identified_services": [dict(entry) for entry in self.identified_services],
+            "error": self.error,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "elapsed_seconds": round(self.elapsed_seconds, 1),
+            "runs": self.runs
+        }
+
+
+class PortSweepJobs:
+    """
+    Bounded registry and runner of background port sweeps.
+
+    At most workers sweeps run at once, and at most max_active are queued or
+    running; starting or resuming beyond that raises SweepCapacityExceeded.
+    Starting a sweep for a URL that already has one queued or running
+    returns that job. When the registry is full the oldest finished job is
+    dropped.
+    """
+
+    def __init__(
+        self,
+        workers: int = DEFAULT_WORKERS,
+        time_budget: float = DEFAULT_TIME_BUDGET,
+        max_jobs: int = DEFAULT_MAX_JOBS,
+        max_active: int = DEFAULT_MAX_ACTIVE
+    ):
+        self.time_budget = time_budget
+        self.max_jobs = max_jobs
+        self.max_active = max_active
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._jobs: "OrderedDict[str, PortSweepJob]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "PortSweepJobs":
+        """
+        Build a runner from PORT_SWEEP_JOB_WORKERS, PORT_SWEEP_TIME_BUDGET,
+        PORT_SWEEP_MAX_JOBS and PORT_SWEEP_MAX_ACTIVE.
+        """
+        return cls(
+            workers=int(os.getenv("PORT_SWEEP_JOB_WORKERS", DEFAULT_WORKERS)),
+            time_budget=float(os.getenv("PORT_SWEEP_TIME_BUDGET", DEFAULT_TIME_BUDGET)),
+            max_jobs=int(os.getenv("PORT_SWEEP_MAX_JOBS", DEFAULT_MAX_JOBS)),
+            max_active=int(os.getenv("PORT_SWEEP_MAX_ACTIVE", DEFAULT_MAX_ACTIVE))
+        )
+
+    def _check_capacity(self) -> None:
+        """
+        Raise if max_active sweeps are already queued or running (caller holds _lock).
+
+        The retry estimate is when the running sweep closest to its time
+        budget will have to stop.
+        """
+        active = [job for job in self._jobs.values() if job.status in ACTIVE_STATUSES]
+        if len(active) < self.max_active:
+            return
+        now = time.monotonic()
+        remaining = [
+            self.time_budget - (now - job.run_started)
+            for job in active if job.status == RUNNING and job.run_started is not None
+        ]
+        retry_after = min(remaining) if remaining else self.time_budget
+        raise SweepCapacityExceeded(self.max_active, max(1, math.ceil(retry_after)))
+
+    def start(self, url: str, max_port: int = MAX_PORT) -> Dict[str, Any]:
+        """
+        Queue a sweep of ports 1..max_port.
+
+        Args:
+            url: Normalized URL (domain name without protocol)
+            max_port: Last port to sweep
+
+        Returns:
+            Snapshot of the new job, or of the URL's job already in progress
+
+        Raises:
+            ValueError: If max_port is out of range
+            SweepCapacityExceeded: If max_active sweeps are queued or running
+        """
+        if not 1 <= max_port <= MAX_PORT:
+            raise ValueError(f"max_port must be between 1 and {MAX_PORT}")
+        with self._lock:
+            for job in self._jobs.values():
+                if job.url == url and job.max_port == max_port and job.status in ACTIVE_STATUSES:
+                    return job.to_dict()
+            self._check_capacity()
+            job = PortSweepJob(url, max_port)
+            self._jobs[job.job_id] = job
+            self._evict()
+            snapshot = job.to_dict()
+        self._executor.submit(self._run, job)
+        return snapshot
+
+    def resume(self, job_id: str) -> Dict[str, Any]:
+        """
+        Requeue a paused or failed job from its next unswept port.
+
+        Args:
+            job_id: Id returned by start
+
+        Returns:
+            Snapshot of the requeued job
+
+        Raises:
+            KeyError: If the job is unknown or was dropped
+            ValueError: If the job is queued, running or completed
+            SweepCapacityExceeded: If max_active sweeps are queued or running
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                raise KeyError(f"Unknown port sweep job: {job_id}")
+            if job.status not in RESUMABLE_STATUSES:
+                raise ValueError(f"Port sweep job is {job.status}, only paused or failed jobs can be resumed")
+            self._check_capacity()
+            job.status = QUEUED
+            job.error = None
+            job.updated_at = datetime.utcnow().isoformat()
+            snapshot = job.to_dict()
+        self._executor.submit(self._run, job)
+        return snapshot
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Snapshot of a job, or None if unknown."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.to_dict() if job is not None else None
+
+    def _evict(self) -> None:
+        """Drop the oldest finished jobs beyond max_jobs (caller holds _lock)."""
+        excess = len(self._jobs) - self.max_jobs
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.status not in ACTIVE_STATUSES]:
+            if excess <= 0:
+                break
+            del self._jobs[job_id]
+            excess -= 1
+
+    def _update(self, job: PortSweepJob, **fields: Any) -> None:
+        with self._lock:
+            for name, value in fields.items():
+                setattr(job, name, value)
+            job.updated_at = datetime.utcnow().isoformat()
+
+    def _run(self, job: PortSweepJob) -> None:
+        """Sweep from job.next_port until done or out of time budget."""
+        started = time.monotonic()
+        self._update(job, status=RUNNING, runs=job.runs + 1, run_started=started)
+        found_before = list(job.open_ports)
+        elapsed_before = job.elapsed_seconds
+
+        def on_chunk(next_port: int, open_ports: List[Dict[str, Any]]) -> None:
+            self._update(
+                job,
+                next_port=next_port,
+                open_ports=found_before + open_ports,
+                elapsed_seconds=elapsed_before + time.monotonic() - started
+            )
+
+        try:
+            if job.ip is None:
+                try:
+                    self._update(job, ip=socket.gethostbyname(job.hostname))
+                except socket.gaierror:
+                    self._update(job, status=FAILED, error=f"Unable to resolve hostname: {job.hostname}")
+                    return
+
+            _, next_port = sweep_port_range(
+                job.ip, job.next_port, job.max_port,
+                deadline=started + self.time_budget, progress=on_chunk
+            )
+            if next_port <= job.max_port:
+                self._update(job, status=PAUSED)
+                return
+
+            services = identify_services(job.ip, [entry["port"] for entry in job.open_ports])
+            self._update(
+                job,
+                status=COMPLETED,
+                identified_services=services,
+                elapsed_seconds=elapsed_before + time.monotonic() - started
+            )
+        except Exception as e:
+            self._update(job, status=FAILED, error=f"Port sweep error: {str(e)}")
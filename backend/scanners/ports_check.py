@@ -4,9 +4,26 @@ Checks for open ports on the target website.
 """
 
 import socket
-import threading
-from typing import Dict, List, Any
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Any, Callable, Optional, Tuple
 
+from .port_sweep_cache import PortSweepCache
+from .service_fingerprint import identify_services
+
+
+DEFAULT_MAX_PORT = 1024
+MAX_PORT = 65535
+
+# Bounded sweep engine: concurrent connects per sweep and ports per chunk.
+# A full 1-65535 sweep of a host that drops every packet takes at most
+# ceil(65535 / PORT_SCAN_WORKERS) * PORT_CONNECT_TIMEOUT seconds (~4.5 min);
+# hosts that refuse closed ports finish in seconds. Sweeps of the default
+# range connect to every port at once so they finish within one timeout.
+PORT_SCAN_WORKERS = 256
+PORT_SCAN_CHUNK_SIZE = 1024
+PORT_CONNECT_TIMEOUT = 1.0
 
 COMMON_PORTS = {
     21: "FTP",
@@ -33,50 +50,129 @@ COMMON_PORTS = {
 }
 
 
-def check_port(hostname: str, port: int, results: List[Dict]) -> None:
+def _is_open(ip: str, port: int, timeout: float) -> bool:
+    """True if a TCP connect to ip:port succeeds within timeout."""
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            return sock.connect_ex((ip, port)) == 0
+    except OSError:
+        return False
+
+
+def sweep_port_range(
+    ip: str,
+    start_port: int = 1,
+    end_port: int = DEFAULT_MAX_PORT,
+    workers: int = PORT_SCAN_WORKERS,
+    chunk_size: int = PORT_SCAN_CHUNK_SIZE,
+    timeout: float = PORT_CONNECT_TIMEOUT,
+    deadline: Optional[float] = None,
+    progress: Optional[Callable[[int, List[Dict[str, Any]]], None]] = None
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Sweep start_port..end_port in chunks on a bounded pool of connects.
+
+    At most workers sockets are open at once, so a chunk takes at most
+    ceil(chunk_size / workers) * timeout seconds and the whole range at most
+    ceil(ports / workers) * timeout. The deadline is checked between chunks;
+    a sweep that runs out of time stops at a chunk boundary and can be
+    resumed from the returned port.
+
+    Args:
+        ip: IPv4 address to sweep
+        start_port: First port to sweep (resume point)
+        end_port: Last port to sweep (at most 65535)
+        workers: Concurrent connects
+        chunk_size: Ports scheduled per chunk
+        timeout: Connect timeout per port in seconds
+        deadline: time.monotonic() value after which no new chunk starts
+        progress: Called after every chunk with the next port to sweep and
+            the open ports found so far in this call
+
+    Returns:
+        (open port entries sorted by port number, next port to sweep);
+        the next port is end_port + 1 when the range was finished
+    """
+    if not 1 <= start_port <= end_port + 1 or end_port > MAX_PORT:
+        raise ValueError(f"Invalid port range: {start_port}-{end_port}")
+
+    open_ports = []
+    next_port = start_port
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, end_port - start_port + 1))) as executor:
+        while next_port <= end_port:
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            chunk = range(next_port, min(next_port + chunk_size, end_port + 1))
+            for port, is_open in zip(chunk, executor.map(lambda port: _is_open(ip, port, timeout), chunk)):
+                if is_open:
+                    open_ports.append({
+                        "port": port,
+                        "status": "open",
+                        "service": COMMON_PORTS.get(port, "Unknown")
+                    })
+            next_port = chunk.stop
+            if progress is not None:
+                progress(next_port, open_ports)
+    return open_ports, next_port
+
+
+def sweep_ports(ip: str, max_port: int = DEFAULT_MAX_PORT) -> List[Dict[str, Any]]:
     """
-    Check if a single port is open.
+    Sweep ports 1..max_port on one resolved address.
+    
+    Ranges up to DEFAULT_MAX_PORT get a connect per port (one timeout in
+    total); larger ones share the PORT_SCAN_WORKERS cap.
     
     Args:
-        hostname: Target hostname
-        port: Port number to check
-        results: List to store results
+        ip: IPv4 address to sweep
+        max_port: Maximum port to scan (default 1024, at most 65535)
+    
+    Returns:
+        Open port entries sorted by port number
     """
-    try:
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(1)
-        result = sock.connect_ex((hostname, port))
-        sock.close()
-        
-        if result == 0:
-            service = COMMON_PORTS.get(port, "Unknown")
-            results.append({
-                "port": port,
-                "status": "open",
-                "service": service
-            })
-    except Exception:
-        pass
-
-
-def check_ports(url: str, max_port: int = 1024) -> Dict[str, Any]:
+    workers = max_port if max_port <= DEFAULT_MAX_PORT else PORT_SCAN_WORKERS
+    open_ports, _ = sweep_port_range(ip, 1, max_port, workers=workers)
+    return open_ports
+
+
+def _sweep_and_identify(ip: str, max_port: int) -> Dict[str, Any]:
+    """Port sweep followed by banner identification of the open ports."""
+    open_ports = sweep_ports(ip, max_port)
+    return {
+        "open_ports": open_ports,
+        "identified_services": identify_services(ip, [entry["port"] for entry in open_ports])
+    }
+
+
+def check_ports(
+    url: str,
+    max_port: int = DEFAULT_MAX_PORT,
+    sweep_cache: Optional[PortSweepCache] = None
+) -> Dict[str, Any]:
     """
-    Check for open ports on the target website (1-1024).
+    Check for open ports on the target website (1-max_port).
+    
+    Full-range sweeps that should report progress or survive a time budget
+    go through port_sweep_jobs instead.
     
     Args:
         url: Website URL (domain name without protocol)
-        max_port: Maximum port to scan (default 1024)
+        max_port: Maximum port to scan (default 1024, at most 65535)
+        sweep_cache: Share sweeps between hostnames on the same address
+            within its freshness window (batch scans)
     
     Returns:
-        Dictionary with port scan results
+        Dictionary with port scan results; identified_services lists what
+        each open port's banner says it runs (see service_fingerprint)
     """
     try:
         # Extract hostname from URL
         hostname = url.replace("http://", "").replace("https://", "").split('/')[0]
         
-        # Verify hostname is resolvable
+        # Resolve once; every port probe goes to the address
         try:
-            socket.gethostbyname(hostname)
+            ip = socket.gethostbyname(hostname)
         except socket.gaierror:
             return {
                 "open_ports": [],
@@ -84,33 +180,23 @@ def check_ports(url: str, max_port: int = 1024) -> Dict[str, Any]:
                 "error": f"Unable to resolve hostname: {hostname}"
             }
         
-        open_ports = []
-        threads = []
-        
-        # Create threads for parallel scanning
-        # Note: Limit threads to avoid overwhelming the system
-        for port in range(1, min(max_port + 1, 1025)):
-            thread = threading.Thread(
-                target=check_port,
-                args=(hostname, port, open_ports)
-            )
-            thread.daemon = True
-            threads.append(thread)
-            thread.start()
+        if sweep_cache is None:
+            sweep, swept_at = _sweep_and_identify(ip, max_port), None
+        else:
+            sweep, swept_at = sweep_cache.get_or_sweep(ip, max_port, lambda: _sweep_and_identify(ip, max_port))
+        open_ports = [dict(entry) for entry in sweep["open_ports"]]
         
-        # Wait for all threads to complete
-        for thread in threads:
-            thread.join(timeout=2)
-        
-        # Sort open ports by port number
-        open_ports.sort(key=lambda x: x['port'])
-        
-        return {
+        result = {
             "open_ports": open_ports,
             "total_scanned": max_port,
             "ports_open_count": len(open_ports),
-            "hostname": hostname
+            "hostname": hostname,
+            "ip": ip,
+            "identified_services": [dict(entry) for entry in sweep["identified_services"]]
         }
+        if swept_at is not None:
+            result["shared_sweep_at"] = datetime.utcfromtimestamp(swept_at).isoformat()
+        return result
     
     except Exception as e:
         return {
@@ -102,7 +102,7 @@ def generate_technical_layer(scan_data: Dict[str, Any], risk_score: Dict[str, An
         risk_score: Risk score data
     
     Returns:
-        Technical layer with raw headers, metadata, and detailed analysis
+        Technical layer with header/port details, metadata, and detailed analysis
     """
     
     return {
@@ -123,7 +123,8 @@ def generate_technical_layer(scan_data: Dict[str, Any], risk_score: Dict[str, An
         "security_headers": {
             "present": scan_data.get("headers", {}).get("present_headers", []),
             "missing": scan_data.get("headers", {}).get("missing_headers", []),
-            "raw_headers": scan_data.get("headers", {}).get("all_headers", {})
+            "policies": scan_data.get("headers", {}).get("policies", {}),
+            "paths": scan_data.get("headers", {}).get("paths", {})
         },
         "network_exposure": {
             "open_ports": scan_data.get("ports", {}).get("open_ports", []),
@@ -138,8 +139,26 @@ def generate_technical_layer(scan_data: Dict[str, Any], risk_score: Dict[str, An
             "scan_duration_ms": scan_data.get("scan_duration_ms", "N/A"),
             "backend_version": "1.0.0",
             "api_version": "1.0"
-        },
-        "raw_response": scan_data  # Full raw data included
+        }
+    }
+
+
+def generate_raw_layer(scan_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Raw scanner output, including every response header.
+    
+    Only built when explicitly requested; the other layers never embed it.
+    
+    Args:
+        scan_data: Full scan results
+    
+    Returns:
+        ssl, headers (with all_headers) and ports exactly as scanned
+    """
+    return {
+        "ssl": scan_data.get("ssl", {}),
+        "headers": scan_data.get("headers", {}),
+        "ports": scan_data.get("ports", {})
     }
 
 
@@ -0,0 +1,259 @@
+"""
+Compact Scan Result Model
+Slotted, memory-light representation of raw scanner output. Per-entry text
+(header descriptions, port service names) is looked up from the scanners'
+static tables and only expanded back into dicts when serialized.
+"""
+
+from typing import Dict, Any, Optional, Tuple
+
+from .headers_check import REQUIRED_HEADERS
+from .ports_check import COMMON_PORTS
+from .findings import ScanFindings, findings_from_scan
+from .header_policy import grade_headers, FAIL
+
+
+_MISSING = object()
+
+
+class SslResult:
+    """SSL/TLS check result (see ssl_check.check_ssl)."""
+
+    __slots__ = ("is_valid", "error", "issued_to", "issued_by", "expires_in_days",
+                 "warning", "protocol_version", "cipher", "extra")
+
+    FIELDS = ("is_valid", "error", "issued_to", "issued_by", "expires_in_days",
+              "warning", "protocol_version", "cipher")
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SslResult":
+        result = cls()
+        for field in cls.FIELDS:
+            setattr(result, field, data.get(field, _MISSING))
+        extra = {k: v for k, v in data.items() if k not in cls.FIELDS}
+        result.extra = extra or None
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {}
+        for field in self.FIELDS:
+            value = getattr(self, field)
+            if value is not _MISSING:
+                data[field] = value
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+
+class HeadersResult:
+    """
+    Security headers check result (see headers_check.check_headers).
+
+    Present headers are kept as (name, value) pairs and missing headers as
+    names; descriptions come from REQUIRED_HEADERS on serialization. Policy
+    grades are re-derived from all_headers through the shared policy cache.
+    Entries that don't match the scanner's shape are kept verbatim in extra.
+    """
+
+    __slots__ = ("present", "missing", "headers_score", "missing_count", "all_headers", "error", "graded", "extra")
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "HeadersResult":
+        result = cls()
+        extra = {k: v for k, v in data.items() if k not in (
+            "present_headers", "missing_headers", "headers_score", "missing_count", "all_headers", "error",
+            "policies", "weak_headers"
+        )}
+
+        present = data.get("present_headers", _MISSING)
+        if present is not _MISSING and _canonical_headers(present, ("name", "value", "description")):
+            present = tuple((h["name"], h["value"]) for h in present)
+        elif present is not _MISSING:
+            extra["present_headers"] = present
+            present = _MISSING
+
+        missing = data.get("missing_headers", _MISSING)
+        if missing is not _MISSING and _canonical_headers(missing, ("name", "description")):
+            missing = tuple(h["name"] for h in missing)
+        elif missing is not _MISSING:
+            extra["missing_headers"] = missing
+            missing = _MISSING
+
+        result.present = present
+        result.missing = missing
+        result.headers_score = data.get("headers_score", _MISSING)
+        result.missing_count = data.get("missing_count", _MISSING)
+        result.all_headers = data.get("all_headers", _MISSING)
+        result.error = data.get("error", _MISSING)
+
+        result.graded = False
+        if "policies" in data or "weak_headers" in data:
+            if isinstance(result.all_headers, dict) and _graded(result.all_headers) == (
+                data.get("policies"), data.get("weak_headers")
+            ):
+                result.graded = True
+            else:
+                extra.update({k: data[k] for k in ("policies", "weak_headers") if k in data})
+
+        result.extra = extra or None
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {}
+        if self.present is not _MISSING:
+            data["present_headers"] = [
+                {"name": name, "value": value, "description": REQUIRED_HEADERS[name]}
+                for name, value in self.present
+            ]
+        if self.missing is not _MISSING:
+            data["missing_headers"] = [
+                {"name": name, "description": REQUIRED_HEADERS[name]}
+                for name in self.missing
+            ]
+        for field in ("headers_score", "missing_count", "all_headers", "error"):
+            value = getattr(self, field)
+            if value is not _MISSING:
+                data[field] = value
+        if self.graded:
+            data["policies"], data["weak_headers"] = _graded(self.all_headers)
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+
+def _graded(all_headers: Dict[str, Any]) -> tuple:
+    """(policies, weak_headers) exactly as check_headers builds them."""
+    policies = grade_headers(all_headers)
+    return policies, [name for name, policy in policies.items() if policy["status"] == FAIL]
+
+
+class PortsResult:
+    """
+    Port scan result (see ports_check.check_ports).
+
+    Open ports are kept as a tuple of numbers; service names come from
+    COMMON_PORTS on serialization.
+    """
+
+    __slots__ = ("open_ports", "total_scanned", "ports_open_count", "hostname", "error", "extra")
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PortsResult":
+        result = cls()
+        extra = {k: v for k, v in data.items() if k not in (
+            "open_ports", "total_scanned", "ports_open_count", "hostname", "error"
+        )}
+
+        open_ports = data.get("open_ports", _MISSING)
+        if open_ports is not _MISSING and _canonical_ports(open_ports):
+            open_ports = tuple(p["port"] for p in open_ports)
+        elif open_ports is not _MISSING:
+            extra["open_ports"] = open_ports
+            open_ports = _MISSING
+
+        result.open_ports = open_ports
+        result.total_scanned = data.get("total_scanned", _MISSING)
+        result.ports_open_count = data.get("ports_open_count", _MISSING)
+        result.hostname = data.get("hostname", _MISSING)
+        result.error = data.get("error", _MISSING)
+        result.extra = extra or None
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {}
+        if self.open_ports is not _MISSING:
+            data["open_ports"] = [
+                {"port": port, "status": "open", "service": COMMON_PORTS.get(port, "Unknown")}
+                for port in self.open_ports
+            ]
+        for field in ("total_scanned", "ports_open_count", "hostname", "error"):
+            value = getattr(self, field)
+            if value is not _MISSING:
+                data[field] = value
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+
+class ScanResult:
+    """
+    Raw results of one scan in compact form.
+
+    Use ScanResult.from_dict() on scanner output and to_dict() at the API edge.
+    """
+
+    __slots__ = ("url", "scan_timestamp", "ssl", "headers", "ports", "_findings")
+
+    def __init__(
+        self,
+        url: Optional[str],
+        scan_timestamp: Optional[str],
+        ssl: SslResult,
+        headers: HeadersResult,
+        ports: PortsResult
+    ):
+        self.url = url
+        self.scan_timestamp = scan_timestamp
+        self.ssl = ssl
+        self.headers = headers
+        self.ports = ports
+        self._findings = None
+
+    @classmethod
+    def from_dict(cls, scan_data: Dict[str, Any]) -> "ScanResult":
+        """
+        Build a compact result from a scan dict (url, scan_timestamp, ssl, headers, ports).
+
+        Args:
+            scan_data: Raw scan results
+
+        Returns:
+            ScanResult
+        """
+        return cls(
+            url=scan_data.get("url"),
+            scan_timestamp=scan_data.get("scan_timestamp"),
+            ssl=SslResult.from_dict(scan_data.get("ssl") or {}),
+            headers=HeadersResult.from_dict(scan_data.get("headers") or {}),
+            ports=PortsResult.from_dict(scan_data.get("ports") or {})
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize back to the scanner dict shape."""
+        return {
+            "url": self.url,
+            "scan_timestamp": self.scan_timestamp,
+            "ssl": self.ssl.to_dict(),
+            "headers": self.headers.to_dict(),
+            "ports": self.ports.to_dict()
+        }
+
+    def findings(self) -> ScanFindings:
+        """Normalized findings, computed once."""
+        if self._findings is None:
+            self._findings = findings_from_scan(self.to_dict())
+        return self._findings
+
+
+def _canonical_headers(entries: Any, keys: Tuple[str, ...]) -> bool:
+    """True if header entries match the scanner's shape and description table."""
+    if not isinstance(entries, list):
+        return False
+    for entry in entries:
+        if not isinstance(entry, dict) or len(entry) != len(keys) or any(k not in entry for k in keys):
+            return False
+        if REQUIRED_HEADERS.get(entry["name"], _MISSING) != entry["description"]:
+            return False
+    return True
+
+
+def _canonical_ports(entries: Any) -> bool:
+    """True if port entries match the scanner's shape and service table."""
+    if not isinstance(entries, list):
+        return False
+    for entry in entries:
+        if not isinstance(entry, dict) or len(entry) != 3 or entry.get("status") != "open":
+            return False
+        if not isinstance(entry.get("port"), int) or COMMON_PORTS.get(entry["port"], "Unknown") != entry.get("service"):
+            return False
+    return True
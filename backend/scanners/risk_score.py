@@ -3,7 +3,26 @@ Risk Score Calculation Module
 Calculates an overall security risk score (0-100) based on various factors.
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+
+
+# FTP, SSH, Telnet, SMB, MySQL, PostgreSQL, MongoDB
+DANGEROUS_PORTS = {21: "FTP", 22: "SSH", 23: "Telnet", 445: "SMB", 3306: "MySQL", 5432: "PostgreSQL", 27017: "MongoDB"}
+DANGEROUS_SERVICES = frozenset(DANGEROUS_PORTS.values())
+
+
+def is_dangerous_port(port: Any, identified: Optional[Dict[Any, str]] = None) -> bool:
+    """
+    Whether an open port gets the dangerous-port penalty.
+    
+    Args:
+        port: Port number
+        identified: Port -> banner-identified service (see service_fingerprint)
+    
+    Returns:
+        True for a dangerous port number, or a dangerous service on any port
+    """
+    return port in DANGEROUS_PORTS or (identified or {}).get(port) in DANGEROUS_SERVICES
 
 
 def calculate_risk_score(ssl_data: Dict[str, Any], 
@@ -17,7 +36,8 @@ def calculate_risk_score(ssl_data: Dict[str, Any],
     - Deduct points for security issues
     - SSL/TLS issues: -30 to -40 points
     - Missing security headers: -5 to -25 points
-    - Open ports: -2 to -3 points per port
+    - Open ports: -2 to -3 points per port (-3 for dangerous port numbers
+      or banner-identified dangerous services)
     
     Args:
         ssl_data: SSL check results
@@ -70,14 +90,17 @@ def calculate_risk_score(ssl_data: Dict[str, Any],
     
     # Calculate port deduction (higher deduction for certain dangerous ports)
     open_ports = ports_data.get('open_ports', [])
-    dangerous_ports = {21, 22, 23, 445, 3306, 5432, 27017}  # FTP, SSH, Telnet, SMB, MySQL, PostgreSQL, MongoDB
+    identified = {
+        entry.get('port'): entry.get('service')
+        for entry in ports_data.get('identified_services', []) or [] if isinstance(entry, dict)
+    }
     
     ports_deduction = 0
     dangerous_open = []
     
     for port_info in open_ports:
         port = port_info['port']
-        if port in dangerous_ports:
+        if is_dangerous_port(port, identified):
             ports_deduction += 3  # More severe penalty
             dangerous_open.append(port)
         else:
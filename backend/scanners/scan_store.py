@@ -0,0 +1,80 @@
+"""
+Scan Result Store Module
+Keeps raw scanner output server-side for a while so analysis can be rerun without rescanning.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple, Union
+
+from .result_model import ScanResult
+
+
+DEFAULT_TTL_SECONDS = 3600
+DEFAULT_MAX_ENTRIES = 1000
+
+
+class ScanResultStore:
+    """
+    Bounded, expiring store of raw scan results keyed by scan id.
+
+    Entries expire after ttl_seconds; when full, the least recently used
+    entry is evicted. Results are held as compact ScanResult objects.
+    """
+
+    def __init__(self, ttl_seconds: float = DEFAULT_TTL_SECONDS, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, ScanResult]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "ScanResultStore":
+        """Build a store from SCAN_STORE_TTL_SECONDS and SCAN_STORE_MAX_ENTRIES."""
+        return cls(
+            ttl_seconds=float(os.getenv("SCAN_STORE_TTL_SECONDS", DEFAULT_TTL_SECONDS)),
+            max_entries=int(os.getenv("SCAN_STORE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES))
+        )
+
+    def put(self, scan_id: str, scan_data: Union[ScanResult, Dict[str, Any]]) -> None:
+        """
+        Store raw scan results.
+
+        Args:
+            scan_id: Stable id of the scan
+            scan_data: ScanResult, or dict with url, scan_timestamp, ssl, headers and ports
+        """
+        if not isinstance(scan_data, ScanResult):
+            scan_data = ScanResult.from_dict(scan_data)
+        with self._lock:
+            self._entries.pop(scan_id, None)
+            self._entries[scan_id] = (time.monotonic(), scan_data)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, scan_id: str) -> Optional[ScanResult]:
+        """
+        Fetch raw scan results if they are still retained.
+
+        Args:
+            scan_id: Id returned by the scan endpoint
+
+        Returns:
+            Stored ScanResult, or None if unknown or expired
+        """
+        with self._lock:
+            entry = self._entries.get(scan_id)
+            if entry is None:
+                return None
+            stored_at, scan = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[scan_id]
+                return None
+            self._entries.move_to_end(scan_id)
+            return scan
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
@@ -3,157 +3,867 @@ Security Drift & Change Tracking Module
 Tracks security changes over time and reports improvements/regressions.
 """
 
+import hashlib
 import json
 import os
-from typing import Dict, Any, List, Optional
-from datetime import datetime
+import threading
+import time
+import uuid
+from bisect import bisect_left, bisect_right
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime, timezone
+
+from .drift_alerts import AlertDispatcher
+from .batch_scoring import build_feature_matrix, batch_risk_score, batch_context_aware_risk
+from .context_risk_scoring import WEIGHTS_VERSION, risk_for_findings
+from .findings import findings_from_scan
 
 
 SCAN_HISTORY_FILE = "/tmp/security_scan_history.json"  # In-memory file-based storage
 
+# The snapshot is rewritten once the journal holds this many entries, or as
+# many as there are records if that is more, so compaction stays amortized O(1)
+HISTORY_COMPACT_MIN_ENTRIES = 10000
+
+# Unchanged rescans only move a run's last_seen/repeat_count; those updates
+# are kept in memory and journaled together at most this often (and on flush)
+HISTORY_FLUSH_SECONDS = 30
+
+# Fleet dashboard ordering, most severe first
+SEVERITY_ORDER = ["critical", "significant", "minor"]
+FLEET_CATEGORIES = ["any", "regressions", "ssl_broken", "new_ports"]
+
 
 class ScanHistoryTracker:
-    """Lightweight security drift tracker."""
+    """
+    Lightweight security drift tracker.
     
-    def __init__(self, history_file: str = SCAN_HISTORY_FILE):
+    History is persisted as a JSON snapshot plus an append-only journal
+    (history_file + ".journal") with one line per new record, so a scan
+    costs one small append however large the history is. Run extensions
+    from unchanged rescans are coalesced per host and journaled every
+    HISTORY_FLUSH_SECONDS, so stable hosts cost no I/O per scan; call
+    flush() before exiting.
+    """
+    
+    def __init__(self, history_file: str = SCAN_HISTORY_FILE, alert_dispatcher: Optional[AlertDispatcher] = None):
         self.history_file = history_file
+        self.alert_dispatcher = alert_dispatcher
+        # Batch scans record from worker threads
+        self._lock = threading.RLock()
+        self._journal_entries = 0
+        self._pending_extensions: Dict[str, Dict[str, Any]] = {}
+        self._last_flush = time.monotonic()
         self.history = self._load_history()
+        self._build_indexes()
+    
+    @property
+    def journal_file(self) -> str:
+        return self.history_file + ".journal"
     
     def _load_history(self) -> Dict[str, List[Dict[str, Any]]]:
-        """Load scan history from file."""
+        """Load the scan history snapshot and replay the journal on top of it."""
+        history: Dict[str, List[Dict[str, Any]]] = {}
         if os.path.exists(self.history_file):
             try:
                 with open(self.history_file, 'r') as f:
-                    return json.load(f)
+                    history = json.load(f)
             except (json.JSONDecodeError, IOError):
-                return {}
-        return {}
+                history = {}
+        
+        if os.path.exists(self.journal_file):
+            try:
+                with open(self.journal_file, 'r') as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except json.JSONDecodeError:
+                            break  # Torn final write
+                        _replay(history, entry)
+                        self._journal_entries += 1
+            except IOError:
+                pass
+        return history
     
-    def _save_history(self) -> None:
-        """Save scan history to file."""
+    def _journal(self, *entries: Dict[str, Any]) -> None:
+        """Append changes to the journal, compacting it when it has grown (lock held)."""
         try:
             os.makedirs(os.path.dirname(self.history_file), exist_ok=True)
-            with open(self.history_file, 'w') as f:
-                json.dump(self.history, f, indent=2)
+            with open(self.journal_file, 'a') as f:
+                f.write("".join(json.dumps(entry, separators=(",", ":")) + "\n" for entry in entries))
         except IOError:
+            return  # Silently fail if unable to save
+        self._journal_entries += len(entries)
+        if self._journal_entries >= max(HISTORY_COMPACT_MIN_ENTRIES, self._record_total):
+            self._save_history()
+    
+    def flush(self) -> None:
+        """Journal the run extensions still held in memory."""
+        with self._lock:
+            self._last_flush = time.monotonic()
+            if not self._pending_extensions:
+                return
+            pending = list(self._pending_extensions.values())
+            self._pending_extensions.clear()
+            self._journal(*pending)
+    
+    def _save_history(self) -> None:
+        """Write a full snapshot and start a new journal (lock held)."""
+        try:
+            os.makedirs(os.path.dirname(self.history_file), exist_ok=True)
+            temp_file = self.history_file + ".tmp"
+            with open(temp_file, 'w') as f:
+                json.dump(self.history, f, separators=(",", ":"))
+            os.replace(temp_file, self.history_file)
+            if os.path.exists(self.journal_file):
+                os.remove(self.journal_file)
+            self._journal_entries = 0
+            self._pending_extensions.clear()  # The snapshot includes them
+        except (IOError, OSError):
             pass  # Silently fail if unable to save
     
-    def record_scan(self, url: str, scan_data: Dict[str, Any]) -> None:
-        """Record a security scan result."""
-        if url not in self.history:
-            self.history[url] = []
-        
-        record = {
-            "timestamp": datetime.utcnow().isoformat(),
-            "risk_score": scan_data.get("risk_score", {}).get("score", 0),
-            "risk_level": scan_data.get("risk_score", {}).get("risk_level", "UNKNOWN"),
-            "ssl_valid": scan_data.get("ssl", {}).get("is_valid", False),
-            "missing_headers_count": scan_data.get("headers", {}).get("missing_count", 0),
-            "open_ports_count": scan_data.get("ports", {}).get("ports_open_count", 0),
-            "missing_headers": [h.get('name') for h in scan_data.get("headers", {}).get("missing_headers", [])],
-            "open_ports": [p.get('port') for p in scan_data.get("ports", {}).get("open_ports", [])]
+    def _build_indexes(self) -> None:
+        """
+        Build lookup indexes over the loaded history.
+        
+        - Parsed timestamps per URL (sorted, for binary search)
+        - scan_id -> (url, position)
+        - First timestamp each port was seen open, per URL
+        - Total scans per URL (run-length records count every repeat)
+        """
+        self._timestamps: Dict[str, List[datetime]] = {}
+        self._scan_ids: Dict[str, Tuple[str, int]] = {}
+        self._port_first_seen: Dict[str, Dict[int, str]] = {}
+        self._scan_counts: Dict[str, int] = {}
+        self._latest_state: Dict[str, Dict[str, Any]] = {}
+        self._record_total = sum(len(records) for records in self.history.values())
+        self._fleet_buckets: Dict[Tuple[str, str], List[str]] = {
+            (category, severity): [] for category in FLEET_CATEGORIES for severity in SEVERITY_ORDER
+        }
+        self._fleet_positions: Dict[Tuple[str, str], Dict[str, int]] = {
+            key: {} for key in self._fleet_buckets
+        }
+        
+        for url, records in self.history.items():
+            records[:] = [_migrate_record(r) for r in records]
+            timestamps = [_parse_timestamp(r["timestamp"]) for r in records]
+            if any(a > b for a, b in zip(timestamps, timestamps[1:])):
+                order = sorted(range(len(records)), key=timestamps.__getitem__)
+                records[:] = [records[i] for i in order]
+                timestamps = [timestamps[i] for i in order]
+            self._timestamps[url] = timestamps
+            self._scan_counts[url] = sum(r.get("repeat_count", 1) for r in records)
+            for position, record in enumerate(records):
+                self._index_record(url, position, record)
+            self._update_latest_state(url)
+    
+    def _index_record(self, url: str, position: int, record: Dict[str, Any]) -> None:
+        """Add a single record to the scan id and port indexes."""
+        if record.get("scan_id"):
+            self._scan_ids[record["scan_id"]] = (url, position)
+        first_seen = self._port_first_seen.setdefault(url, {})
+        for port in record["findings"]["open_ports"]:
+            first_seen.setdefault(port, record["timestamp"])
+    
+    def record_scan(self, url: str, scan_data: Dict[str, Any]) -> str:
+        """
+        Record a security scan result.
+        
+        Raw findings and the derived scores are stored in separate sections so
+        scores can be recomputed later (see rescore_history): score holds the
+        canonical basic score that drift compares, context_score a context-aware
+        score under a versioned weight table, for scan_data's site_context
+        (default marketing) and advanced mode. When the findings fingerprint
+        and score match the latest record, the scan extends that record
+        ("unchanged since" run) instead of appending a new one, and the run's
+        stored scan id is returned.
+        
+        Returns:
+            Id of the recorded scan (of its run, for a repeated scan)
+        """
+        with self._lock:
+            if url not in self.history:
+                self.history[url] = []
+                self._timestamps[url] = []
+                self._scan_counts[url] = 0
+            
+            recorded_at = datetime.utcnow()
+            fingerprint = compute_fingerprint(scan_data)
+            score = _score_section(scan_data.get("risk_score", {}))
+            self._scan_counts[url] += 1
+            
+            records = self.history[url]
+            if records and records[-1].get("fingerprint") == fingerprint and records[-1]["score"] == score:
+                latest = records[-1]
+                latest["last_seen"] = recorded_at.isoformat()
+                latest["repeat_count"] = latest.get("repeat_count", 1) + 1
+                # Repeats share the run's persisted id, so it resolves after a restart
+                # and the stored record stays constant-size
+                if not latest.get("scan_id"):
+                    latest["scan_id"] = uuid.uuid4().hex
+                    self._scan_ids[latest["scan_id"]] = (url, len(records) - 1)
+                self._update_latest_state(url)
+                self._pending_extensions[url] = {
+                    "op": "extend",
+                    "url": url,
+                    "scan_id": latest["scan_id"],
+                    "last_seen": latest["last_seen"],
+                    "repeat_count": latest["repeat_count"]
+                }
+                if time.monotonic() - self._last_flush >= HISTORY_FLUSH_SECONDS:
+                    self.flush()
+                return latest["scan_id"]
+            
+            scan_id = uuid.uuid4().hex
+            advanced = bool(scan_data.get("advanced", False))
+            context_risk = risk_for_findings(
+                findings_from_scan(scan_data), scan_data.get("site_context") or "marketing", advanced
+            )
+            record = {
+                "scan_id": scan_id,
+                "timestamp": recorded_at.isoformat(),
+                "fingerprint": fingerprint,
+                "findings": {
+                    "ssl_valid": scan_data.get("ssl", {}).get("is_valid", False),
+                    "expires_in_days": scan_data.get("ssl", {}).get("expires_in_days"),
+                    "issued_to": scan_data.get("ssl", {}).get("issued_to"),
+                    "issued_by": scan_data.get("ssl", {}).get("issued_by"),
+                    "missing_headers_count": scan_data.get("headers", {}).get("missing_count", 0),
+                    "open_ports_count": scan_data.get("ports", {}).get("ports_open_count", 0),
+                    "missing_headers": [h.get('name') for h in scan_data.get("headers", {}).get("missing_headers", [])],
+                    "open_ports": [p.get('port') for p in scan_data.get("ports", {}).get("open_ports", [])],
+                    "services": [
+                        [s.get('port'), s.get('service')]
+                        for s in scan_data.get("ports", {}).get("identified_services", []) if s.get('service')
+                    ]
+                },
+                "score": score,
+                "context_score": _context_score_section(context_risk, advanced)
+            }
+            
+            self.history[url].append(record)
+            self._record_total += 1
+            self._timestamps[url].append(recorded_at)
+            self._index_record(url, len(self.history[url]) - 1, record)
+            self._update_latest_state(url)
+            # A pending extension belongs to the run before this record
+            extension = self._pending_extensions.pop(url, None)
+            self._journal(*([extension] if extension else []), {"op": "add", "url": url, "record": record})
+            
+            state = self._latest_state[url]
+            if self.alert_dispatcher and state["drift"] and state["drift"]["new_risks"]:
+                self.alert_dispatcher.enqueue(url, state["drift"], severity=state["severity"])
+            return scan_id
+    
+    def _update_latest_state(self, url: str) -> None:
+        """
+        Refresh the materialized latest/previous state for a URL.
+        
+        Only the last two records are read, and the URL moves between fleet
+        buckets in O(1), so this stays cheap however long the history is.
+        """
+        records = self.history.get(url, [])
+        if not records:
+            return
+        
+        # A repeated run still compares with the run before it, so an unchanged
+        # rescan doesn't clear a regression from the fleet view
+        latest = records[-1]
+        previous = records[-2] if len(records) > 1 else None
+        drift = _compare_records(previous, latest, self._scan_counts[url]) if previous else None
+        
+        categories = []
+        severity = None
+        if drift:
+            new_ports = sorted(set(latest["findings"]["open_ports"]) - set(previous["findings"]["open_ports"]))
+            if drift["risk_score_change"]["delta"] < 0 or drift["new_risks"]:
+                categories.append("regressions")
+            if drift["component_changes"]["ssl"] == "broken":
+                categories.append("ssl_broken")
+            if new_ports:
+                categories.append("new_ports")
+            if categories:
+                categories.append("any")
+                severity = _fleet_severity(drift)
+        
+        old_state = self._latest_state.get(url)
+        if old_state:
+            for category in old_state["categories"]:
+                self._bucket_remove((category, old_state["severity"]), url)
+        
+        self._latest_state[url] = {
+            "url": url,
+            "latest": latest,
+            "previous": previous,
+            "drift": drift,
+            "new_open_ports": new_ports if drift else [],
+            "categories": categories,
+            "severity": severity
+        }
+        for category in categories:
+            self._bucket_add((category, severity), url)
+    
+    def _bucket_add(self, key: Tuple[str, str], url: str) -> None:
+        """Append a URL to a fleet bucket."""
+        positions = self._fleet_positions[key]
+        if url in positions:
+            return
+        positions[url] = len(self._fleet_buckets[key])
+        self._fleet_buckets[key].append(url)
+    
+    def _bucket_remove(self, key: Tuple[str, str], url: str) -> None:
+        """Remove a URL from a fleet bucket by swapping in the last entry."""
+        positions = self._fleet_positions[key]
+        position = positions.pop(url, None)
+        if position is None:
+            return
+        bucket = self._fleet_buckets[key]
+        last = bucket.pop()
+        if last != url:
+            bucket[position] = last
+            positions[last] = position
+    
+    def get_latest_state(self, url: str) -> Optional[Dict[str, Any]]:
+        """Materialized latest/previous state for a URL."""
+        return self._latest_state.get(url)
+    
+    def get_fleet_drift(
+        self,
+        category: str = "any",
+        order: str = "desc",
+        offset: int = 0,
+        limit: int = 50
+    ) -> Dict[str, Any]:
+        """
+        Page through hosts whose latest scan regressed, sorted by severity.
+        
+        Reads straight from the severity buckets, so a page costs O(limit)
+        regardless of fleet size.
+        
+        Args:
+            category: any, regressions, ssl_broken or new_ports
+            order: desc (most severe first) or asc
+            offset: Number of hosts to skip
+            limit: Maximum number of hosts to return
+        
+        Returns:
+            Page of fleet drift entries with the total count
+        
+        Raises:
+            ValueError: If category or order is unknown
+        """
+        if category not in FLEET_CATEGORIES:
+            raise ValueError(f"Unknown category: {category}")
+        if order not in ("desc", "asc"):
+            raise ValueError(f"Unknown order: {order}")
+        
+        severities = SEVERITY_ORDER if order == "desc" else list(reversed(SEVERITY_ORDER))
+        buckets = [(severity, self._fleet_buckets[(category, severity)]) for severity in severities]
+        total = sum(len(bucket) for _, bucket in buckets)
+        
+        items = []
+        skip = offset
+        for severity, bucket in buckets:
+            if len(items) >= limit:
+                break
+            if skip >= len(bucket):
+                skip -= len(bucket)
+                continue
+            for url in bucket[skip:skip + limit - len(items)]:
+                items.append(_fleet_entry(self._latest_state[url]))
+            skip = 0
+        
+        return {
+            "category": category,
+            "order": order,
+            "total": total,
+            "offset": offset,
+            "limit": limit,
+            "items": items
         }
+    
+    def rescore_history(self, weights_version: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Recompute every stored score from raw findings under a weight table.
+        
+        No scanning happens: stored findings are scored in vectorized batches.
+        Each record's context_score is recomputed with its own site context
+        and advanced mode under weights_version, so a weight-table change
+        reaches the whole history. The canonical basic scores that drift
+        compares have no weight table and are recomputed as they are.
         
-        self.history[url].append(record)
-        self._save_history()
+        Args:
+            weights_version: Weight table version (defaults to WEIGHTS_VERSION)
+        
+        Returns:
+            Summary of the rescoring run
+        
+        Raises:
+            KeyError: If the weight table version is not registered
+        """
+        with self._lock:
+            weights_version = weights_version or WEIGHTS_VERSION
+            records = [record for url_records in self.history.values() for record in url_records]
+            if not records:
+                return {"weights_version": weights_version, "records_rescored": 0, "context_scores_changed": 0, "hosts": 0}
+            scans = [_findings_as_scan(record["findings"]) for record in records]
+            
+            results = batch_risk_score(build_feature_matrix(scans))
+            for record, score, level in zip(records, results["score"].tolist(), results["risk_level"].tolist()):
+                record["score"] = _score_section({"score": score, "risk_level": level})
+            
+            changed = 0
+            for advanced in (False, True):
+                group = [
+                    position for position, record in enumerate(records)
+                    if bool((record.get("context_score") or {}).get("advanced")) == advanced
+                ]
+                if not group:
+                    continue
+                results = batch_context_aware_risk(
+                    build_feature_matrix([scans[position] for position in group]),
+                    [(records[position].get("context_score") or {}).get("site_context") or "marketing" for position in group],
+                    advanced=advanced,
+                    weights_version=weights_version
+                )
+                for position, score, level, context in zip(
+                    group,
+                    results["score"].tolist(),
+                    results["risk_level"].tolist(),
+                    results["site_context"].tolist()
+                ):
+                    record = records[position]
+                    section = _context_score_section({
+                        "score": score,
+                        "risk_level": level,
+                        "site_context": context,
+                        "weights_version": weights_version
+                    }, advanced)
+                    if section["risk_score"] != (record.get("context_score") or {}).get("risk_score"):
+                        changed += 1
+                    record["context_score"] = section
+            
+            for url in self.history:
+                self._update_latest_state(url)
+            self._save_history()
+            
+            return {
+                "weights_version": weights_version,
+                "records_rescored": len(records),
+                "context_scores_changed": changed,
+                "hosts": len(self.history)
+            }
     
-    def get_scan_history(self, url: str, limit: int = 10) -> List[Dict[str, Any]]:
-        """Get scan history for a URL."""
+    def get_scan_history(self, url: str, limit: Optional[int] = 10) -> List[Dict[str, Any]]:
+        """Get scan history for a URL (limit=None returns every scan)."""
         if url in self.history:
+            if limit is None:
+                return list(self.history[url])
             return self.history[url][-limit:]
         return []
     
+    def get_scans_in_range(
+        self,
+        url: str,
+        start: Optional[str] = None,
+        end: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get scans recorded between start and end (inclusive) via binary search.
+        
+        Args:
+            url: Website URL
+            start: Optional ISO timestamp lower bound
+            end: Optional ISO timestamp upper bound
+        
+        Returns:
+            Chronologically ordered scan records in the range
+        """
+        records = self.history.get(url, [])
+        timestamps = self._timestamps.get(url, [])
+        lo = 0
+        if start is not None:
+            start_dt = _parse_timestamp(start)
+            lo = bisect_left(timestamps, start_dt)
+            # A run that started earlier but was still being seen counts too
+            if lo > 0 and "last_seen" in records[lo - 1] and _parse_timestamp(records[lo - 1]["last_seen"]) >= start_dt:
+                lo -= 1
+        hi = bisect_right(timestamps, _parse_timestamp(end)) if end is not None else len(records)
+        return records[lo:hi]
+    
+    def get_scan(self, scan_id: str) -> Optional[Dict[str, Any]]:
+        """Look up a recorded scan by id."""
+        location = self._scan_ids.get(scan_id)
+        if location is None:
+            return None
+        url, position = location
+        return self.history[url][position]
+    
+    def _position_at(self, url: str, timestamp: str) -> Optional[int]:
+        """
+        Position of the scan describing the state at a point in time.
+        
+        This is the latest scan at or before the timestamp, or the first scan
+        after it when the timestamp predates all history.
+        """
+        timestamps = self._timestamps.get(url, [])
+        if not timestamps:
+            return None
+        position = bisect_right(timestamps, _parse_timestamp(timestamp)) - 1
+        return max(position, 0)
+    
+    def first_seen_open(self, url: str, port: int) -> Optional[str]:
+        """Timestamp of the first scan that found the port open, if any."""
+        return self._port_first_seen.get(url, {}).get(port)
+    
     def calculate_drift(self, url: str) -> Dict[str, Any]:
         """Calculate security drift for a URL."""
-        history = self.get_scan_history(url, limit=None)
+        history = self.history.get(url, [])
+        scans_recorded = self._scan_counts.get(url, 0)
         
-        if len(history) < 2:
+        if scans_recorded < 2:
             return {
-                "has_history": len(history) > 0,
-                "scans_recorded": len(history),
+                "has_history": scans_recorded > 0,
+                "scans_recorded": scans_recorded,
                 "drift_detected": False,
                 "summary": "Need at least 2 scans to detect drift"
             }
         
-        # Compare latest vs previous scan
+        # Compare latest vs previous scan (a repeated run is compared with itself)
         latest = history[-1]
-        previous = history[-2]
-        
-        # Calculate changes
-        score_change = latest["risk_score"] - previous["risk_score"]
-        score_direction = "improved" if score_change > 0 else "regressed" if score_change < 0 else "unchanged"
-        
-        headers_change = previous["missing_headers_count"] - latest["missing_headers_count"]
-        ports_change = previous["open_ports_count"] - latest["open_ports_count"]
-        ssl_change = "fixed" if not previous["ssl_valid"] and latest["ssl_valid"] else "broken" if previous["ssl_valid"] and not latest["ssl_valid"] else "no change"
-        
-        # Detect drift
-        drift_detected = (
-            abs(score_change) > 5 or
-            headers_change != 0 or
-            ports_change != 0 or
-            ssl_change != "no change"
-        )
-        
-        # Newly introduced risks
-        new_risks = []
-        if ssl_change == "broken":
-            new_risks.append("SSL certificate became invalid")
-        
-        if headers_change < 0:  # More headers missing now
-            new_headers_missing = set(latest["missing_headers"]) - set(previous["missing_headers"])
-            if new_headers_missing:
-                new_risks.append(f"New missing headers: {', '.join(new_headers_missing)}")
-        
-        if ports_change < 0:  # More ports open now
-            new_ports = set(latest["open_ports"]) - set(previous["open_ports"])
-            if new_ports:
-                new_risks.append(f"New open ports: {', '.join(map(str, new_ports))}")
+        previous = latest if latest.get("repeat_count", 1) > 1 else history[-2]
+        return _compare_records(previous, latest, scans_recorded)
+    
+    def calculate_drift_between(
+        self,
+        url: str,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        from_scan_id: Optional[str] = None,
+        to_scan_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Calculate drift between two points in time or two recorded scans.
         
-        # Improvements
-        improvements = []
-        if ssl_change == "fixed":
-            improvements.append("SSL certificate issue resolved")
+        Each side is resolved by scan id when given, otherwise by timestamp
+        (binary search). A missing start means the first scan, a missing end
+        the latest scan.
         
-        if headers_change > 0:  # Fewer headers missing
-            fixed_headers = set(previous["missing_headers"]) - set(latest["missing_headers"])
-            if fixed_headers:
-                improvements.append(f"Added security headers: {', '.join(fixed_headers)}")
+        Args:
+            url: Website URL
+            start: ISO timestamp for the baseline state
+            end: ISO timestamp for the compared state
+            from_scan_id: Scan id for the baseline state
+            to_scan_id: Scan id for the compared state
         
-        if ports_change > 0:  # Fewer ports open
-            closed_ports = set(previous["open_ports"]) - set(latest["open_ports"])
-            if closed_ports:
-                improvements.append(f"Closed ports: {', '.join(map(str, closed_ports))}")
+        Returns:
+            Drift report in the same shape as calculate_drift
         
-        return {
-            "has_history": True,
-            "scans_recorded": len(history),
-            "drift_detected": drift_detected,
-            "latest_timestamp": latest["timestamp"],
-            "previous_timestamp": previous["timestamp"],
-            "risk_score_change": {
-                "previous": previous["risk_score"],
-                "latest": latest["risk_score"],
-                "delta": score_change,
-                "direction": score_direction
+        Raises:
+            KeyError: If a scan id is unknown or belongs to another URL
+        """
+        history = self.history.get(url, [])
+        if not history:
+            return {
+                "has_history": False,
+                "scans_recorded": 0,
+                "drift_detected": False,
+                "summary": "No scans recorded for this URL"
+            }
+        
+        from_position = self._resolve_position(url, from_scan_id, start, default=0)
+        to_position = self._resolve_position(url, to_scan_id, end, default=len(history) - 1)
+        if from_position > to_position:
+            from_position, to_position = to_position, from_position
+        
+        scans_recorded = sum(r.get("repeat_count", 1) for r in history[from_position:to_position + 1])
+        return _compare_records(history[from_position], history[to_position], scans_recorded)
+    
+    def _resolve_position(
+        self,
+        url: str,
+        scan_id: Optional[str],
+        timestamp: Optional[str],
+        default: int
+    ) -> int:
+        """Resolve a scan id or timestamp to a position in the URL's history."""
+        if scan_id is not None:
+            location = self._scan_ids.get(scan_id)
+            if location is None or location[0] != url:
+                raise KeyError(f"Unknown scan id for {url}: {scan_id}")
+            return location[1]
+        if timestamp is not None:
+            return self._position_at(url, timestamp)
+        return default
+
+
+def _replay(history: Dict[str, List[Dict[str, Any]]], entry: Dict[str, Any]) -> None:
+    """Apply one journal entry (see ScanHistoryTracker._journal) to a loaded history."""
+    records = history.setdefault(entry["url"], [])
+    if entry["op"] == "add":
+        records.append(entry["record"])
+    elif entry["op"] == "extend" and records:
+        latest = records[-1]
+        latest["scan_id"] = entry["scan_id"]
+        latest["last_seen"] = entry["last_seen"]
+        latest["repeat_count"] = entry["repeat_count"]
+
+
+def _score_section(risk_score: Dict[str, Any]) -> Dict[str, Any]:
+    """Canonical score section of a record, built from calculate_risk_score output."""
+    return {
+        "risk_score": risk_score.get("score", 0),
+        "risk_level": risk_score.get("risk_level", "UNKNOWN")
+    }
+
+
+def _context_score_section(risk: Dict[str, Any], advanced: bool) -> Dict[str, Any]:
+    """
+    Context-aware score section of a record.
+    
+    Records the site context, advanced mode and weight table version so
+    rescore_history can rerun the same scoring under another version.
+    """
+    return {
+        "risk_score": risk.get("score", 0),
+        "risk_level": risk.get("risk_level", "UNKNOWN"),
+        "site_context": risk.get("site_context"),
+        "advanced": bool(advanced),
+        "weights_version": risk.get("weights_version")
+    }
+
+
+def _migrate_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a legacy flat record into separate findings and score sections."""
+    if "findings" in record:
+        return record
+    migrated = {
+        key: record[key]
+        for key in ("scan_id", "timestamp", "fingerprint", "last_seen", "repeat_count")
+        if key in record
+    }
+    migrated["findings"] = {
+        "ssl_valid": record.get("ssl_valid", False),
+        "expires_in_days": None,
+        "issued_to": None,
+        "issued_by": None,
+        "missing_headers_count": record.get("missing_headers_count", 0),
+        "open_ports_count": record.get("open_ports_count", 0),
+        "missing_headers": record.get("missing_headers", []),
+        "open_ports": record.get("open_ports", [])
+    }
+    migrated["score"] = {
+        "risk_score": record.get("risk_score", 0),
+        "risk_level": record.get("risk_level", "UNKNOWN")
+    }
+    # Filled in by the next rescore_history
+    migrated["context_score"] = None
+    return migrated
+
+
+def _findings_as_scan(findings: Dict[str, Any]) -> Dict[str, Any]:
+    """Rebuild the scanner-shaped sections the scorers expect from stored findings."""
+    ssl = {"is_valid": findings["ssl_valid"]}
+    if findings.get("expires_in_days") is not None:
+        ssl["expires_in_days"] = findings["expires_in_days"]
+    return {
+        "ssl": ssl,
+        "headers": {
+            "missing_headers": [{"name": name} for name in findings["missing_headers"]],
+            "missing_count": findings["missing_headers_count"]
+        },
+        "ports": {
+            "open_ports": [{"port": port} for port in findings["open_ports"]],
+            "ports_open_count": findings["open_ports_count"],
+            "identified_services": [
+                {"port": port, "service": service} for port, service in findings.get("services", [])
+            ]
+        }
+    }
+
+
+def compute_fingerprint(scan_data: Dict[str, Any]) -> str:
+    """
+    Fingerprint of a scan's normalized findings.
+    
+    Covers certificate identity and validity, an expiry bucket (not the
+    day count, which changes daily), missing headers and open ports, so
+    consecutive scans of a stable host hash identically.
+    
+    Args:
+        scan_data: Scan result with ssl, headers and ports sections
+    
+    Returns:
+        Hex digest identifying the findings
+    """
+    ssl_data = scan_data.get("ssl", {}) or {}
+    try:
+        expires_in_days = int(ssl_data.get("expires_in_days", 365))
+    except (TypeError, ValueError):
+        expires_in_days = 365
+    expiry_bucket = "expired" if expires_in_days <= 0 else "expiring" if expires_in_days < 30 else "valid"
+    
+    normalized = {
+        "ssl_valid": bool(ssl_data.get("is_valid", False)),
+        "issued_to": ssl_data.get("issued_to"),
+        "issued_by": ssl_data.get("issued_by"),
+        "expiry": expiry_bucket,
+        "missing_headers": sorted(h.get('name') or '' for h in scan_data.get("headers", {}).get("missing_headers", [])),
+        "open_ports": sorted(p.get('port') for p in scan_data.get("ports", {}).get("open_ports", []))
+    }
+    encoded = json.dumps(normalized, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(encoded.encode("utf-8")).hexdigest()
+
+
+def _drift_severity(drift: Dict[str, Any]) -> str:
+    """Severity of a drift report based on the size of the score change."""
+    delta = abs(drift["risk_score_change"]["delta"])
+    return "critical" if delta > 20 else "significant" if delta > 10 else "minor"
+
+
+def _fleet_severity(drift: Dict[str, Any]) -> str:
+    """Severity used by the fleet dashboard; SSL breakage is always critical."""
+    if drift["component_changes"]["ssl"] == "broken":
+        return "critical"
+    return _drift_severity(drift)
+
+
+def _fleet_entry(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Compact fleet dashboard row for a host."""
+    drift = state["drift"]
+    return {
+        "url": state["url"],
+        "severity": state["severity"],
+        "categories": [c for c in state["categories"] if c != "any"],
+        "latest_timestamp": drift["latest_timestamp"],
+        "previous_timestamp": drift["previous_timestamp"],
+        "risk_score_change": drift["risk_score_change"],
+        "ssl": drift["component_changes"]["ssl"],
+        "new_open_ports": state["new_open_ports"],
+        "new_risks": drift["new_risks"]
+    }
+
+
+def _unchanged_report(previous: Dict[str, Any], latest: Dict[str, Any], scans_recorded: int) -> Dict[str, Any]:
+    """Drift report for two scans with identical findings."""
+    return {
+        "has_history": True,
+        "scans_recorded": scans_recorded,
+        "drift_detected": False,
+        "latest_timestamp": latest.get("last_seen", latest["timestamp"]),
+        "previous_timestamp": previous["timestamp"],
+        "unchanged_since": previous["timestamp"],
+        "risk_score_change": {
+            "previous": previous["score"]["risk_score"],
+            "latest": latest["score"]["risk_score"],
+            "delta": 0,
+            "direction": "unchanged"
+        },
+        "component_changes": {
+            "ssl": "no change",
+            "missing_headers": {
+                "previous": previous["findings"]["missing_headers_count"],
+                "latest": latest["findings"]["missing_headers_count"],
+                "delta": 0
             },
-            "component_changes": {
-                "ssl": ssl_change,
-                "missing_headers": {
-                    "previous": previous["missing_headers_count"],
-                    "latest": latest["missing_headers_count"],
-                    "delta": headers_change
-                },
-                "open_ports": {
-                    "previous": previous["open_ports_count"],
-                    "latest": latest["open_ports_count"],
-                    "delta": ports_change
-                }
+            "open_ports": {
+                "previous": previous["findings"]["open_ports_count"],
+                "latest": latest["findings"]["open_ports_count"],
+                "delta": 0
+            }
+        },
+        "new_risks": [],
+        "improvements": [],
+        "summary": "Risk unchanged by 0.0 points. 0 improvements, 0 new issues."
+    }
+
+
+def _compare_records(previous: Dict[str, Any], latest: Dict[str, Any], scans_recorded: int) -> Dict[str, Any]:
+    """Build a drift report comparing two scan records."""
+    if (
+        previous.get("fingerprint")
+        and previous.get("fingerprint") == latest.get("fingerprint")
+        and previous["score"]["risk_score"] == latest["score"]["risk_score"]
+    ):
+        return _unchanged_report(previous, latest, scans_recorded)
+    
+    previous_findings, latest_findings = previous["findings"], latest["findings"]
+    
+    # Calculate changes
+    score_change = latest["score"]["risk_score"] - previous["score"]["risk_score"]
+    score_direction = "improved" if score_change > 0 else "regressed" if score_change < 0 else "unchanged"
+    
+    headers_change = previous_findings["missing_headers_count"] - latest_findings["missing_headers_count"]
+    ports_change = previous_findings["open_ports_count"] - latest_findings["open_ports_count"]
+    ssl_change = "fixed" if not previous_findings["ssl_valid"] and latest_findings["ssl_valid"] else "broken" if previous_findings["ssl_valid"] and not latest_findings["ssl_valid"] else "no change"
+    
+    # Detect drift
+    drift_detected = (
+        abs(score_change) > 5 or
+        headers_change != 0 or
+        ports_change != 0 or
+        ssl_change != "no change"
+    )
+    
+    # Newly introduced risks
+    new_risks = []
+    if ssl_change == "broken":
+        new_risks.append("SSL certificate became invalid")
+    
+    if headers_change < 0:  # More headers missing now
+        new_headers_missing = set(latest_findings["missing_headers"]) - set(previous_findings["missing_headers"])
+        if new_headers_missing:
+            new_risks.append(f"New missing headers: {', '.join(new_headers_missing)}")
+    
+    if ports_change < 0:  # More ports open now
+        new_ports = set(latest_findings["open_ports"]) - set(previous_findings["open_ports"])
+        if new_ports:
+            new_risks.append(f"New open ports: {', '.join(map(str, new_ports))}")
+    
+    # Improvements
+    improvements = []
+    if ssl_change == "fixed":
+        improvements.append("SSL certificate issue resolved")
+    
+    if headers_change > 0:  # Fewer headers missing
+        fixed_headers = set(previous_findings["missing_headers"]) - set(latest_findings["missing_headers"])
+        if fixed_headers:
+            improvements.append(f"Added security headers: {', '.join(fixed_headers)}")
+    
+    if ports_change > 0:  # Fewer ports open
+        closed_ports = set(previous_findings["open_ports"]) - set(latest_findings["open_ports"])
+        if closed_ports:
+            improvements.append(f"Closed ports: {', '.join(map(str, closed_ports))}")
+    
+    return {
+        "has_history": True,
+        "scans_recorded": scans_recorded,
+        "drift_detected": drift_detected,
+        "latest_timestamp": latest["timestamp"],
+        "previous_timestamp": previous["timestamp"],
+        "risk_score_change": {
+            "previous": previous["score"]["risk_score"],
+            "latest": latest["score"]["risk_score"],
+            "delta": score_change,
+            "direction": score_direction
+        },
+        "component_changes": {
+            "ssl": ssl_change,
+            "missing_headers": {
+                "previous": previous_findings["missing_headers_count"],
+                "latest": latest_findings["missing_headers_count"],
+                "delta": headers_change
             },
-            "new_risks": new_risks,
-            "improvements": improvements,
-            "summary": f"Risk {score_direction} by {abs(score_change):.1f} points. {len(improvements)} improvements, {len(new_risks)} new issues."
-        }
+            "open_ports": {
+                "previous": previous_findings["open_ports_count"],
+                "latest": latest_findings["open_ports_count"],
+                "delta": ports_change
+            }
+        },
+        "new_risks": new_risks,
+        "improvements": improvements,
+        "summary": f"Risk {score_direction} by {abs(score_change):.1f} points. {len(improvements)} improvements, {len(new_risks)} new issues."
+    }
 
 
 def generate_delta_summary(url: str, latest_scan: Dict[str, Any], tracker: Optional[ScanHistoryTracker] = None) -> Dict[str, Any]:
@@ -178,7 +888,7 @@ def generate_delta_summary(url: str, latest_scan: Dict[str, Any], tracker: Optio
     # Calculate drift
     drift = tracker.calculate_drift(url)
     
-    if not drift.get("has_history"):
+    if "risk_score_change" not in drift:
         return {
             "status": "baseline",
             "message": "First scan recorded. Future scans will show changes.",
@@ -190,7 +900,7 @@ def generate_delta_summary(url: str, latest_scan: Dict[str, Any], tracker: Optio
         "drift": drift,
         "trend": {
             "direction": drift["risk_score_change"]["direction"],
-            "severity": "critical" if abs(drift["risk_score_change"]["delta"]) > 20 else "significant" if abs(drift["risk_score_change"]["delta"]) > 10 else "minor",
+            "severity": _drift_severity(drift),
             "alerts": drift["new_risks"],
             "celebrations": drift["improvements"]
         },
@@ -225,13 +935,22 @@ def _generate_delta_recommendations(drift: Dict[str, Any]) -> List[str]:
     return recommendations
 
 
-def get_security_timeline(url: str, tracker: Optional[ScanHistoryTracker] = None) -> List[Dict[str, Any]]:
+def get_security_timeline(
+    url: str,
+    tracker: Optional[ScanHistoryTracker] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    max_points: Optional[int] = None
+) -> List[Dict[str, Any]]:
     """
     Get security timeline for visualization.
     
     Args:
         url: Website URL
         tracker: ScanHistoryTracker instance
+        start: Optional ISO timestamp; scans before it are excluded
+        end: Optional ISO timestamp; scans after it are excluded
+        max_points: Optional point budget; longer timelines are downsampled
     
     Returns:
         Timeline data suitable for charting
@@ -240,17 +959,127 @@ def get_security_timeline(url: str, tracker: Optional[ScanHistoryTracker] = None
     if tracker is None:
         tracker = ScanHistoryTracker()
     
-    history = tracker.get_scan_history(url, limit=None)
+    history = tracker.get_scans_in_range(url, start=start, end=end)
+    
+    if max_points is not None and len(history) > max_points:
+        history = [history[i] for i in _downsample_indices(history, max_points)]
     
     timeline = []
     for scan in history:
         timeline.append({
             "timestamp": scan["timestamp"],
-            "risk_score": scan["risk_score"],
-            "risk_level": scan["risk_level"],
-            "ssl_status": "🔐" if scan["ssl_valid"] else "🔓",
-            "headers_missing": scan["missing_headers_count"],
-            "ports_open": scan["open_ports_count"]
+            "risk_score": scan["score"]["risk_score"],
+            "risk_level": scan["score"]["risk_level"],
+            "ssl_status": "🔐" if scan["findings"]["ssl_valid"] else "🔓",
+            "headers_missing": scan["findings"]["missing_headers_count"],
+            "ports_open": scan["findings"]["open_ports_count"],
+            "unchanged_until": scan.get("last_seen")
         })
     
     return timeline
+
+
+def _parse_timestamp(value: str) -> datetime:
+    """Parse an ISO timestamp into a naive UTC datetime."""
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _downsample_indices(history: List[Dict[str, Any]], max_points: int) -> List[int]:
+    """
+    Pick at most max_points scans that preserve the shape of the timeline.
+    
+    Scans where SSL validity, missing headers or open ports change are always
+    kept (they are the events the chart exists to show). The remaining budget
+    goes to a Largest-Triangle-Three-Buckets pass over the risk score.
+    
+    Args:
+        history: Chronologically ordered scan records
+        max_points: Maximum number of points to return
+    
+    Returns:
+        Sorted indices into history
+    """
+    if max_points <= 0:
+        return []
+    if len(history) <= max_points:
+        return list(range(len(history)))
+    
+    change_points = [0]
+    for i in range(1, len(history)):
+        previous, current = history[i - 1]["findings"], history[i]["findings"]
+        if (
+            previous["ssl_valid"] != current["ssl_valid"]
+            or set(previous["missing_headers"]) != set(current["missing_headers"])
+            or set(previous["open_ports"]) != set(current["open_ports"])
+        ):
+            change_points.append(i)
+    if change_points[-1] != len(history) - 1:
+        change_points.append(len(history) - 1)
+    
+    xs = [_parse_timestamp(scan["timestamp"]).timestamp() for scan in history]
+    ys = [float(scan["score"]["risk_score"]) for scan in history]
+    
+    # Too many state changes for the budget: thin the change points themselves
+    if len(change_points) >= max_points:
+        subset = _lttb([xs[i] for i in change_points], [ys[i] for i in change_points], max_points)
+        return [change_points[i] for i in subset]
+    
+    selected = set(change_points)
+    selected.update(_lttb(xs, ys, max_points - len(change_points)))
+    return sorted(selected)
+
+
+def _lttb(xs: List[float], ys: List[float], threshold: int) -> List[int]:
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+    
+    Args:
+        xs: X coordinates (ascending)
+        ys: Y coordinates
+        threshold: Number of points to keep
+    
+    Returns:
+        Sorted indices of the kept points (always includes first and last)
+    """
+    n = len(xs)
+    if threshold >= n or n <= 2:
+        return list(range(n))
+    if threshold <= 2:
+        return [0, n - 1][:max(threshold, 0)]
+    
+    indices = [0]
+    bucket_size = (n - 2) / (threshold - 2)
+    a = 0
+    
+    for bucket in range(threshold - 2):
+        # Average of the next bucket is the third triangle vertex
+        next_start = int((bucket + 1) * bucket_size) + 1
+        next_end = min(int((bucket + 2) * bucket_size) + 1, n)
+        if next_start >= next_end:
+            next_start, next_end = n - 1, n
+        next_count = next_end - next_start
+        avg_x = sum(xs[next_start:next_end]) / next_count
+        avg_y = sum(ys[next_start:next_end]) / next_count
+        
+        range_start = int(bucket * bucket_size) + 1
+        range_end = int((bucket + 1) * bucket_size) + 1
+        
+        max_area = -1.0
+        chosen = range_start
+        for i in range(range_start, range_end):
+            area = abs(
+                (xs[a] - avg_x) * (ys[i] - ys[a])
+                - (xs[a] - xs[i]) * (avg_y - ys[a])
+            )
+            if area > max_area:
+                max_area = area
+                chosen = i
+        
+        indices.append(chosen)
+        a = chosen
+    
+    indices.append(n - 1)
+    return indices
@@ -0,0 +1,178 @@
+"""
+Service Fingerprint Module
+Identifies what actually listens on an open port from its banner, so SSH on
+2222 or Redis on 8080 is scored as SSH or Redis instead of by port number.
+
+Banners are grabbed concurrently under a strict byte and time budget and
+matched against one precompiled signature table. Results are cached per
+(ip, port) for FINGERPRINT_TTL seconds, so a rescan within that window
+doesn't reconnect to the port at all.
+"""
+
+import re
+import socket
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+
+
+BANNER_MAX_BYTES = 256
+BANNER_TIMEOUT = 0.8           # seconds per port, connect included
+BANNER_GREETING_WAIT = 0.3     # wait this long for a server-first greeting
+BANNER_WORKERS = 32
+FINGERPRINT_CACHE_SIZE = 8192
+FINGERPRINT_TTL = 900          # seconds an (ip, port) identification is reused
+
+# Sent to services that wait for the client to speak first; most text
+# protocols answer it with an error that identifies them
+BANNER_PROBE = b"HEAD / HTTP/1.0\r\n\r\n"
+
+# (service, pattern) in priority order, matched at the start of the banner.
+# Service names match DANGEROUS_PORTS names so identified services are scored.
+SERVICE_SIGNATURES = (
+    ("SSH", rb"SSH-\d+\.\d+-"),
+    ("VNC", rb"RFB \d{3}\.\d{3}\n"),
+    ("Telnet", rb"\xff[\xfb-\xfe]"),
+    ("FTP", rb"220[ -][^\r\n]*(?:FTP|FileZilla|Pure-FTPd)"),
+    ("SMTP", rb"220[ -][^\r\n]*(?:SMTP|Postfix|Exim|Sendmail)"),
+    ("POP3", rb"\+OK"),
+    ("IMAP", rb"\* (?:OK|PREAUTH)"),
+    ("MySQL", rb".{4}\x0a\d+\.\d+\.\d+[^\x00]*\x00"),
+    ("MySQL", rb".{4}\xff[^\x00]*?(?:MySQL|MariaDB)"),
+    ("PostgreSQL", rb"E.{4}S(?:FATAL|ERROR)"),
+    ("Redis", rb"(?:-ERR |-NOAUTH |-DENIED |\+PONG)"),
+    ("Memcached", rb"(?:CLIENT_)?ERROR\r\n"),
+    ("AMQP", rb"AMQP"),
+    ("HTTP", rb"HTTP/\d(?:\.\d)? \d{3}"),
+)
+
+# One alternation, one pass per banner; the matching group's index names the service
+_SIGNATURE_RE = re.compile(b"|".join(
+    b"(?P<s%d>%s)" % (index, pattern) for index, (_, pattern) in enumerate(SERVICE_SIGNATURES)
+), re.DOTALL)
+
+# (ip, port) -> (expires at, identification entry or None if the port sent nothing)
+_identifications: "OrderedDict[Tuple[str, int], Tuple[float, Optional[Dict[str, Any]]]]" = OrderedDict()
+_identifications_lock = threading.Lock()
+
+
+def match_signature(banner: bytes) -> Optional[str]:
+    """
+    Service named by a banner.
+
+    Args:
+        banner: Raw bytes read from the port
+
+    Returns:
+        Service name, or None if no signature matches
+    """
+    match = _SIGNATURE_RE.match(banner)
+    if match is None:
+        return None
+    return SERVICE_SIGNATURES[int(match.lastgroup[1:])][0]
+
+
+def _cached_identification(ip: str, port: int, now: float) -> Tuple[bool, Optional[Dict[str, Any]]]:
+    """(hit, entry) for a fresh cached identification of ip:port."""
+    key = (ip, port)
+    with _identifications_lock:
+        cached = _identifications.get(key)
+        if cached is None or cached[0] <= now:
+            return False, None
+        _identifications.move_to_end(key)
+        return True, cached[1]
+
+
+def _cache_identification(ip: str, port: int, entry: Optional[Dict[str, Any]], now: float) -> None:
+    with _identifications_lock:
+        _identifications[(ip, port)] = (now + FINGERPRINT_TTL, entry)
+        _identifications.move_to_end((ip, port))
+        while len(_identifications) > FINGERPRINT_CACHE_SIZE:
+            _identifications.popitem(last=False)
+
+
+def grab_banner(ip: str, port: int, timeout: float = BANNER_TIMEOUT) -> bytes:
+    """
+    Read at most BANNER_MAX_BYTES from a port within timeout seconds.
+
+    Waits briefly for a greeting (SSH, FTP, SMTP, MySQL, ...), then sends
+    BANNER_PROBE to services that expect the client to speak first.
+
+    Args:
+        ip: Address
+        port: Open port
+        timeout: Total budget in seconds
+
+    Returns:
+        Banner bytes (empty if nothing was received)
+    """
+    deadline = time.monotonic() + timeout
+    try:
+        with socket.create_connection((ip, port), timeout=timeout) as sock:
+            sock.settimeout(max(0.01, min(BANNER_GREETING_WAIT, deadline - time.monotonic())))
+            try:
+                return sock.recv(BANNER_MAX_BYTES)
+            except socket.timeout:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return b""
+            sock.settimeout(remaining)
+            sock.sendall(BANNER_PROBE)
+            return sock.recv(BANNER_MAX_BYTES)
+    except OSError:
+        return b""
+
+
+def _banner_text(banner: bytes) -> str:
+    """First line of a banner as printable text, for display."""
+    line = banner.split(b"\n", 1)[0].rstrip(b"\r")[:80]
+    return "".join(chr(b) if 32 <= b < 127 else "." for b in line).strip()
+
+
+def identify_services(
+    ip: str,
+    ports: List[int],
+    timeout: float = BANNER_TIMEOUT,
+    workers: int = BANNER_WORKERS
+) -> List[Dict[str, Any]]:
+    """
+    Grab and identify banners of open ports concurrently.
+
+    The whole stage takes about one timeout regardless of the number of
+    ports (up to workers ports at a time). Ports identified within the last
+    FINGERPRINT_TTL seconds are answered from the cache without connecting.
+
+    Args:
+        ip: Address the ports were found open on
+        ports: Open port numbers
+        timeout: Per-port budget in seconds
+        workers: Concurrent banner grabs
+
+    Returns:
+        [{port, service, banner}] for ports that sent anything; service is
+        None when no signature matched
+    """
+    if not ports:
+        return []
+    now = time.monotonic()
+    entries: Dict[int, Optional[Dict[str, Any]]] = {}
+    misses = []
+    for port in ports:
+        hit, entry = _cached_identification(ip, port, now)
+        if hit:
+            entries[port] = entry
+        else:
+            misses.append(port)
+
+    if misses:
+        with ThreadPoolExecutor(max_workers=min(workers, len(misses))) as executor:
+            banners = list(executor.map(lambda port: grab_banner(ip, port, timeout), misses))
+        for port, banner in zip(misses, banners):
+            entry = {"port": port, "service": match_signature(banner), "banner": _banner_text(banner)} if banner else None
+            _cache_identification(ip, port, entry, now)
+            entries[port] = entry
+
+    return [dict(entries[port]) for port in ports if entries[port] is not None]
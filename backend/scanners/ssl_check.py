@@ -8,17 +8,29 @@ import socket
 from datetime import datetime
 from typing import Dict, Any
 
+from .tls_enum import enumerate_tls
 
-def check_ssl(url: str) -> Dict[str, Any]:
+
+def check_ssl(url: str, enumerate_protocols: bool = False) -> Dict[str, Any]:
     """
     Check SSL/TLS certificate status for a website.
     
     Args:
         url: Website URL (domain name without protocol)
+        enumerate_protocols: Also enumerate accepted TLS versions and cipher
+            groups (see tls_enum.enumerate_tls), returned as tls_profile
     
     Returns:
         Dictionary with SSL status information
     """
+    result = _check_certificate(url)
+    if enumerate_protocols:
+        result["tls_profile"] = enumerate_tls(url)
+    return result
+
+
+def _check_certificate(url: str) -> Dict[str, Any]:
+    """Certificate validity and the protocol/cipher of a default handshake."""
     try:
         # Extract hostname from URL if it includes protocol
         hostname = url.replace("http://", "").replace("https://", "").split('/')[0]
@@ -0,0 +1,196 @@
+"""
+TLS Enumeration Module
+Finds which protocol versions and cipher-suite groups a server accepts, so
+legacy TLS 1.0/1.1 and weak suites show up even when the default handshake
+negotiates something modern.
+
+Handshakes run in parallel on a small bounded pool against one resolved
+address, in two rounds: protocol versions first, then cipher groups only
+for the legacy versions the server actually accepted. Client contexts are
+built once and shared by all targets.
+"""
+
+import socket
+import ssl
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from typing import Dict, Any, Optional, Tuple
+
+
+# Concurrent handshakes per target
+TLS_ENUM_WORKERS = 6
+TLS_ENUM_TIMEOUT = 4
+
+ACCEPTED = "accepted"
+REJECTED = "rejected"
+UNTESTED = "untested"    # the local OpenSSL can't offer it
+ERROR = "error"          # handshake timed out, answer unknown
+UNREACHABLE = "unreachable"    # connection refused or host unreachable
+
+PROTOCOLS = {
+    "TLSv1": ssl.TLSVersion.TLSv1,
+    "TLSv1.1": ssl.TLSVersion.TLSv1_1,
+    "TLSv1.2": ssl.TLSVersion.TLSv1_2,
+    "TLSv1.3": ssl.TLSVersion.TLSv1_3,
+}
+LEGACY_PROTOCOLS = ("TLSv1", "TLSv1.1")
+
+# Cipher groups (OpenSSL cipher strings), probed over TLS 1.2 and below;
+# TLS 1.3 suites are all strong and not selectable through set_ciphers
+CIPHER_GROUPS = {
+    "null": "eNULL",
+    "anonymous": "aNULL:!eNULL",
+    "export": "EXPORT",
+    "rc4": "RC4",
+    "3des": "3DES",
+    "static_rsa": "kRSA:!eNULL:!aNULL:!EXPORT",
+    "cbc_sha1": "SHA1:!eNULL:!aNULL:!EXPORT:!RC4:!3DES",
+    "forward_secret_aead": "ECDHE+AESGCM:ECDHE+CHACHA20:DHE+AESGCM",
+}
+WEAK_CIPHER_GROUPS = ("null", "anonymous", "export", "rc4", "3des")
+LEGACY_CIPHER_GROUPS = ("static_rsa", "cbc_sha1")
+
+
+@lru_cache(maxsize=None)
+def _client_context(
+    min_version: ssl.TLSVersion,
+    max_version: ssl.TLSVersion,
+    ciphers: str
+) -> Optional[ssl.SSLContext]:
+    """
+    Shared probe context, or None if the local OpenSSL can't offer it.
+
+    Certificates are not verified here: enumeration only asks what the
+    server will negotiate (check_ssl validates the certificate).
+    """
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", DeprecationWarning)
+            context.minimum_version = min_version
+            context.maximum_version = max_version
+        context.set_ciphers(ciphers + ":@SECLEVEL=0")
+    except (ssl.SSLError, ValueError):
+        return None
+    return context
+
+
+def _handshake(
+    address: Tuple[Any, ...],
+    hostname: str,
+    context: Optional[ssl.SSLContext],
+    timeout: float
+) -> Dict[str, Any]:
+    """One handshake; reports what was negotiated or why it failed."""
+    if context is None:
+        return {"status": UNTESTED}
+    try:
+        with socket.create_connection(address[:2], timeout=timeout) as sock:
+            with context.wrap_socket(sock, server_hostname=hostname) as ssock:
+                return {"status": ACCEPTED, "protocol": ssock.version(), "cipher": ssock.cipher()[0]}
+    except ssl.SSLError as e:
+        if e.reason in ("NO_PROTOCOLS_AVAILABLE", "NO_CIPHERS_AVAILABLE"):
+            return {"status": UNTESTED}
+        return {"status": REJECTED}
+    except (ConnectionResetError, ConnectionAbortedError, EOFError):
+        # Many servers drop the connection instead of sending an alert
+        return {"status": REJECTED}
+    except socket.timeout:
+        return {"status": ERROR, "error": "Handshake timeout"}
+    except OSError as e:
+        return {"status": UNREACHABLE, "error": f"Connection error: {str(e)}"}
+
+
+def _run_round(
+    executor: ThreadPoolExecutor,
+    probes: Dict[str, Optional[ssl.SSLContext]],
+    address: Tuple[Any, ...],
+    hostname: str,
+    timeout: float
+) -> Dict[str, Dict[str, Any]]:
+    """Run one round of handshakes; stop early if the target is unreachable."""
+    futures = {
+        executor.submit(_handshake, address, hostname, context, timeout): name
+        for name, context in probes.items()
+    }
+    results = {}
+    for future in as_completed(futures):
+        name = futures[future]
+        if future.cancelled():
+            results[name] = {"status": UNREACHABLE, "error": "Skipped: target unreachable"}
+            continue
+        results[name] = future.result()
+        if results[name]["status"] == UNREACHABLE:
+            # Refused or unreachable: the remaining probes can't tell us anything
+            for pending in futures:
+                pending.cancel()
+    return {name: results[name] for name in probes}
+
+
+def enumerate_tls(
+    url: str,
+    port: int = 443,
+    timeout: float = TLS_ENUM_TIMEOUT,
+    workers: int = TLS_ENUM_WORKERS
+) -> Dict[str, Any]:
+    """
+    Enumerate accepted TLS protocol versions and cipher groups.
+
+    Args:
+        url: Website URL (domain name without protocol)
+        port: TLS port
+        timeout: Per-handshake timeout in seconds
+        workers: Concurrent handshakes
+
+    Returns:
+        Dictionary with per-protocol and per-cipher-group results, the weak
+        and legacy findings, and how many handshakes were made
+    """
+    started = time.monotonic()
+    hostname = url.replace("http://", "").replace("https://", "").split('/')[0]
+
+    # Resolve once; every handshake goes to the same address with SNI
+    try:
+        address = socket.getaddrinfo(hostname, port, type=socket.SOCK_STREAM)[0][4]
+    except socket.gaierror:
+        return {"error": f"Unable to resolve hostname: {hostname}"}
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        protocols = _run_round(executor, {
+            name: _client_context(version, version, "ALL")
+            for name, version in PROTOCOLS.items()
+        }, address, hostname, timeout)
+
+        # Cipher groups only matter for the TLS 1.2-and-below versions in use
+        accepted = [name for name in PROTOCOLS if name != "TLSv1.3" and protocols[name]["status"] == ACCEPTED]
+        if accepted:
+            low, high = PROTOCOLS[accepted[0]], PROTOCOLS[accepted[-1]]
+            cipher_groups = _run_round(executor, {
+                name: _client_context(low, high, ciphers)
+                for name, ciphers in CIPHER_GROUPS.items()
+            }, address, hostname, timeout)
+        else:
+            cipher_groups = {}
+
+    handshakes = sum(
+        1 for result in list(protocols.values()) + list(cipher_groups.values())
+        if result["status"] in (ACCEPTED, REJECTED)
+    )
+    return {
+        "ip": address[0],
+        "protocols": {name: result["status"] for name, result in protocols.items()},
+        "cipher_groups": cipher_groups,
+        "weak_protocols": [name for name in LEGACY_PROTOCOLS if protocols[name]["status"] == ACCEPTED],
+        "weak_cipher_groups": [
+            name for name in WEAK_CIPHER_GROUPS if cipher_groups.get(name, {}).get("status") == ACCEPTED
+        ],
+        "legacy_cipher_groups": [
+            name for name in LEGACY_CIPHER_GROUPS if cipher_groups.get(name, {}).get("status") == ACCEPTED
+        ],
+        "handshakes": handshakes,
+        "duration_ms": round((time.monotonic() - started) * 1000)
+    }
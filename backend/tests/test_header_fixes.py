@@ -0,0 +1,38 @@
+"""Recommended header fixes must pass the header policy they are graded by."""
+
+import re
+
+import pytest
+
+from scanners.attacker_defender_analysis import get_header_config_snippet
+from scanners.findings import findings_from_scan
+from scanners.fix_engine import HEADER_FIXES
+from scanners.header_policy import PASS, grade_header
+from scanners.headers_check import _header_report
+from scanners.result_model import HeadersResult
+
+
+@pytest.mark.parametrize("framework", ["nginx", "apache"])
+def test_csp_fix_config_passes_policy(framework):
+    config = HEADER_FIXES["Content-Security-Policy"]["fixes"][framework]["config"]
+    value = re.search(r'Content-Security-Policy "([^"]+)"', config).group(1)
+    grade = grade_header("Content-Security-Policy", value)
+    assert grade.status == PASS, grade.issues
+
+
+def test_defender_csp_snippet_passes_policy():
+    grade = grade_header("Content-Security-Policy", get_header_config_snippet("Content-Security-Policy"))
+    assert grade.status == PASS, grade.issues
+
+
+def test_weak_headers_only_lists_failing_grades():
+    headers = {
+        "Content-Security-Policy": "default-src 'self'",  # warn: no object-src/base-uri/frame-ancestors
+        "Strict-Transport-Security": "max-age=0",  # fail
+    }
+    report = _header_report(headers)
+    assert report["policies"]["Content-Security-Policy"]["status"] == "warn"
+    assert report["weak_headers"] == ["Strict-Transport-Security"]
+    assert HeadersResult.from_dict(report).to_dict()["weak_headers"] == report["weak_headers"]
+    findings = findings_from_scan({"ssl": {}, "headers": report, "ports": {}})
+    assert [name for name, _ in findings.weak_headers] == report["weak_headers"]
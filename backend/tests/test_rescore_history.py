@@ -0,0 +1,80 @@
+"""Rescoring stored history under a changed weight table."""
+
+import pytest
+
+from scanners import calculate_risk_score
+from scanners.context_risk_scoring import (
+    HEADER_WEIGHTS, WEIGHT_TABLES, clear_scoring_caches, register_weight_table
+)
+from scanners.security_drift import ScanHistoryTracker
+
+
+def _scan(missing_headers, open_ports):
+    scan = {
+        "ssl": {"is_valid": True, "expires_in_days": 90},
+        "headers": {
+            "missing_headers": [{"name": name} for name in missing_headers],
+            "missing_count": len(missing_headers)
+        },
+        "ports": {
+            "open_ports": [{"port": port} for port in open_ports],
+            "ports_open_count": len(open_ports)
+        }
+    }
+    scan["risk_score"] = calculate_risk_score(scan["ssl"], scan["headers"], scan["ports"])
+    return scan
+
+
+@pytest.fixture
+def heavier_headers():
+    """A weight table where every header weighs twice as much (capped at 1.0)."""
+    version = "test-heavier-headers"
+    register_weight_table(version, header_weights={
+        name: {context: min(1.0, weight * 2) for context, weight in weights.items()}
+        for name, weights in HEADER_WEIGHTS.items()
+    })
+    yield version
+    WEIGHT_TABLES.pop(version, None)
+    clear_scoring_caches()
+
+
+def test_rescore_moves_context_scores_under_new_weights(tmp_path, heavier_headers):
+    tracker = ScanHistoryTracker(str(tmp_path / "history.json"))
+    tracker.record_scan("a.example.com", _scan(["X-Frame-Options", "X-Content-Type-Options"], [443]))
+    tracker.record_scan("b.example.com", {
+        **_scan(["Content-Security-Policy", "X-Frame-Options"], [22]),
+        "site_context": "authentication",
+        "advanced": True
+    })
+    before = {url: dict(records[0]["context_score"]) for url, records in tracker.history.items()}
+    basic_before = {url: dict(records[0]["score"]) for url, records in tracker.history.items()}
+
+    summary = tracker.rescore_history(weights_version=heavier_headers)
+
+    assert summary["records_rescored"] == 2
+    assert summary["context_scores_changed"] == 2
+    for url, records in tracker.history.items():
+        context_score = records[0]["context_score"]
+        assert context_score["weights_version"] == heavier_headers
+        assert context_score["site_context"] == before[url]["site_context"]
+        assert context_score["advanced"] == before[url]["advanced"]
+        assert context_score["risk_score"] < before[url]["risk_score"]
+        # Drift compares the canonical score, which has no weight table
+        assert records[0]["score"] == basic_before[url]
+
+    # Rescoring back under the original table restores the recorded scores
+    tracker.rescore_history(weights_version=before["a.example.com"]["weights_version"])
+    for url, records in tracker.history.items():
+        assert records[0]["context_score"] == before[url]
+
+
+def test_rescore_reaches_persisted_history(tmp_path, heavier_headers):
+    history_file = str(tmp_path / "history.json")
+    ScanHistoryTracker(history_file).record_scan("a.example.com", _scan(["Content-Security-Policy"], []))
+    recorded = ScanHistoryTracker(history_file).history["a.example.com"][0]["context_score"]["risk_score"]
+
+    ScanHistoryTracker(history_file).rescore_history(weights_version=heavier_headers)
+
+    rescored = ScanHistoryTracker(history_file).history["a.example.com"][0]["context_score"]
+    assert rescored["weights_version"] == heavier_headers
+    assert rescored["risk_score"] < recorded
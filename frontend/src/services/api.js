@@ -62,6 +62,15 @@ const apiService = {
         },
       })
 
+      // Hosts backing off after a DNS failure or timeout aren't scanned
+      if (response.data.skipped) {
+        return {
+          success: false,
+          error: response.data.message,
+          skipped: true,
+        }
+      }
+
       return {
         success: true,
         data: response.data,
@@ -107,6 +116,168 @@ const apiService = {
     }
   },
 
+  /**
+   * Batch scan endpoint
+   * Scans several websites in one request
+   *
+   * @param {string[]} urls - Website URLs to scan
+   * @returns {Promise} { results, scanned, failed }
+   */
+  batchScan: async (urls) => {
+    try {
+      if (!Array.isArray(urls) || urls.length === 0) {
+        throw new Error('Invalid URL list provided')
+      }
+
+      const response = await apiClient.post('/scan/batch', {
+        urls: urls.map((url) => url.trim()),
+      })
+
+      return {
+        success: true,
+        data: response.data,
+      }
+    } catch (error) {
+      return {
+        success: false,
+        error: error.response?.data?.detail || error.message,
+        status: error.response?.status,
+      }
+    }
+  },
+
+  /**
+   * Advanced scan endpoint
+   * Context-aware analysis with attacker/defender views
+   *
+   * @param {string} url - Website URL to scan
+   * @param {Object} options - Optional { context, advanced, mode, views, paths }
+   * @returns {Promise} Analysis results including scan_id
+   */
+  advancedScan: async (url, { context = 'marketing', advanced = false, mode = 'both', views, paths } = {}) => {
+    try {
+      if (!url || typeof url !== 'string') {
+        throw new Error('Invalid URL provided')
+      }
+
+      const response = await apiClient.get('/scan/advanced', {
+        params: {
+          url: url.trim(),
+          context,
+          advanced,
+          mode,
+          views: Array.isArray(views) ? views.join(',') : views,
+          paths: Array.isArray(paths) ? paths.join(',') : paths,
+        },
+      })
+
+      return {
+        success: true,
+        data: response.data,
+      }
+    } catch (error) {
+      return {
+        success: false,
+        error: error.response?.data?.detail || error.message,
+        status: error.response?.status,
+      }
+    }
+  },
+
+  /**
+   * Rescore endpoint
+   * Re-runs analysis for an existing scan when context or mode changes
+   *
+   * @param {string} scanId - scan_id from a previous scan
+   * @param {Object} options - Optional { context, advanced, mode, views }
+   * @returns {Promise} Analysis results
+   */
+  rescoreScan: async (scanId, { context = 'marketing', advanced = false, mode = 'both', views } = {}) => {
+    try {
+      const response = await apiClient.post(`/scans/${scanId}/rescore`, null, {
+        params: {
+          context,
+          advanced,
+          mode,
+          views: Array.isArray(views) ? views.join(',') : views,
+        },
+      })
+
+      return {
+        success: true,
+        data: response.data,
+      }
+    } catch (error) {
+      return {
+        success: false,
+        error: error.response?.data?.detail || error.message,
+        status: error.response?.status,
+      }
+    }
+  },
+
+  /**
+   * Fix catalog endpoint
+   * Snippet bodies for the fix ids returned in scan responses (cached by ETag)
+   *
+   * @param {string} framework - Optional framework filter (nginx, apache, express, django, flask)
+   * @returns {Promise} Catalog keyed by fix id
+   */
+  getFixCatalog: async (framework) => {
+    try {
+      const response = await apiClient.get('/fixes/catalog', {
+        params: { framework },
+      })
+
+      return {
+        success: true,
+        data: response.data,
+      }
+    } catch (error) {
+      return {
+        success: false,
+        error: error.response?.data?.detail || error.message,
+        status: error.response?.status,
+      }
+    }
+  },
+
+  /**
+   * Security timeline endpoint
+   * Returns a downsampled risk timeline for charting
+   *
+   * @param {string} url - Website URL
+   * @param {Object} options - Optional { start, end, maxPoints }
+   * @returns {Promise} Timeline points
+   */
+  getSecurityTimeline: async (url, { start, end, maxPoints } = {}) => {
+    try {
+      if (!url || typeof url !== 'string') {
+        throw new Error('Invalid URL provided')
+      }
+
+      const response = await apiClient.get('/history/timeline', {
+        params: {
+          url: url.trim(),
+          start,
+          end,
+          max_points: maxPoints,
+        },
+      })
+
+      return {
+        success: true,
+        data: response.data,
+      }
+    } catch (error) {
+      return {
+        success: false,
+        error: error.response?.data?.detail || error.message,
+        status: error.response?.status,
+      }
+    }
+  },
+
   /**
    * Set API base URL (useful for switching between environments)
    *